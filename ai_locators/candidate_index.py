@@ -0,0 +1,222 @@
+"""
+Pre-tokenized candidate index used by :class:`AILocatorFallback`.
+
+The fallback score of a node is the best ``SequenceMatcher`` ratio between any query token
+and any of its ``TARGET_ATTRIBUTES`` values. That ratio only depends on the (query, value)
+pair, and a screen repeats the same values across many nodes (``android.widget.TextView``
+alone covers most of them), so the index works on unique values instead of nodes:
+
+1. Trigram inverted indexes over the unique values of each attribute, built once per
+   page source, rank values by cheap n-gram overlap with the queries.
+2. The top-K values by overlap are scored exactly first, which raises the acceptance
+   threshold early.
+3. Every remaining value is scored exactly only if its character-multiset upper bound
+   (the same bound ``SequenceMatcher.quick_ratio`` uses) can still reach the threshold.
+
+Pruning only discards values that provably cannot match or beat the best score, so the
+winner and its score are identical to the exhaustive scan.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Locator = Tuple[str, str]
+TARGET_ATTRIBUTES = ("resource-id", "content-desc", "text", "class")
+ATTRIBUTE_WEIGHTS = {"resource-id": 1.1, "content-desc": 1.1, "text": 1.0, "class": 0.9}
+DEFAULT_TOP_K = 25
+INDEX_CACHE_SIZE = 8
+
+
+def trigrams(value: str) -> set:
+    padded = f"  {value} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class IndexedValue:
+    attribute: str
+    value: str
+    weight: float
+    chars: Counter
+    grams: set
+    nodes: List[int] = field(default_factory=list)
+
+
+@dataclass
+class IndexedNode:
+    position: int
+    source_index: int
+    attributes: Dict[str, str]
+    value_ids: List[int]
+
+
+class CandidateIndex:
+    """Unique attribute values of one page source with trigram postings."""
+
+    def __init__(self, nodes: Iterable[Dict[str, str]]):
+        self.nodes: List[IndexedNode] = []
+        self.values: List[IndexedValue] = []
+        self._value_ids: Dict[Tuple[str, str], int] = {}
+        self._postings: Dict[str, List[int]] = {}
+
+        for source_index, attrs in enumerate(nodes):
+            attributes = {attr: attrs.get(attr, "") for attr in TARGET_ATTRIBUTES}
+            if not any(attributes.values()):
+                continue
+            position = len(self.nodes)
+            value_ids = []
+            for attr in TARGET_ATTRIBUTES:
+                raw = attributes[attr]
+                if not raw:
+                    continue
+                value_id = self._intern(attr, raw.lower())
+                self.values[value_id].nodes.append(position)
+                value_ids.append(value_id)
+            self.nodes.append(
+                IndexedNode(position=position, source_index=source_index, attributes=attributes, value_ids=value_ids)
+            )
+
+    def _intern(self, attribute: str, value: str) -> int:
+        key = (attribute, value)
+        value_id = self._value_ids.get(key)
+        if value_id is not None:
+            return value_id
+        value_id = len(self.values)
+        grams = trigrams(value)
+        self.values.append(
+            IndexedValue(
+                attribute=attribute,
+                value=value,
+                weight=ATTRIBUTE_WEIGHTS[attribute],
+                chars=Counter(value),
+                grams=grams,
+            )
+        )
+        self._value_ids[key] = value_id
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(value_id)
+        return value_id
+
+    def overlap_ranking(self, queries: Sequence[str]) -> List[int]:
+        """Value ids sharing at least one trigram with a query, best Dice overlap first."""
+        best: Dict[int, float] = {}
+        for query in queries:
+            query_grams = trigrams(query)
+            hits: Counter = Counter()
+            for gram in query_grams:
+                hits.update(self._postings.get(gram, ()))
+            for value_id, shared in hits.items():
+                dice = 2.0 * shared / (len(query_grams) + len(self.values[value_id].grams))
+                if dice > best.get(value_id, 0.0):
+                    best[value_id] = dice
+        return sorted(best, key=lambda value_id: -best[value_id])
+
+    def search(
+        self,
+        queries: Sequence[str],
+        min_similarity: float,
+        top_k: int = DEFAULT_TOP_K,
+    ) -> Optional[Tuple[IndexedNode, float]]:
+        """Return the first node (document order) with the highest score, or ``None``."""
+        ranked = self.rank(queries, min_similarity, limit=1, top_k=top_k)
+        return ranked[0] if ranked else None
+
+    def rank(
+        self,
+        queries: Sequence[str],
+        min_similarity: float,
+        limit: int = 1,
+        accept: Optional[Callable[[IndexedNode], bool]] = None,
+        top_k: int = DEFAULT_TOP_K,
+    ) -> List[Tuple[IndexedNode, float]]:
+        """
+        The ``limit`` best accepted nodes, highest score first and document order on ties.
+        The threshold for exact scoring is the ``limit``-th best accepted node score seen so far.
+        """
+        if not queries or not self.nodes or limit < 1:
+            return []
+
+        accepted = [accept is None or accept(node) for node in self.nodes]
+        query_chars = [(query, Counter(query), len(query)) for query in queries]
+        exact: Dict[int, float] = {}
+        node_scores: Dict[int, float] = {}
+        threshold = min_similarity
+
+        def record(value_id: int) -> None:
+            nonlocal threshold
+            score = self._exact_score(self.values[value_id], queries)
+            exact[value_id] = score
+            if score < threshold and len(node_scores) >= limit:
+                return
+            for position in self.values[value_id].nodes:
+                if accepted[position] and score > node_scores.get(position, -1.0):
+                    node_scores[position] = score
+            if len(node_scores) >= limit:
+                threshold = max(min_similarity, heapq.nlargest(limit, node_scores.values())[-1])
+
+        for value_id in self.overlap_ranking(queries)[:top_k]:
+            record(value_id)
+
+        bounds = []
+        for value_id, indexed in enumerate(self.values):
+            if value_id in exact or not any(accepted[position] for position in indexed.nodes):
+                continue
+            bound = self._upper_bound(indexed, query_chars)
+            if bound >= threshold:
+                bounds.append((bound, value_id))
+        bounds.sort(reverse=True)
+        for bound, value_id in bounds:
+            if bound < threshold:
+                break
+            record(value_id)
+
+        ranked = [
+            (self.nodes[position], score) for position, score in node_scores.items() if score >= min_similarity
+        ]
+        ranked.sort(key=lambda item: (-item[1], item[0].position))
+        return ranked[:limit]
+
+    @staticmethod
+    def _exact_score(indexed: IndexedValue, queries: Sequence[str]) -> float:
+        best_score = 0.0
+        for query in queries:
+            ratio = SequenceMatcher(None, query, indexed.value).ratio()
+            best_score = max(best_score, min(ratio * indexed.weight, 1.0))
+        return best_score
+
+    @staticmethod
+    def _upper_bound(indexed: IndexedValue, query_chars) -> float:
+        # Same float expression as SequenceMatcher.ratio() so a tight bound equals the exact score.
+        value_length = len(indexed.value)
+        best_bound = 0.0
+        for _, chars, length in query_chars:
+            total = length + value_length
+            if not total:
+                continue
+            # Cheapest bound first: no two strings can share more characters than the shorter one has.
+            if min((2.0 * min(length, value_length) / total) * indexed.weight, 1.0) <= best_bound:
+                continue
+            matches = sum(min(count, indexed.chars[char]) for char, count in chars.items())
+            best_bound = max(best_bound, min((2.0 * matches / total) * indexed.weight, 1.0))
+        return best_bound
+
+
+_INDEX_CACHE: "OrderedDict[str, CandidateIndex]" = OrderedDict()
+
+
+def get_candidate_index(source_hash: str, nodes: Iterable[Dict[str, str]]) -> CandidateIndex:
+    """Build (or reuse) the index for a page source identified by ``source_hash``."""
+    index = _INDEX_CACHE.get(source_hash)
+    if index is not None:
+        _INDEX_CACHE.move_to_end(source_hash)
+        return index
+    index = CandidateIndex(nodes)
+    _INDEX_CACHE[source_hash] = index
+    while len(_INDEX_CACHE) > INDEX_CACHE_SIZE:
+        _INDEX_CACHE.popitem(last=False)
+    return index
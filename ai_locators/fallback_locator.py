@@ -10,10 +10,29 @@ from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
 from selenium.common.exceptions import NoSuchElementException
 
+from ai_locators.candidate_index import TARGET_ATTRIBUTES, get_candidate_index
 from utils.logger import get_logger
+from utils.page_snapshot import PageSnapshot, get_snapshot
+from utils.timings import FALLBACK, timed
+from utils.wait_policy import no_implicit_wait
 
 Locator = Tuple[str, str]
-TARGET_ATTRIBUTES = ("resource-id", "content-desc", "text", "class")
+CLICKABLE_CLASSES = (
+    "android.widget.Button",
+    "android.widget.ImageButton",
+    "android.widget.CheckBox",
+    "android.widget.RadioButton",
+    "android.widget.Switch",
+    "android.widget.ToggleButton",
+)
+EDITABLE_CLASSES = (
+    "android.widget.EditText",
+    "android.widget.AutoCompleteTextView",
+    "android.widget.MultiAutoCompleteTextView",
+)
+# Taps on a label land on its clickable container (React Native wraps buttons in ViewGroups).
+CLICKABLE_ANCESTOR_DEPTH = 2
+_BOUNDS_PATTERN = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
 
 
 @dataclass
@@ -32,22 +51,32 @@ class AILocatorFallback:
     """
 
     MIN_SIMILARITY = 0.55
+    # Heals that tap or type need more confidence than read-only lookups: a wrong tap derails the test.
+    MIN_ACTION_CONFIDENCE = 0.8
+    # The winner must beat the runner-up by this much, otherwise the heal is ambiguous and fails fast.
+    MIN_MARGIN = 0.05
+    TOP_N = 3
 
     def __init__(self, driver: WebDriver):
         self.driver = driver
         self.logger = get_logger(self.__class__.__name__)
+        self.last_candidate: Optional[LocatorCandidate] = None
 
-    def find_with_fallback(self, primary: Locator, description: str = "") -> Locator:
+    def find_with_fallback(self, primary: Locator, description: str = "", action: Optional[str] = None) -> Locator:
         """
         Validate the primary locator and, when it fails, retry using the
         best-match locator from a fuzzy DOM scan.
         """
+        self.last_candidate = None
         try:
-            self.driver.find_element(*primary)
+            with no_implicit_wait(self.driver):
+                self.driver.find_element(*primary)
             return primary
         except NoSuchElementException as exc:
             self.logger.debug("Primary locator %s failed: %s", primary, exc)
-            candidate = self._search_dom(primary, description)
+            with timed(FALLBACK, "search_dom", description or primary[1]):
+                candidate = self._search_dom(primary, description, action)
+            self.last_candidate = candidate
             if candidate:
                 self.logger.info(
                     "AI fallback resolved '%s' to %s (score %.2f)",
@@ -61,15 +90,128 @@ class AILocatorFallback:
                 f"could not resolve locator for '{description}'."
             ) from exc
 
-    def _search_dom(self, primary: Locator, description: str) -> Optional[LocatorCandidate]:
-        page_source = self.driver.page_source
-        try:
-            root = ET.fromstring(page_source)
-        except ET.ParseError as exc:  # pragma: no cover - defensive logging
-            self.logger.error("Failed to parse page source for AI fallback: %s", exc)
+    def _search_dom(self, primary: Locator, description: str, action: Optional[str] = None) -> Optional[LocatorCandidate]:
+        return self.search_snapshot(get_snapshot(self.driver, refresh=True), primary, description, action)
+
+    def search_snapshot(
+        self,
+        snapshot: PageSnapshot,
+        primary: Locator,
+        description: str = "",
+        action: Optional[str] = None,
+    ) -> Optional[LocatorCandidate]:
+        """
+        Best fallback candidate within an already captured snapshot (no driver round-trip),
+        or ``None`` when no candidate fits the action's role, is confident enough, or clearly
+        beats the runner-up.
+        """
+        ranked = self.rank_candidates(snapshot, primary, description, action)
+        if not ranked:
             return None
 
+        best = ranked[0]
+        if action in ("click", "type") and best.score < self.MIN_ACTION_CONFIDENCE:
+            self.logger.warning(
+                "Rejecting fallback %s for '%s': score %.2f below %.2f required to %s",
+                best.locator,
+                description or primary,
+                best.score,
+                self.MIN_ACTION_CONFIDENCE,
+                action,
+            )
+            return None
+        if len(ranked) > 1 and best.score - ranked[1].score < self.MIN_MARGIN:
+            self.logger.warning(
+                "Ambiguous fallback for '%s': %s",
+                description or primary,
+                ", ".join(f"{candidate.locator} ({candidate.score:.2f})" for candidate in ranked),
+            )
+            return None
+        return best
+
+    def rank_candidates(
+        self,
+        snapshot: PageSnapshot,
+        primary: Locator,
+        description: str = "",
+        action: Optional[str] = None,
+    ) -> List[LocatorCandidate]:
+        """Top ``TOP_N`` distinct locators whose element role suits ``action``, best first."""
+        if not snapshot.nodes:
+            self.logger.error("Page source could not be parsed for AI fallback.")
+            return []
+
         queries = self._build_queries(primary, description)
+        index = get_candidate_index(snapshot.source_hash, (node.attributes for node in snapshot.nodes))
+        ranked = index.rank(
+            queries,
+            self.MIN_SIMILARITY,
+            # Extra headroom so duplicates collapsing onto one locator still leave TOP_N distinct ones.
+            limit=self.TOP_N * 2,
+            accept=lambda indexed: self._role_matches(snapshot, snapshot.nodes[indexed.source_index], action),
+        )
+
+        candidates: List[LocatorCandidate] = []
+        seen_locators = set()
+        seen_targets = set()
+        for indexed, score in ranked:
+            locator = self._build_locator(indexed.attributes)
+            if not locator or locator in seen_locators or locator == tuple(primary):
+                continue
+            # A label and its clickable container are one tap target, not two competing heals.
+            target = self._tap_target(snapshot, indexed.source_index) if action == "click" else indexed.source_index
+            if target in seen_targets:
+                continue
+            seen_locators.add(locator)
+            seen_targets.add(target)
+            candidates.append(LocatorCandidate(locator=locator, score=score, attributes=indexed.attributes))
+            if len(candidates) == self.TOP_N:
+                break
+        return candidates
+
+    def _role_matches(self, snapshot: PageSnapshot, node, action: Optional[str]) -> bool:
+        if node.get("displayed") == "false":
+            return False
+        if action is None:
+            return True
+        if not self._has_area(node.get("bounds")):
+            return False
+        if action in ("click", "type") and node.get("enabled") == "false":
+            return False
+        if action == "type":
+            return node.get("class") in EDITABLE_CLASSES
+        if action == "click":
+            if node.get("class") in EDITABLE_CLASSES:
+                return False
+            return self._tap_target(snapshot, node.index) is not None
+        return True
+
+    @staticmethod
+    def _tap_target(snapshot: PageSnapshot, node_index: int) -> Optional[int]:
+        """Index of the node that handles a tap on ``node_index`` (itself or a close clickable ancestor)."""
+        current, depth = snapshot.nodes[node_index], 0
+        while depth <= CLICKABLE_ANCESTOR_DEPTH:
+            if current.flag("clickable") or current.get("class") in CLICKABLE_CLASSES:
+                return current.index
+            if current.parent is None:
+                return None
+            current = snapshot.nodes[current.parent]
+            depth += 1
+        return None
+
+    @staticmethod
+    def _has_area(bounds: str) -> bool:
+        if not bounds:
+            return True
+        match = _BOUNDS_PATTERN.match(bounds)
+        if not match:
+            return True
+        left, top, right, bottom = (int(value) for value in match.groups())
+        return right > left and bottom > top
+
+    def _search_dom_exhaustive(self, page_source: str, queries: List[str]) -> Optional[LocatorCandidate]:
+        """Reference scan scoring every node; kept for benchmarks and equivalence checks."""
+        root = ET.fromstring(page_source)
         best_candidate: Optional[LocatorCandidate] = None
 
         for element in root.iter():
@@ -0,0 +1,224 @@
+"""
+Persistent cache of healed locators.
+
+When the AI fallback heals a broken primary locator the answer is stored in SQLite under
+``reports/cache`` keyed by (page class, primary locator, description, app version). Later
+lookups of the same broken primary go straight to the healed locator instead of waiting out
+the primary timeout and re-scoring the DOM. SQLite in WAL mode gives safe concurrent writes
+from every xdist worker; entries expire by TTL and the least recently used are evicted
+beyond ``max_entries``. Lookups are read-only: usage (``last_used``/``hits``) is collected in
+memory and written in one batch every ``flush_every`` hits, before each write and on close.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__)
+
+Locator = Tuple[str, str]
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HEALING_CACHE_PATH = REPO_ROOT / "reports" / "cache" / "healing_cache.sqlite"
+HEALING_CACHE_ENV = "FRAMEWORK_HEALING_CACHE"
+APP_VERSION_ENV = "APP_VERSION"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_FLUSH_EVERY = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS healed_locators (
+    page TEXT NOT NULL,
+    primary_locator TEXT NOT NULL,
+    description TEXT NOT NULL,
+    app_version TEXT NOT NULL,
+    healed_locator TEXT NOT NULL,
+    score REAL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (page, primary_locator, description, app_version)
+)
+"""
+
+
+def resolve_app_version(driver) -> str:
+    """Best-effort app build identifier so heals never leak across app versions."""
+    override = os.environ.get(APP_VERSION_ENV)
+    if override:
+        return override
+    capabilities: Dict[str, Any] = getattr(driver, "capabilities", None) or {}
+    for key in ("appium:app", "app"):
+        if capabilities.get(key):
+            return Path(str(capabilities[key])).name
+    for key in ("appium:appPackage", "appPackage"):
+        if capabilities.get(key):
+            return str(capabilities[key])
+    return "unknown"
+
+
+class HealingCache:
+    """SQLite-backed healed-locator store shared by all workers on the machine."""
+
+    def __init__(
+        self,
+        path: Path = HEALING_CACHE_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        # key -> (last hit time, hits since the last flush)
+        self._usage: Dict[Tuple[str, str, str, str], Tuple[float, int]] = {}
+        self._usage_lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA busy_timeout=30000")
+        self._connection.execute(_SCHEMA)
+
+    @staticmethod
+    def _key(page: str, primary: Locator, description: str, app_version: str) -> Tuple[str, str, str, str]:
+        return page, json.dumps(list(primary)), description or "", app_version
+
+    def get(self, page: str, primary: Locator, description: str, app_version: str) -> Optional[Locator]:
+        key = self._key(page, primary, description, app_version)
+        row = self._connection.execute(
+            "SELECT healed_locator, created_at FROM healed_locators "
+            "WHERE page=? AND primary_locator=? AND description=? AND app_version=?",
+            key,
+        ).fetchone()
+        if not row:
+            return None
+
+        healed_locator, created_at = row
+        now = time.time()
+        if now - created_at > self.ttl_seconds:
+            self._delete(key)
+            LOGGER.debug("Healed locator for %s expired", primary)
+            return None
+
+        with self._usage_lock:
+            hits = self._usage.get(key, (now, 0))[1] + 1
+            self._usage[key] = (now, hits)
+            pending = len(self._usage)
+        if pending >= self.flush_every:
+            self.flush()
+        by, value = json.loads(healed_locator)
+        return by, value
+
+    def flush(self) -> None:
+        """Write the usage collected by :meth:`get` since the last flush."""
+        if not self._usage:
+            return
+        with self._transaction():
+            self._flush_usage()
+
+    def put(
+        self,
+        page: str,
+        primary: Locator,
+        description: str,
+        app_version: str,
+        healed: Locator,
+        score: Optional[float] = None,
+    ) -> None:
+        key = self._key(page, primary, description, app_version)
+        now = time.time()
+        with self._transaction():
+            # Pending usage first, so LRU eviction below sees every recent hit.
+            self._flush_usage()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO healed_locators "
+                "(page, primary_locator, description, app_version, healed_locator, score, created_at, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (*key, json.dumps(list(healed)), score, now, now),
+            )
+            self._evict(now)
+
+    def invalidate(self, page: str, primary: Locator, description: str, app_version: str) -> None:
+        key = self._key(page, primary, description, app_version)
+        with self._usage_lock:
+            self._usage.pop(key, None)
+        self._delete(key)
+
+    def clear(self) -> None:
+        with self._usage_lock:
+            self._usage.clear()
+        self._connection.execute("DELETE FROM healed_locators")
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM healed_locators").fetchone()[0]
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        except sqlite3.Error as exc:
+            LOGGER.debug("Dropping healing cache usage that could not be written: %s", exc)
+        self._connection.close()
+
+    def _flush_usage(self) -> None:
+        with self._usage_lock:
+            usage, self._usage = self._usage, {}
+        if usage:
+            self._connection.executemany(
+                "UPDATE healed_locators SET last_used=MAX(last_used, ?), hits=hits+? "
+                "WHERE page=? AND primary_locator=? AND description=? AND app_version=?",
+                [(last_used, hits, *key) for key, (last_used, hits) in usage.items()],
+            )
+
+    def _delete(self, key: Tuple[str, str, str, str]) -> None:
+        self._connection.execute(
+            "DELETE FROM healed_locators WHERE page=? AND primary_locator=? AND description=? AND app_version=?",
+            key,
+        )
+
+    def _evict(self, now: float) -> None:
+        self._connection.execute("DELETE FROM healed_locators WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._connection.execute(
+            "DELETE FROM healed_locators WHERE rowid IN ("
+            "SELECT rowid FROM healed_locators ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE makes concurrent writers queue on the write lock instead of failing mid-way.
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._connection
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+
+_HEALING_CACHE: Optional[HealingCache] = None
+_HEALING_CACHE_FAILED = False
+
+
+def get_healing_cache() -> Optional[HealingCache]:
+    """Process-wide cache, or ``None`` when disabled via ``FRAMEWORK_HEALING_CACHE=0``."""
+    global _HEALING_CACHE, _HEALING_CACHE_FAILED  # pylint: disable=global-statement
+    if os.environ.get(HEALING_CACHE_ENV, "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    if _HEALING_CACHE is None and not _HEALING_CACHE_FAILED:
+        try:
+            _HEALING_CACHE = HealingCache()
+            atexit.register(_HEALING_CACHE.close)
+        except sqlite3.Error as exc:
+            _HEALING_CACHE_FAILED = True
+            LOGGER.warning("Healing cache unavailable at %s: %s", HEALING_CACHE_PATH, exc)
+    return _HEALING_CACHE
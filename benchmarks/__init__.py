@@ -0,0 +1 @@
+"""Offline micro-benchmarks for framework hot paths."""
@@ -0,0 +1,70 @@
+"""
+Run the offline benchmark suite.
+
+    python -m benchmarks                                  # run everything, print a table
+    python -m benchmarks --filter fallback --quick        # subset, shorter rounds
+    python -m benchmarks --save-baseline                  # write benchmarks/baseline.json
+    python -m benchmarks --compare --threshold 0.15       # exit 1 if anything regressed
+
+Baselines are machine-specific: regenerate ``baseline.json`` on the machine that compares
+against it (CI runner or your laptop) before relying on the regression check.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks import suite  # noqa: F401  (registers the benchmarks)
+from benchmarks.harness import compare, load_baseline, registered, run_benchmark, save_results
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="3 short rounds instead of 7 (noisier)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results to --baseline")
+    parser.add_argument("--compare", action="store_true", help="compare results against --baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown/memory growth (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    benchmarks = registered(args.filter)
+    if not benchmarks:
+        parser.error(f"no benchmark matches {args.filter!r}")
+    rounds, min_round_time = (3, 0.01) if args.quick else (7, 0.05)
+
+    results = []
+    print(f"{'benchmark':<44} {'median ms':>10} {'min ms':>9} {'stdev':>7} {'peak KB':>9}")
+    with suite.quiet_logging():
+        for bench in benchmarks:
+            result = run_benchmark(bench, rounds=rounds, min_round_time=min_round_time)
+            results.append(result)
+            print(
+                f"{result.name:<44} {result.median_ms:>10.4f} {result.min_ms:>9.4f} "
+                f"{result.stdev_ms:>7.4f} {result.peak_kb:>9.1f}"
+            )
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+
+    if args.compare:
+        if not args.baseline.exists():
+            parser.error(f"baseline {args.baseline} does not exist; run with --save-baseline first")
+        comparisons = compare(results, load_baseline(args.baseline), threshold=args.threshold)
+        print(f"\nComparison against {args.baseline} (threshold {args.threshold:.0%}):")
+        for item in comparisons:
+            status = "REGRESSED" if item.regressed else "ok"
+            change = f"{(item.ratio - 1) * 100:+6.1f}%" if item.ratio else "   new"
+            print(f"  {status:<9} {item.name:<44} {change}  {', '.join(item.notes)}")
+        regressions = [item for item in comparisons if item.regressed]
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed beyond {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
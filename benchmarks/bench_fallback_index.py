@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: indexed AI fallback search vs. the exhaustive node scan.
+
+    python -m benchmarks.bench_fallback_index --nodes 500 1000 2000
+"""
+
+import argparse
+import time
+
+from ai_locators.candidate_index import CandidateIndex
+from ai_locators.fallback_locator import AILocatorFallback, LocatorCandidate
+from benchmarks.synthetic import fallback_queries, synthetic_page_source
+from utils.page_snapshot import PageSnapshot
+
+
+def _indexed_search(fallback: AILocatorFallback, snapshot: PageSnapshot, queries):
+    index = CandidateIndex(node.attributes for node in snapshot.nodes)
+    match = index.search(queries, fallback.MIN_SIMILARITY)
+    if not match:
+        return None
+    node, score = match
+    return LocatorCandidate(locator=fallback._build_locator(node.attributes), score=score, attributes=node.attributes)
+
+
+def run(node_counts, repeat: int = 3) -> None:
+    fallback = AILocatorFallback(driver=None)
+    print(f"{'nodes':>6} {'exhaustive ms':>14} {'indexed ms':>11} {'speed-up':>9}  same result")
+    for count in node_counts:
+        source = synthetic_page_source(count)
+        snapshot = PageSnapshot(source)
+        exhaustive_total = indexed_total = 0.0
+        identical = True
+        for _ in range(repeat):
+            for primary, description in fallback_queries():
+                queries = fallback._build_queries(primary, description)
+
+                started = time.perf_counter()
+                expected = fallback._search_dom_exhaustive(source, queries)
+                exhaustive_total += time.perf_counter() - started
+
+                started = time.perf_counter()
+                actual = _indexed_search(fallback, snapshot, queries)
+                indexed_total += time.perf_counter() - started
+
+                identical &= (expected is None and actual is None) or (
+                    expected is not None
+                    and actual is not None
+                    and expected.locator == actual.locator
+                    and expected.score == actual.score
+                )
+        calls = repeat * len(fallback_queries())
+        exhaustive_ms = exhaustive_total / calls * 1000
+        indexed_ms = indexed_total / calls * 1000
+        print(f"{count:>6} {exhaustive_ms:>14.2f} {indexed_ms:>11.2f} {exhaustive_ms / indexed_ms:>8.1f}x  {identical}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.nodes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""In-memory driver answering lookups from a fixed page source, for benchmarks that must not touch a device."""
+
+from typing import List, Optional
+
+import cv2
+import numpy as np
+from selenium.common.exceptions import NoSuchElementException
+
+from utils.page_snapshot import PageSnapshot, SnapshotNode
+
+
+class FakeElement:
+    def __init__(self, node: SnapshotNode):
+        self.node = node
+        self.clicks = 0
+        self.typed = ""
+
+    @property
+    def text(self) -> str:
+        return self.node.text
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self.node.get(name) or None
+
+    def is_displayed(self) -> bool:
+        return self.node.get("displayed") != "false"
+
+    def is_enabled(self) -> bool:
+        return self.node.get("enabled") != "false"
+
+    def click(self) -> None:
+        self.clicks += 1
+
+    def clear(self) -> None:
+        self.typed = ""
+
+    def send_keys(self, text: str) -> None:
+        self.typed += text
+
+
+class FakeDriver:
+    """Serves ``find_element(s)``, ``page_source`` and screenshots with zero latency."""
+
+    def __init__(self, page_source: str, screenshot: Optional[np.ndarray] = None):
+        self.page_source = page_source
+        self._snapshot = PageSnapshot(page_source)
+        self._screenshot = screenshot if screenshot is not None else np.zeros((64, 64, 3), dtype=np.uint8)
+        self.capabilities = {"appium:appPackage": "com.swaglabsmobileapp"}
+        self.commands = 0
+
+    def implicitly_wait(self, seconds: float) -> None:
+        self.commands += 1
+
+    def find_elements(self, by: str, value: str) -> List[FakeElement]:
+        self.commands += 1
+        nodes = self._snapshot.find_all((by, value))
+        return [FakeElement(node) for node in nodes or []]
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element for {by}={value}")
+        return elements[0]
+
+    def get_screenshot_as_png(self) -> bytes:
+        self.commands += 1
+        return cv2.imencode(".png", self._screenshot)[1].tobytes()
+
+    def save_screenshot(self, path: str) -> bool:
+        with open(path, "wb") as handle:
+            handle.write(self.get_screenshot_as_png())
+        return True
@@ -0,0 +1,187 @@
+"""
+Minimal benchmark runner: calibrated timing rounds, peak memory, JSON baselines and comparison.
+
+Each benchmark is timed in ``rounds`` rounds of ``n`` iterations, where ``n`` is calibrated so
+a round lasts at least ``min_round_time``; the median per-iteration time across rounds is the
+headline number. Peak allocation is measured separately with ``tracemalloc`` so tracing does
+not distort the timings.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+Setup = Callable[[], Callable[[], object]]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Setup
+    group: str = ""
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    median_ms: float
+    min_ms: float
+    stdev_ms: float
+    iterations: int
+    rounds: int
+    peak_kb: float
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline_ms: float
+    current_ms: float
+    ratio: float
+    regressed: bool
+    baseline_kb: float = 0.0
+    current_kb: float = 0.0
+    notes: List[str] = field(default_factory=list)
+
+
+_REGISTRY: List[Benchmark] = []
+
+
+def benchmark(name: str, group: str = "") -> Callable[[Setup], Setup]:
+    """Register ``setup``; it prepares inputs and returns the zero-argument callable to time."""
+
+    def decorator(setup: Setup) -> Setup:
+        _REGISTRY.append(Benchmark(name=name, setup=setup, group=group))
+        return setup
+
+    return decorator
+
+
+def registered(pattern: Optional[str] = None) -> List[Benchmark]:
+    return [bench for bench in _REGISTRY if not pattern or pattern in bench.name]
+
+
+def _calibrate(func: Callable[[], object], min_round_time: float) -> int:
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_round_time or iterations >= 1_000_000:
+            return iterations
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(min_round_time / elapsed) + 1))
+
+
+def _peak_memory_kb(func: Callable[[], object]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run_benchmark(bench: Benchmark, rounds: int = 7, min_round_time: float = 0.05) -> BenchmarkResult:
+    func = bench.setup()
+    func()  # warm caches and lazy imports outside the measurement
+    iterations = _calibrate(func, min_round_time)
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            samples.append((time.perf_counter() - started) / iterations * 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return BenchmarkResult(
+        name=bench.name,
+        median_ms=statistics.median(samples),
+        min_ms=min(samples),
+        stdev_ms=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        iterations=iterations,
+        rounds=rounds,
+        peak_kb=_peak_memory_kb(func),
+    )
+
+
+def machine_info() -> Dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def save_results(results: List[BenchmarkResult], path: Path) -> None:
+    payload = {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "results": {
+            result.name: {key: round(value, 5) if isinstance(value, float) else value for key, value in asdict(result).items()}
+            for result in results
+        },
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> Dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(
+    results: List[BenchmarkResult],
+    baseline: Dict,
+    threshold: float = 0.15,
+    noise_floor_ms: float = 0.005,
+) -> List[Comparison]:
+    """
+    Flag a benchmark when its median is more than ``threshold`` slower than the baseline
+    (and by more than ``noise_floor_ms``) or its peak memory grew by more than ``threshold``.
+    """
+    comparisons = []
+    for result in results:
+        reference = baseline.get("results", {}).get(result.name)
+        if not reference:
+            comparisons.append(Comparison(result.name, 0.0, result.median_ms, 0.0, False, notes=["new"]))
+            continue
+        ratio = result.median_ms / reference["median_ms"] if reference["median_ms"] else 0.0
+        notes = []
+        slower = ratio > 1 + threshold and result.median_ms - reference["median_ms"] > noise_floor_ms
+        if slower:
+            notes.append(f"time +{(ratio - 1) * 100:.0f}%")
+        baseline_kb = reference.get("peak_kb", 0.0)
+        # Ignore tiny absolute changes in memory; allocator noise dominates below a few KB.
+        heavier = baseline_kb > 0 and result.peak_kb > baseline_kb * (1 + threshold) and result.peak_kb - baseline_kb > 16
+        if heavier:
+            notes.append(f"memory +{(result.peak_kb / baseline_kb - 1) * 100:.0f}%")
+        comparisons.append(
+            Comparison(
+                result.name,
+                reference["median_ms"],
+                result.median_ms,
+                ratio,
+                slower or heavier,
+                baseline_kb=baseline_kb,
+                current_kb=result.peak_kb,
+                notes=notes,
+            )
+        )
+    return comparisons
@@ -0,0 +1,158 @@
+"""
+Benchmark definitions for framework hot paths; everything runs offline on synthetic inputs.
+
+Importing this module registers the benchmarks with :mod:`benchmarks.harness`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import cv2
+
+from ai_locators.fallback_locator import AILocatorFallback
+from benchmarks.fake_driver import FakeDriver
+from benchmarks.harness import benchmark
+from benchmarks.synthetic import fallback_queries, perturbed_screenshot, synthetic_page_source, synthetic_screenshot
+from pages.base_page import BasePage
+from utils.logger import LOG_FORMAT, get_logger
+from utils.page_snapshot import PageSnapshot
+from visual.baseline_cache import BaselineCache
+from visual.comparison import MultiScaleComparator, downscale
+from visual.visual_validator import VisualValidator
+
+NODE_COUNTS = (100, 500, 1000, 5000)
+RESOLUTIONS = ((720, 1280), (1080, 2400), (1440, 3200))
+SCORE_SAMPLE = 100
+
+LOGIN_BUTTON = ("accessibility id", "test-LOGIN")
+
+
+@contextmanager
+def quiet_logging() -> Iterator[None]:
+    """Send log records to ``os.devnull`` so benchmarks pay for formatting without filling framework.log."""
+    root = logging.getLogger()
+    previous = root.handlers[:]
+    devnull = open(os.devnull, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.handlers = [handler]
+    try:
+        yield
+    finally:
+        root.handlers = previous
+        devnull.close()
+
+
+def _login_source(node_count: int) -> str:
+    """Synthetic hierarchy with a findable login button appended, so page actions succeed."""
+    source = synthetic_page_source(node_count)
+    button = (
+        '<android.view.ViewGroup index="0" class="android.view.ViewGroup" package="com.swaglabsmobileapp" '
+        'content-desc="test-LOGIN" clickable="true" enabled="true" displayed="true" bounds="[0,0][100,100]"/>'
+    )
+    return source.replace("</hierarchy>", button + "</hierarchy>")
+
+
+def _register_page_source(count: int) -> None:
+    source = synthetic_page_source(count)
+
+    @benchmark(f"snapshot.parse[{count}]", group="page_source")
+    def parse():
+        return lambda: PageSnapshot(source)
+
+    @benchmark(f"fallback.search_snapshot[{count}]", group="fallback")
+    def search_snapshot():
+        fallback = AILocatorFallback(driver=None)
+        snapshot = PageSnapshot(source)
+        cases = fallback_queries()
+
+        def run():
+            for primary, description in cases:
+                fallback.search_snapshot(snapshot, primary, description)
+
+        return run
+
+
+@benchmark(f"fallback.score_candidate[x{SCORE_SAMPLE}]", group="fallback")
+def score_candidate():
+    """Raw scoring cost: one query set against a fixed node sample (the exhaustive scan is this times N)."""
+    fallback = AILocatorFallback(driver=None)
+    nodes = [node.attributes for node in PageSnapshot(synthetic_page_source(SCORE_SAMPLE)).nodes]
+    queries = [fallback._build_queries(primary, description) for primary, description in fallback_queries()]
+
+    def run():
+        for index, attributes in enumerate(nodes):
+            fallback._score_candidate(attributes, queries[index % len(queries)])
+
+    return run
+
+
+def _register_visual(width: int, height: int) -> None:
+    @benchmark(f"visual.calculate_similarity[{width}x{height}]", group="visual")
+    def similarity():
+        baseline = synthetic_screenshot(width, height)
+        actual = perturbed_screenshot(baseline)
+        validator = VisualValidator()
+        return lambda: validator._calculate_similarity(baseline, actual)
+
+    @benchmark(f"visual.multiscale_compare[{width}x{height}]", group="visual")
+    def multiscale():
+        # Baseline pyramid precomputed, as it is once baselines are cached.
+        baseline = synthetic_screenshot(width, height)
+        actual = perturbed_screenshot(baseline)
+        comparator = MultiScaleComparator()
+        coarse = downscale(baseline, comparator.levels)
+        return lambda: comparator.compare(baseline, actual, baseline_coarse=coarse)
+
+
+@benchmark("visual.compare_with_baseline[1080x2400]", group="visual")
+def compare_with_baseline():
+    # Warm baseline cache: decoding happens once, each call only reads the actual screenshot.
+    workdir = tempfile.TemporaryDirectory()
+    root = Path(workdir.name)
+    baseline = synthetic_screenshot(1080, 2400)
+    validator = VisualValidator(root / "baseline", root / "actual", root / "diff", BaselineCache(sidecar_dir=root))
+    cv2.imwrite(str(root / "baseline" / "screen.png"), baseline)
+    cv2.imwrite(str(root / "actual" / "screen.png"), perturbed_screenshot(baseline))
+
+    def run():
+        validator.compare_with_baseline(root / "actual" / "screen.png", "screen.png", threshold=0.9)
+
+    run.workdir = workdir
+    return run
+
+
+for _count in NODE_COUNTS:
+    _register_page_source(_count)
+for _width, _height in RESOLUTIONS:
+    _register_visual(_width, _height)
+
+
+@benchmark("base_page.click[1000]", group="base_page")
+def base_page_click():
+    page = BasePage(FakeDriver(_login_source(1000)))
+    return lambda: page.click(LOGIN_BUTTON, timeout=1)
+
+
+@benchmark("base_page.get_text[1000]", group="base_page")
+def base_page_get_text():
+    page = BasePage(FakeDriver(_login_source(1000)))
+    return lambda: page.get_text(LOGIN_BUTTON, timeout=1)
+
+
+@benchmark("logger.info", group="logger")
+def logger_info():
+    logger = get_logger("benchmarks.logger")
+    return lambda: logger.info("Tapping on element %s", LOGIN_BUTTON)
+
+
+@benchmark("logger.debug_filtered", group="logger")
+def logger_debug():
+    logger = get_logger("benchmarks.logger")
+    return lambda: logger.debug("Finding element %s with timeout %ss", LOGIN_BUTTON, 15)
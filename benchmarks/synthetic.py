@@ -0,0 +1,104 @@
+"""Deterministic synthetic inputs shaped like the SwagLabs Android UI."""
+
+import random
+from xml.sax.saxutils import quoteattr
+
+CLASSES = (
+    "android.widget.FrameLayout",
+    "android.widget.LinearLayout",
+    "android.view.ViewGroup",
+    "android.widget.TextView",
+    "android.widget.ImageView",
+    "android.widget.Button",
+    "android.widget.EditText",
+    "android.widget.ScrollView",
+)
+LABELS = (
+    "Item title", "Item", "Price", "ADD TO CART", "REMOVE", "Cart", "Cart badge", "Menu",
+    "Description", "BACK TO PRODUCTS", "CHECKOUT", "CONTINUE SHOPPING", "Username", "Password",
+    "LOGIN", "Error message", "First Name", "Last Name", "Zip/Postal Code", "FINISH", "Toggle",
+    "Modal Selector Button", "Cart drop zone", "Item description",
+)
+WORDS = (
+    "sauce", "labs", "backpack", "bike", "light", "bolt", "shirt", "fleece", "jacket", "onesie",
+    "red", "all", "the", "things", "carry", "sleek", "streamlined", "pack", "night", "riding",
+)
+
+
+def synthetic_page_source(node_count: int, seed: int = 7) -> str:
+    """Nested hierarchy with ``node_count`` nodes and realistic attribute repetition."""
+    rng = random.Random(seed)
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<hierarchy rotation="0">']
+    open_tags = []
+    for index in range(node_count):
+        class_name = rng.choice(CLASSES)
+        attrs = {"index": str(index % 7), "class": class_name, "package": "com.swaglabsmobileapp"}
+        roll = rng.random()
+        if roll < 0.25:
+            attrs["content-desc"] = f"test-{rng.choice(LABELS)}"
+        elif roll < 0.35:
+            attrs["content-desc"] = f"test-{rng.choice(LABELS)} {index}"
+        if rng.random() < 0.3 and class_name in ("android.widget.TextView", "android.widget.Button"):
+            attrs["text"] = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 5)))
+        if rng.random() < 0.05:
+            attrs["resource-id"] = f"android:id/{rng.choice(WORDS)}_{index}"
+        for flag in ("clickable", "enabled", "displayed", "focusable"):
+            attrs[flag] = "true" if rng.random() < 0.5 else "false"
+        left, top = rng.randint(0, 900), rng.randint(0, 2000)
+        attrs["bounds"] = f"[{left},{top}][{left + rng.randint(20, 500)},{top + rng.randint(20, 300)}]"
+        rendered = " ".join(f"{key}={quoteattr(value)}" for key, value in attrs.items())
+        tag = class_name
+        if open_tags and rng.random() < 0.35:
+            lines.append(f"</{open_tags.pop()}>")
+        if rng.random() < 0.4:
+            lines.append(f"<{tag} {rendered}>")
+            open_tags.append(tag)
+        else:
+            lines.append(f"<{tag} {rendered} />")
+    while open_tags:
+        lines.append(f"</{open_tags.pop()}>")
+    lines.append("</hierarchy>")
+    return "\n".join(lines)
+
+
+def fallback_queries():
+    """(primary locator, description) pairs resembling real page-object lookups."""
+    return [
+        (("accessibility id", "test-ADD TO CART"), "product details add to cart"),
+        (("accessibility id", "test-Cart badge"), "cart badge"),
+        (("accessibility id", "test-LOGIN"), "login button"),
+        (("accessibility id", "test-Zip/Postal Code"), "checkout postal code"),
+        (("accessibility id", "test-Menu"), "Inventory menu button"),
+        (("id", "com.swaglabsmobileapp:id/missing"), "sleek backpack"),
+    ]
+
+
+def synthetic_screenshot(width: int, height: int, seed: int = 7):
+    """BGR screen-like image: flat background, coloured cards and text bars."""
+    import numpy as np  # local import keeps the XML helpers usable without numpy
+
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width, 3), 245, dtype=np.uint8)
+    card_height = max(height // 10, 8)
+    for top in range(height // 12, height - card_height, card_height + card_height // 4):
+        left = width // 20
+        image[top:top + card_height, left:width - left] = 255
+        bar_top = top + card_height // 4
+        bar_width = int(rng.integers(width // 4, width // 2))
+        image[bar_top:bar_top + max(card_height // 8, 2), left * 2:left * 2 + bar_width] = (72, 76, 85)
+        button_top = top + card_height * 2 // 3
+        image[button_top:button_top + max(card_height // 5, 2), width // 2:width - left * 2] = (26, 35, 226)
+    return image
+
+
+def perturbed_screenshot(image, seed: int = 11, patches: int = 3):
+    """Copy of ``image`` with a few small rectangles changed, like a shifted label or badge."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    changed = image.copy()
+    height, width = changed.shape[:2]
+    for _ in range(patches):
+        top, left = int(rng.integers(0, height - height // 20)), int(rng.integers(0, width - width // 10))
+        changed[top:top + height // 40, left:left + width // 10] = rng.integers(0, 255, 3, dtype=np.uint8)
+    return changed
@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from .endpoints import ApiEndpoints
 
@@ -17,6 +17,7 @@ class Product:
     name: str
     price: str
     description: str
+    id: Optional[int] = None
 
 
 class MobileApiClient:
@@ -36,6 +37,7 @@ class MobileApiClient:
                 name=entry["name"],
                 price=entry["price"],
                 description=entry["description"],
+                id=entry.get("id"),
             )
             for entry in self._payload[ApiEndpoints.PRODUCTS]
         }
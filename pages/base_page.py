@@ -1,10 +1,14 @@
-from typing import Callable, Optional
+import os
+import sqlite3
+import time
+from typing import Callable, ClassVar, Dict, Optional, Sequence, Tuple
 
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 
 from ai_locators.fallback_locator import AILocatorFallback
+from ai_locators.healing_cache import get_healing_cache, resolve_app_version
 from utils.helpers import (
     attach_screenshot,
     get_text,
@@ -15,14 +19,31 @@ from utils.helpers import (
     wait_for_element_to_be_clickable,
 )
 from utils.logger import get_logger
+from utils.page_snapshot import PageSnapshot, get_snapshot, invalidate_snapshot
+from utils.timings import ACTION, FALLBACK, WAIT, timed, timed_method
+from utils.wait_policy import probe_elements
 
 Locator = tuple[str, str]
+FALLBACK_RACE_ENV = "FRAMEWORK_FALLBACK_RACE"
 
 
 class BasePage:
     """Base class exposing common mobile interactions."""
 
     DEFAULT_TIMEOUT = 15
+    POLL_INTERVAL = 0.25
+    # Safety net for screens that change without a framework action (timers, async loads).
+    SNAPSHOT_MAX_AGE = 5.0
+
+    # Racing fallback: probe the primary and fallback candidates against the same periodic
+    # snapshot and heal once the primary has clearly been missing, instead of after the full timeout.
+    FALLBACK_RACE = False
+    RACE_MISS_CYCLES = 3
+    RACE_PRIMARY_BUDGET = 0.4
+    RACE_POLL_INTERVAL = 0.5
+
+    # Wins per locator within a candidate group, shared by every page instance in the process.
+    _locator_wins: ClassVar[Dict[Tuple[Locator, ...], Dict[Locator, int]]] = {}
 
     def __init__(self, driver: WebDriver):
         self.driver = driver
@@ -39,7 +60,30 @@ class BasePage:
         func: Callable[[Locator], WebElement | bool | None],
         use_fallback: bool = False,
         description: Optional[str] = None,
+        timeout: Optional[float] = None,
     ):
+        if use_fallback:
+            healed = self._get_cached_heal(locator, description or action)
+            if healed:
+                found = self._wait_for_primary_or_heal(locator, healed, self._resolve_timeout(timeout))
+                if found == locator:
+                    self.logger.info("Primary locator %s works again, dropping cached heal %s", locator, healed)
+                    self._invalidate_cached_heal(locator, description or action)
+                else:
+                    if found == healed:
+                        try:
+                            self.logger.info("Using cached healed locator %s for %s", healed, locator)
+                            return func(healed)
+                        except (TimeoutException, NoSuchElementException) as exc:
+                            self.logger.warning("Cached healed locator %s failed, invalidating: %s", healed, exc)
+                    else:
+                        self.logger.warning("Neither %s nor cached heal %s appeared, invalidating", locator, healed)
+                    self._invalidate_cached_heal(locator, description or action)
+                    return self._retry_with_fallback(action, locator, func, description)
+
+            if self._race_enabled():
+                return self._execute_racing(action, locator, func, description or action, timeout)
+
         try:
             return func(locator)
         except (TimeoutException, NoSuchElementException) as exc:
@@ -49,28 +93,7 @@ class BasePage:
                     locator,
                     action,
                 )
-                try:
-                    fallback_locator = self.ai_locator.find_with_fallback(locator, description or action)
-                except Exception as fallback_exc:  # pylint: disable=broad-except
-                    self.logger.error(
-                        "AI fallback failed for action '%s' on locator %s: %s",
-                        action,
-                        locator,
-                        fallback_exc,
-                    )
-                    attach_screenshot(self.driver, name=f"{action.replace(' ', '_')}_failure")
-                    raise
-
-                self.logger.info(
-                    "Retrying action '%s' using fallback locator %s", action, fallback_locator
-                )
-                return self._execute_with_logging(
-                    action,
-                    fallback_locator,
-                    func,
-                    use_fallback=False,
-                    description=description,
-                )
+                return self._retry_with_fallback(action, locator, func, description)
 
             self.logger.error("Failed to %s on locator %s: %s", action, locator, exc)
             attach_screenshot(self.driver, name=f"{action.replace(' ', '_')}_failure")
@@ -80,6 +103,161 @@ class BasePage:
             attach_screenshot(self.driver, name=f"{action.replace(' ', '_')}_failure")
             raise
 
+    def _retry_with_fallback(
+        self,
+        action: str,
+        locator: Locator,
+        func: Callable[[Locator], WebElement | bool | None],
+        description: Optional[str],
+    ):
+        try:
+            fallback_locator = self.ai_locator.find_with_fallback(locator, description or action, action=action)
+        except Exception as fallback_exc:  # pylint: disable=broad-except
+            self.logger.error(
+                "AI fallback failed for action '%s' on locator %s: %s",
+                action,
+                locator,
+                fallback_exc,
+            )
+            attach_screenshot(self.driver, name=f"{action.replace(' ', '_')}_failure")
+            raise
+
+        self.logger.info("Retrying action '%s' using fallback locator %s", action, fallback_locator)
+        result = self._execute_with_logging(
+            action,
+            fallback_locator,
+            func,
+            use_fallback=False,
+            description=description,
+        )
+        if fallback_locator != locator:
+            self._store_heal(locator, description or action, fallback_locator)
+        return result
+
+    def _wait_for_primary_or_heal(self, locator: Locator, healed: Locator, timeout: float) -> Optional[Locator]:
+        """
+        Poll the primary and its cached heal together until either is on screen; the primary
+        wins ties so a fixed locator retires its heal. ``None`` when neither shows up in time.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            for candidate in (locator, healed):
+                if self._probe_candidate(candidate, None) is not None:
+                    return candidate
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.POLL_INTERVAL)
+
+    def _race_enabled(self) -> bool:
+        env_value = os.environ.get(FALLBACK_RACE_ENV)
+        if env_value is not None:
+            return env_value.strip().lower() in ("1", "true", "yes", "on")
+        return self.FALLBACK_RACE
+
+    def _execute_racing(
+        self,
+        action: str,
+        locator: Locator,
+        func: Callable[[Locator], WebElement | bool | None],
+        description: str,
+        timeout: Optional[float],
+    ):
+        try:
+            target = self._race_for_locator(locator, description, self._resolve_timeout(timeout), action)
+        except TimeoutException as exc:
+            self.logger.error("Failed to %s on locator %s: %s", action, locator, exc)
+            attach_screenshot(self.driver, name=f"{action.replace(' ', '_')}_failure")
+            raise
+        if target != locator:
+            self.logger.info("Retrying action '%s' using fallback locator %s", action, target)
+        result = self._execute_with_logging(action, target, func, use_fallback=False, description=description)
+        if target != locator:
+            self._store_heal(locator, description, target)
+        return result
+
+    def _race_for_locator(
+        self,
+        locator: Locator,
+        description: str,
+        timeout: float,
+        action: Optional[str] = None,
+    ) -> Locator:
+        """
+        Poll one page-source snapshot per cycle for the primary locator and, once the primary
+        has been missing for RACE_MISS_CYCLES polls and its share of the budget has elapsed,
+        score fallback candidates against that same snapshot.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        heal_not_before = started + timeout * self.RACE_PRIMARY_BUDGET
+        misses = 0
+
+        while True:
+            snapshot = self.snapshot(refresh=True)
+            present = snapshot.exists(locator)
+            if present is None:
+                present = bool(probe_elements(self.driver, locator))
+            elapsed = time.monotonic() - started
+            if present:
+                self.logger.debug("Race: primary %s found after %.2fs (%s polls)", locator, elapsed, misses + 1)
+                return locator
+
+            misses += 1
+            if misses >= self.RACE_MISS_CYCLES and time.monotonic() >= heal_not_before:
+                with timed(FALLBACK, "race_search", description):
+                    candidate = self.ai_locator.search_snapshot(snapshot, locator, description, action)
+                if candidate:
+                    self.ai_locator.last_candidate = candidate
+                    self.logger.info(
+                        "Race: healed %s to %s (score %.2f) after %.2fs and %s polls; saved ~%.2fs vs full-timeout heal",
+                        locator,
+                        candidate.locator,
+                        candidate.score,
+                        elapsed,
+                        misses,
+                        max(timeout - elapsed, 0.0),
+                    )
+                    return candidate.locator
+
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(self.RACE_POLL_INTERVAL)
+
+        raise TimeoutException(f"{locator} missing for {misses} polls and no fallback candidate within {timeout}s")
+
+    def _heal_key(self, locator: Locator, description: str) -> Tuple[str, Locator, str, str]:
+        return self.__class__.__name__, tuple(locator), description, resolve_app_version(self.driver)
+
+    def _get_cached_heal(self, locator: Locator, description: str) -> Optional[Locator]:
+        cache = get_healing_cache()
+        if cache is None:
+            return None
+        try:
+            return cache.get(*self._heal_key(locator, description))
+        except sqlite3.Error as exc:
+            self.logger.debug("Healing cache lookup failed: %s", exc)
+            return None
+
+    def _invalidate_cached_heal(self, locator: Locator, description: str) -> None:
+        cache = get_healing_cache()
+        if cache is None:
+            return
+        try:
+            cache.invalidate(*self._heal_key(locator, description))
+        except sqlite3.Error as exc:
+            self.logger.debug("Healing cache invalidation failed: %s", exc)
+
+    def _store_heal(self, locator: Locator, description: str, healed: Locator) -> None:
+        cache = get_healing_cache()
+        if cache is None:
+            return
+        candidate = self.ai_locator.last_candidate
+        try:
+            cache.put(*self._heal_key(locator, description), healed, candidate.score if candidate else None)
+        except sqlite3.Error as exc:
+            self.logger.debug("Healing cache write failed: %s", exc)
+
+    @timed_method(WAIT)
     def find_element(self, locator: Locator, timeout: Optional[int] = None) -> WebElement:
         actual_timeout = self._resolve_timeout(timeout)
         self.logger.debug("Finding element %s with timeout %ss", locator, actual_timeout)
@@ -89,6 +267,7 @@ class BasePage:
             lambda target: wait_for_element(self.driver, target, actual_timeout),
         )
 
+    @timed_method(WAIT)
     def wait_for_clickable(self, locator: Locator, timeout: Optional[int] = None) -> WebElement:
         actual_timeout = self._resolve_timeout(timeout)
         self.logger.debug("Waiting for element %s to be clickable for %ss", locator, actual_timeout)
@@ -98,6 +277,7 @@ class BasePage:
             lambda target: wait_for_element_to_be_clickable(self.driver, target, actual_timeout),
         )
 
+    @timed_method(ACTION)
     def click(self, locator: Locator, timeout: Optional[int] = None, description: Optional[str] = None) -> None:
         actual_timeout = self._resolve_timeout(timeout)
         self.logger.debug("Clicking element %s with timeout %ss", locator, actual_timeout)
@@ -107,8 +287,10 @@ class BasePage:
             lambda target: tap_element(self.driver, target, actual_timeout),
             use_fallback=True,
             description=description,
+            timeout=actual_timeout,
         )
 
+    @timed_method(ACTION)
     def type(
         self,
         locator: Locator,
@@ -124,8 +306,10 @@ class BasePage:
             lambda target: type_text(self.driver, target, text, actual_timeout),
             use_fallback=True,
             description=description,
+            timeout=actual_timeout,
         )
 
+    @timed_method(ACTION)
     def get_text(self, locator: Locator, timeout: Optional[int] = None) -> str:
         actual_timeout = self._resolve_timeout(timeout)
         self.logger.debug("Getting text from element %s with timeout %ss", locator, actual_timeout)
@@ -135,6 +319,7 @@ class BasePage:
             lambda target: get_text(self.driver, target, actual_timeout),
         )
 
+    @timed_method(WAIT)
     def is_visible(
         self,
         locator: Locator,
@@ -157,12 +342,14 @@ class BasePage:
                     _check,
                     use_fallback=True,
                     description=description,
+                    timeout=actual_timeout,
                 )
             )
         except TimeoutException:
             self.logger.debug("Element %s not visible within %ss", locator, actual_timeout)
             return False
 
+    @timed_method(ACTION)
     def scroll_to(self, locator: Locator) -> WebElement:
         self.logger.debug("Scrolling to element %s", locator)
         return self._execute_with_logging(
@@ -174,6 +361,83 @@ class BasePage:
     def wait_for(self, locator: Locator, timeout: Optional[int] = None) -> WebElement:
         return self.find_element(locator, timeout)
 
+    @timed_method(WAIT)
+    def wait_for_any(
+        self,
+        locators: Sequence[Locator],
+        timeout: Optional[int] = None,
+        condition: Optional[Callable[[WebElement], bool]] = None,
+    ) -> Tuple[WebElement, Locator]:
+        """
+        Poll every candidate locator within one shared deadline and return the first
+        match together with the locator that won. Candidates are tried in order of
+        their historical win count so the usual winner costs a single probe.
+        """
+        actual_timeout = self._resolve_timeout(timeout)
+        group = tuple(locators)
+        ordered = self._order_by_wins(group)
+        deadline = time.monotonic() + actual_timeout
+        self.logger.debug("Waiting up to %ss for any of %s", actual_timeout, ordered)
+
+        while True:
+            for locator in ordered:
+                element = self._probe_candidate(locator, condition)
+                if element is not None:
+                    self._record_win(group, locator)
+                    return element, locator
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(self.POLL_INTERVAL)
+
+        raise TimeoutException(f"None of {list(group)} matched within {actual_timeout}s")
+
+    def locator_win_rates(self, locators: Sequence[Locator]) -> Dict[Locator, float]:
+        wins = self._locator_wins.get(tuple(locators), {})
+        total = sum(wins.values())
+        return {locator: (wins.get(locator, 0) / total if total else 0.0) for locator in locators}
+
+    def _order_by_wins(self, group: Tuple[Locator, ...]) -> list[Locator]:
+        wins = self._locator_wins.get(group, {})
+        # sorted() is stable, so declaration order breaks ties.
+        return sorted(group, key=lambda locator: -wins.get(locator, 0))
+
+    def _record_win(self, group: Tuple[Locator, ...], locator: Locator) -> None:
+        wins = self._locator_wins.setdefault(group, {})
+        wins[locator] = wins.get(locator, 0) + 1
+
+    def _probe_candidate(
+        self,
+        locator: Locator,
+        condition: Optional[Callable[[WebElement], bool]],
+    ) -> Optional[WebElement]:
+        try:
+            for element in probe_elements(self.driver, locator):
+                if condition is None or condition(element):
+                    return element
+        except (NoSuchElementException, StaleElementReferenceException):
+            pass
+        except Exception as exc:  # pylint: disable=broad-except
+            # e.g. an invalid UiSelector on this platform; treat as a miss and keep polling the others.
+            self.logger.debug("Probe for %s failed: %s", locator, exc)
+        return None
+
+    def snapshot(self, refresh: bool = False) -> PageSnapshot:
+        """Indexed page-source snapshot shared by all page objects on this driver."""
+        return get_snapshot(self.driver, refresh=refresh, max_age=self.SNAPSHOT_MAX_AGE)
+
+    def invalidate_snapshot(self) -> None:
+        invalidate_snapshot(self.driver)
+
+    def snapshot_text(self, locators: Sequence[Locator]) -> str:
+        """First non-empty text among ``locators`` read from the snapshot; empty when none match."""
+        snapshot = self.snapshot()
+        for locator in self._order_by_wins(tuple(locators)):
+            text = snapshot.get_text(locator)
+            if text:
+                self._record_win(tuple(locators), locator)
+                return text
+        return ""
+
     def capture_screenshot(self, name: str = "page_state") -> None:
         """Capture a screenshot with an explicit name for debugging."""
         attach_screenshot(self.driver, name=name)
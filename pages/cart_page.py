@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 
 from pages.base_page import BasePage
+from utils.wait_policy import poll_elements, probe_elements
 
 
 class CartPage(BasePage):
@@ -27,29 +29,41 @@ class CartPage(BasePage):
     def _all_item_elements(self):
         elements = []
         for locator in self.CART_ITEM_LOCATORS:
-            elements.extend(self.driver.find_elements(*locator))
+            elements.extend(probe_elements(self.driver, locator))
         return elements
 
+    def _wait_for_cart_screen(self, timeout: int = 5) -> None:
+        """Items render with the cart footer; wait for it so probes don't race the transition."""
+        poll_elements(self.driver, self.CHECKOUT_BUTTON, timeout)
+
     def get_item_count(self) -> int:
         return len(self._all_item_elements())
 
     def wait_for_items(self, timeout: int = 10) -> None:
-        for locator in self.CART_ITEM_LOCATORS:
-            try:
-                self.wait_for(locator, timeout=timeout)
-                return
-            except Exception:  # pylint: disable=broad-except
-                continue
-        raise TimeoutError("Cart items failed to appear")
+        try:
+            self.wait_for_any(self.CART_ITEM_LOCATORS, timeout=timeout)
+        except TimeoutException as exc:
+            raise TimeoutError("Cart items failed to appear") from exc
 
     def has_items(self) -> bool:
+        self._wait_for_cart_screen()
         return self.get_item_count() > 0
 
     def wait_until_empty(self, timeout: int = 5) -> None:
         WebDriverWait(self.driver, timeout).until(lambda d: len(self._all_item_elements()) == 0)
 
     def get_item_names(self) -> list[str]:
-        return [(element.text or "").strip() for element in self._all_item_elements() if (element.text or "").strip()]
+        names = self._snapshot_item_names(self.snapshot())
+        if not names:
+            # An empty read may come from a snapshot taken mid-transition; confirm with a fresh one.
+            names = self._snapshot_item_names(self.snapshot(refresh=True))
+        return names
+
+    def _snapshot_item_names(self, snapshot) -> list[str]:
+        names: list[str] = []
+        for locator in self.CART_ITEM_LOCATORS:
+            names.extend(snapshot.texts(locator) or [])
+        return names
 
     def remove_first_item(self) -> None:
         self.click(self.REMOVE_BUTTON, description="remove cart item")
@@ -15,6 +15,8 @@ class CheckoutPage(BasePage):
     FINISH_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "test-FINISH")
     ERROR_MESSAGE = (AppiumBy.ACCESSIBILITY_ID, "test-Error message")
     ORDER_COMPLETE_TEXT = (AppiumBy.ACCESSIBILITY_ID, "test-CHECKOUT: COMPLETE!")
+    CANCEL_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "test-CANCEL")
+    BACK_HOME_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "test-BACK HOME")
 
     def enter_shipping_information(self, first_name: str, last_name: str, postal_code: str) -> None:
         self.type(self.FIRST_NAME_FIELD, first_name, description="checkout first name")
@@ -27,6 +29,12 @@ class CheckoutPage(BasePage):
     def finish(self) -> None:
         self.click(self.FINISH_BUTTON, description="checkout finish button")
 
+    def cancel(self) -> None:
+        self.click(self.CANCEL_BUTTON, description="checkout cancel button")
+
+    def back_home(self) -> None:
+        self.click(self.BACK_HOME_BUTTON, description="back home button")
+
     def get_error_text(self) -> str:
         return self.get_text(self.ERROR_MESSAGE)
 
@@ -5,6 +5,7 @@ from pages.base_page import BasePage
 class HomePage(BasePage):
     MENU_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "test-Menu")
     LOGOUT_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "test-Logout")
+    ALL_ITEMS_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "test-ALL ITEMS")
 
     def is_user_logged_in(self) -> bool:
         """User is logged in when the Menu button is visible."""
@@ -16,3 +17,10 @@ class HomePage(BasePage):
         self.logger.info("Attempting logout")
         self.click(self.MENU_BUTTON)
         self.click(self.LOGOUT_BUTTON)
+
+    def open_menu(self) -> None:
+        self.click(self.MENU_BUTTON, description="menu button")
+
+    def show_all_items(self) -> None:
+        """From the open menu, back to the full product list."""
+        self.click(self.ALL_ITEMS_BUTTON, description="all items menu entry")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from appium.webdriver.common.appiumby import AppiumBy
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 
 from pages.base_page import BasePage
 
@@ -19,19 +19,28 @@ class LoginPage(BasePage):
         'new UiSelector().textContains("locked out").className("android.widget.TextView")',
     )
 
+    ERROR_LOCATORS = (ERROR_MESSAGE_TEXT, ERROR_BANNER, LOCKED_OUT_TEXT)
+
     DEFAULT_USERNAME = "standard_user"
     DEFAULT_PASSWORD = "secret_sauce"
 
     def login(self, username: str = DEFAULT_USERNAME, password: str = DEFAULT_PASSWORD) -> None:
+        from pages.login_state import forget  # local import to avoid circular dependency
+
         self.logger.info("Attempting login with username=%s", username)
+        # Whoever was kept signed in is gone; callers that verify the login remember the new user.
+        forget(self.driver)
         self.type(self.USERNAME_FIELD, username, description="login username")
         self.type(self.PASSWORD_FIELD, password, description="login password")
         self.click(self.LOGIN_BUTTON, description="login button")
 
     def has_validation_error(self, timeout: int = 10) -> bool:
         """Return True if any inline login error locator is visible."""
-        locators = (self.ERROR_BANNER, self.ERROR_MESSAGE_TEXT, self.LOCKED_OUT_TEXT)
-        return any(self.is_visible(locator, timeout=timeout, description="login error") for locator in locators)
+        try:
+            self.wait_for_any(self.ERROR_LOCATORS, timeout=timeout, condition=lambda element: element.is_displayed())
+            return True
+        except TimeoutException:
+            return False
 
     def _extract_text(self, element) -> str:
         text = (element.text or "").strip()
@@ -45,33 +54,28 @@ class LoginPage(BasePage):
 
     def get_error_message(self, timeout: int = 10) -> str:
         """Fetch the inline validation text."""
-        def _wait_for_text(locator):
-            return WebDriverWait(self.driver, timeout).until(
-                lambda driver: (
-                    extracted
-                    if (element := driver.find_element(*locator)) and (extracted := self._extract_text(element))
-                    else None
-                )
-            )
-
-        for locator in (self.ERROR_MESSAGE_TEXT, self.ERROR_BANNER, self.LOCKED_OUT_TEXT):
-            try:
-                text = _wait_for_text(locator)
-                if text:
-                    return text
-            except Exception:  # pylint: disable=broad-except
-                continue
-        return ""
+        text = self.snapshot_text(self.ERROR_LOCATORS)
+        if text:
+            return text
+
+        extracted: dict = {}
+
+        def _has_text(element) -> bool:
+            extracted["text"] = self._extract_text(element)
+            return bool(extracted["text"])
+
+        try:
+            self.wait_for_any(self.ERROR_LOCATORS, timeout=timeout, condition=_has_text)
+        except TimeoutException:
+            return ""
+        return extracted["text"]
 
     def wait_for_error_banner(self, timeout: int = 15) -> None:
         """Explicitly wait until error copy is shown."""
-        for locator in (self.ERROR_BANNER, self.ERROR_MESSAGE_TEXT, self.LOCKED_OUT_TEXT):
-            try:
-                self.wait_for(locator, timeout=timeout)
-                return
-            except Exception:  # pylint: disable=broad-except
-                continue
-        raise TimeoutError("Error banner did not appear in allotted time")
+        try:
+            self.wait_for_any(self.ERROR_LOCATORS, timeout=timeout)
+        except TimeoutException as exc:
+            raise TimeoutError("Error banner did not appear in allotted time") from exc
 
     def is_login_successful(self) -> bool:
         """SwagLabs redirects to Products page after successful login."""
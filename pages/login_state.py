@@ -0,0 +1,97 @@
+"""
+Signed-in app state kept alive across tests, keyed by user type.
+
+Pooled sessions normally reset the app before every test, so each test paid for a UI login.
+Tests marked ``@pytest.mark.starting_state("<user>")`` instead keep the app running (the
+pool skips its reset) and call :func:`restore_login`. When the pooled device's app is still
+signed in as that user, restoring only navigates back to an empty-cart products screen
+scrolled to the top. Otherwise it logs out if needed, logs in once, and remembers the user
+for the next test on that device. Any UI login through :meth:`LoginPage.login` and any app
+reset or new session from the pool forgets the remembered user.
+
+``FRAMEWORK_LOGIN_REUSE=0`` (or ``login_reuse: false`` in ``config/config.yaml``) turns this off.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+import yaml
+
+from pages.login_page import LoginPage
+from pages.navigation import CART, LOGIN, PRODUCTS, NavigationError, current_screen, navigate_to
+from pages.products_page import ProductsPage
+from utils import gestures
+from utils.logger import get_logger
+from utils.page_snapshot import get_snapshot
+from utils.timings import ACTION, timed
+
+LOGGER = get_logger(__name__)
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / "config" / "config.yaml"
+LOGIN_REUSE_ENV = "FRAMEWORK_LOGIN_REUSE"
+LOGGED_OUT = "logged_out"
+RESTORED, LOGGED_IN = "restored", "login"
+
+_SIGNED_IN: "WeakKeyDictionary[object, str]" = WeakKeyDictionary()
+
+
+def login_reuse_enabled(config_path: Path = CONFIG_PATH) -> bool:
+    env_value = os.environ.get(LOGIN_REUSE_ENV)
+    if env_value is not None:
+        return env_value.strip().lower() not in ("0", "false", "no", "off")
+    if config_path.exists():
+        with config_path.open("r", encoding="utf-8") as config_file:
+            return bool((yaml.safe_load(config_file) or {}).get("login_reuse", True))
+    return True
+
+
+def signed_in_as(driver) -> Optional[str]:
+    """The user this driver's app was last left signed in as by :func:`restore_login`."""
+    return _SIGNED_IN.get(driver)
+
+
+def remember(driver, user: str) -> None:
+    _SIGNED_IN[driver] = user
+
+
+def forget(driver) -> None:
+    _SIGNED_IN.pop(driver, None)
+
+
+def _reset_to_products(driver) -> ProductsPage:
+    products_page = navigate_to(driver, PRODUCTS)
+    if get_snapshot(driver).exists(ProductsPage.CART_BADGE):
+        cart_page = navigate_to(driver, CART)
+        while cart_page.has_items():
+            cart_page.remove_first_item()
+        products_page = navigate_to(driver, PRODUCTS)
+    # Scroll back to the top so "first product" means the same item in every test.
+    gestures.scroll_until(driver, lambda snapshot: None, direction="up")
+    return products_page
+
+
+def restore_login(driver, user: str = LoginPage.DEFAULT_USERNAME) -> str:
+    """Leave the app signed in as ``user`` on the products screen; returns ``restored`` or ``login``."""
+    screen = current_screen(driver)
+    if screen != LOGIN and signed_in_as(driver) == user:
+        with timed(ACTION, "restore_login", user):
+            _reset_to_products(driver)
+        LOGGER.info("Restored signed-in state for %s", user)
+        return RESTORED
+
+    with timed(ACTION, "login", user):
+        if screen != LOGIN:
+            navigate_to(driver, LOGIN)
+        login_page = LoginPage(driver)
+        login_page.login(user)
+        # Checked before navigating: from the login screen the graph would sign in as the default user.
+        if not login_page.is_login_successful():
+            raise NavigationError(f"Login as {user} did not reach the products screen")
+        _reset_to_products(driver)
+    remember(driver, user)
+    LOGGER.info("Logged in as %s; state kept for later tests on this device", user)
+    return LOGGED_IN
@@ -0,0 +1,187 @@
+"""
+Screen-aware navigation over the page objects.
+
+Every screen has a fingerprint (locators that are only on that screen) and transitions
+(page-object actions leading to other screens, with a cost in device round trips).
+:meth:`NavigationGraph.detect` recognises the current screen from one page-source snapshot
+and :meth:`NavigationGraph.navigate` walks the cheapest known path to a target, re-detecting
+after every step. A step that lands somewhere unexpected is simply re-planned from there,
+so recovery paths ("CONTINUE SHOPPING, else BACK TO PRODUCTS") need no try/except.
+
+A test that asks for ``PRODUCTS`` on a session that is already logged in skips the login.
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from pages.base_page import BasePage
+from pages.cart_page import CartPage
+from pages.checkout_page import CheckoutPage
+from pages.home_page import HomePage
+from pages.login_page import LoginPage
+from pages.product_detail_page import ProductDetailPage
+from pages.products_page import ProductsPage
+from utils.logger import get_logger
+from utils.page_snapshot import PageSnapshot, get_snapshot
+
+LOGGER = get_logger(__name__)
+
+Locator = Tuple[str, str]
+
+LOGIN = "login"
+PRODUCTS = "products"
+MENU = "menu"
+PRODUCT_DETAIL = "product_detail"
+CART = "cart"
+CHECKOUT_INFO = "checkout_info"
+CHECKOUT_OVERVIEW = "checkout_overview"
+CHECKOUT_COMPLETE = "checkout_complete"
+
+DETECT_TIMEOUT = 10.0
+DETECT_INTERVAL = 0.25
+MAX_STEPS = 10
+
+
+class NavigationError(RuntimeError):
+    """The current screen is unknown or the target cannot be reached from it."""
+
+
+@dataclass(frozen=True)
+class Screen:
+    name: str
+    page: Type[BasePage]
+    markers: Tuple[Locator, ...]
+
+    def matches(self, snapshot: PageSnapshot) -> bool:
+        return all(snapshot.exists(marker) for marker in self.markers)
+
+
+@dataclass(frozen=True)
+class Transition:
+    source: str
+    target: str
+    action: Callable[[object], None]
+    description: str
+    cost: float = 1.0
+
+
+class NavigationGraph:
+    """Screens checked in declaration order (overlays first) plus weighted transitions."""
+
+    def __init__(self, screens: Sequence[Screen], transitions: Sequence[Transition]):
+        self.screens: Dict[str, Screen] = {screen.name: screen for screen in screens}
+        self._order = list(screens)
+        self.transitions: Dict[str, List[Transition]] = {}
+        for transition in transitions:
+            for name in (transition.source, transition.target):
+                if name not in self.screens:
+                    raise ValueError(f"Transition '{transition.description}' references unknown screen '{name}'")
+            self.transitions.setdefault(transition.source, []).append(transition)
+
+    def detect(self, snapshot: PageSnapshot) -> Optional[str]:
+        for screen in self._order:
+            if screen.matches(snapshot):
+                return screen.name
+        return None
+
+    def current_screen(self, driver, timeout: float = DETECT_TIMEOUT) -> str:
+        """Detect from fresh snapshots, waiting out loading frames between screens."""
+        deadline = time.monotonic() + timeout
+        while True:
+            screen = self.detect(get_snapshot(driver, refresh=True))
+            if screen is not None:
+                return screen
+            if time.monotonic() >= deadline:
+                raise NavigationError(f"Could not recognise the current screen within {timeout:.0f}s")
+            time.sleep(DETECT_INTERVAL)
+
+    def route(self, source: str, target: str) -> List[Transition]:
+        """Cheapest transition sequence (Dijkstra); empty when already there."""
+        if target not in self.screens:
+            raise NavigationError(f"Unknown screen '{target}'")
+        queue: List[Tuple[float, int, str]] = [(0.0, 0, source)]
+        best = {source: 0.0}
+        via: Dict[str, Transition] = {}
+        counter = 1
+        while queue:
+            cost, _, screen = heapq.heappop(queue)
+            if screen == target:
+                break
+            if cost > best[screen]:
+                continue
+            for transition in self.transitions.get(screen, []):
+                total = cost + transition.cost
+                if total < best.get(transition.target, float("inf")):
+                    best[transition.target] = total
+                    via[transition.target] = transition
+                    heapq.heappush(queue, (total, counter, transition.target))
+                    counter += 1
+        if target not in best:
+            raise NavigationError(f"No known path from '{source}' to '{target}'")
+        path: List[Transition] = []
+        screen = target
+        while screen != source:
+            path.append(via[screen])
+            screen = via[screen].source
+        return list(reversed(path))
+
+    def navigate(self, driver, target: str, max_steps: int = MAX_STEPS) -> BasePage:
+        """Walk to ``target`` and return its page object."""
+        for _ in range(max_steps):
+            current = self.current_screen(driver)
+            if current == target:
+                return self.screens[target].page(driver)
+            step = self.route(current, target)[0]
+            LOGGER.info("Navigating %s -> %s: %s", current, step.target, step.description)
+            step.action(driver)
+        current = self.current_screen(driver)
+        if current != target:
+            raise NavigationError(f"Still on '{current}' after {max_steps} steps towards '{target}'")
+        return self.screens[target].page(driver)
+
+
+def _swag_labs_graph() -> NavigationGraph:
+    screens = [
+        # The menu overlays whichever screen opened it, so it is checked first.
+        Screen(MENU, HomePage, (HomePage.LOGOUT_BUTTON,)),
+        Screen(LOGIN, LoginPage, (LoginPage.LOGIN_BUTTON,)),
+        Screen(PRODUCTS, ProductsPage, (ProductsPage.SCREEN_TITLE,)),
+        Screen(PRODUCT_DETAIL, ProductDetailPage, (ProductDetailPage.BACK_BUTTON,)),
+        Screen(CART, CartPage, (CartPage.CHECKOUT_BUTTON,)),
+        Screen(CHECKOUT_INFO, CheckoutPage, (CheckoutPage.FIRST_NAME_FIELD,)),
+        Screen(CHECKOUT_OVERVIEW, CheckoutPage, (CheckoutPage.FINISH_BUTTON,)),
+        Screen(CHECKOUT_COMPLETE, CheckoutPage, (CheckoutPage.ORDER_COMPLETE_TEXT,)),
+    ]
+    transitions = [
+        Transition(LOGIN, PRODUCTS, lambda driver: LoginPage(driver).login(), "log in as the default user", cost=3),
+        Transition(PRODUCTS, PRODUCT_DETAIL, lambda driver: ProductsPage(driver).open_first_product(), "open first product"),
+        Transition(PRODUCTS, MENU, lambda driver: HomePage(driver).open_menu(), "open menu"),
+        Transition(MENU, PRODUCTS, lambda driver: HomePage(driver).show_all_items(), "all items"),
+        Transition(MENU, LOGIN, lambda driver: HomePage(driver).click(HomePage.LOGOUT_BUTTON), "log out"),
+        Transition(PRODUCT_DETAIL, PRODUCTS, lambda driver: ProductDetailPage(driver).go_back_to_products(), "back to products"),
+        Transition(CART, PRODUCTS, lambda driver: CartPage(driver).continue_shopping(), "continue shopping"),
+        Transition(CART, CHECKOUT_INFO, lambda driver: CartPage(driver).proceed_to_checkout(), "checkout"),
+        Transition(CHECKOUT_INFO, CART, lambda driver: CheckoutPage(driver).cancel(), "cancel checkout"),
+        Transition(CHECKOUT_OVERVIEW, CHECKOUT_COMPLETE, lambda driver: CheckoutPage(driver).finish(), "finish order"),
+        Transition(CHECKOUT_COMPLETE, PRODUCTS, lambda driver: CheckoutPage(driver).back_home(), "back home"),
+    ]
+    # The header cart icon is on every signed-in screen.
+    for screen in (PRODUCTS, PRODUCT_DETAIL, CHECKOUT_INFO, CHECKOUT_OVERVIEW, CHECKOUT_COMPLETE):
+        transitions.append(Transition(screen, CART, lambda driver: ProductsPage(driver).go_to_cart(), "cart icon"))
+    return NavigationGraph(screens, transitions)
+
+
+SWAG_LABS = _swag_labs_graph()
+
+
+def current_screen(driver) -> str:
+    return SWAG_LABS.current_screen(driver)
+
+
+def navigate_to(driver, target: str) -> BasePage:
+    """Route the default graph from wherever the app is to ``target``."""
+    return SWAG_LABS.navigate(driver, target)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from appium.webdriver.common.appiumby import AppiumBy
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 
 from pages.base_page import BasePage
 
@@ -44,23 +44,28 @@ class ProductDetailPage(BasePage):
         self.click(self.BACK_BUTTON, description="back to products")
 
     def _wait_for_any_locator(self, locators, timeout: int = 10):
-        for locator in locators:
-            try:
-                return self.wait_for(locator, timeout=timeout)
-            except Exception:  # pylint: disable=broad-except
-                continue
-        raise TimeoutError(f"Unable to locate any of {locators}")
+        try:
+            element, _ = self.wait_for_any(locators, timeout=timeout)
+        except TimeoutException as exc:
+            raise TimeoutError(f"Unable to locate any of {locators}") from exc
+        return element
 
     def _get_text_from_locators(self, locators, timeout: int = 15) -> str:
-        for locator in locators:
-            try:
-                element = self.wait_for(locator, timeout=timeout)
-            except Exception:  # pylint: disable=broad-except
-                continue
-            text = self._extract_text(element)
-            if text:
-                return text
-        raise TimeoutError(f"Text not found for locators {locators}")
+        text = self.snapshot_text(locators)
+        if text:
+            return text
+
+        extracted: dict = {}
+
+        def _has_text(element) -> bool:
+            extracted["text"] = self._extract_text(element)
+            return bool(extracted["text"])
+
+        try:
+            self.wait_for_any(locators, timeout=timeout, condition=_has_text)
+        except TimeoutException as exc:
+            raise TimeoutError(f"Text not found for locators {locators}") from exc
+        return extracted["text"]
 
     def _extract_text(self, element) -> str:
         candidates = [
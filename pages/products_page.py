@@ -4,7 +4,8 @@ from appium.webdriver.common.appiumby import AppiumBy
 from selenium.common.exceptions import NoSuchElementException
 
 from pages.base_page import BasePage
-from utils.helpers import scroll_to_text, swipe
+from utils.element_search import TextQuery, find_by_text
+from utils.wait_policy import poll_elements
 
 
 class ProductsPage(BasePage):
@@ -15,6 +16,7 @@ class ProductsPage(BasePage):
     CART_ICON = (AppiumBy.ACCESSIBILITY_ID, "test-Cart")
     CART_BADGE = (AppiumBy.ACCESSIBILITY_ID, "test-Cart badge")
     PRODUCT_TITLE = (AppiumBy.ACCESSIBILITY_ID, "test-Item title")
+    LIST_RENDER_TIMEOUT = 10
     ADD_TO_CART_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "test-ADD TO CART")
     REMOVE_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "test-REMOVE")
 
@@ -42,30 +44,16 @@ class ProductsPage(BasePage):
         return self.is_visible(self.CART_BADGE, description="cart badge")
 
     def get_first_product_name(self) -> str:
-        elements = self.driver.find_elements(*self.PRODUCT_TITLE)
+        elements = poll_elements(self.driver, self.PRODUCT_TITLE, self.LIST_RENDER_TIMEOUT)
         if not elements:
             return ""
         return (elements[0].text or "").strip()
 
-    def open_product_by_name(self, product_name: str) -> None:
-        if self._tap_visible_product(product_name):
-            return
-
-        element = scroll_to_text(self.driver, product_name)
-        element.click()
-
-    def _tap_visible_product(self, product_name: str) -> bool:
-        elements = self.driver.find_elements(*self.PRODUCT_TITLE)
-        for element in elements:
-            if (element.text or "").strip() == product_name:
-                element.click()
-                return True
-        # Attempt limited scrolls to find matching element
-        for _ in range(4):
-            swipe(self.driver, 500, 1600, 500, 600)
-            elements = self.driver.find_elements(*self.PRODUCT_TITLE)
-            for element in elements:
-                if (element.text or "").strip() == product_name:
-                    element.click()
-                    return True
-        return False
+    def open_product_by_name(self, product_name: str) -> str:
+        """Open a product's details page; returns the search strategy that found it."""
+        # Only the first lookup waits for the list to render; the search itself never blocks.
+        poll_elements(self.driver, self.PRODUCT_TITLE, self.LIST_RENDER_TIMEOUT)
+        result = find_by_text(self.driver, TextQuery(product_name, description=self.PRODUCT_TITLE[1]))
+        result.element.click()
+        self.invalidate_snapshot()
+        return result.strategy
@@ -0,0 +1,164 @@
+"""
+Put the app into a declared state (user, cart contents, screen) by the fastest available route.
+
+``deep_link``
+    One ``mobile: deepLink`` command such as ``swaglabs://cart/0,1`` opens the target screen
+    with the cart already filled and skips the login screen. It is only used for the default
+    user, because the link cannot say who is signed in, and the app is logged out first unless
+    it is known to be signed in as that user already.
+``ui``
+    Fallback: log in, empty the cart, add each product from its detail screen, then navigate
+    with :mod:`pages.navigation`. Screens the graph cannot reach from the cart (the checkout
+    overview needs shipping details) are declined before any of that work starts.
+
+:func:`seed_state` returns the mechanism that was used. A driver that rejects deep links
+(no such mobile command, or no app handling the scheme) is not offered them again.
+Set ``FRAMEWORK_DEEP_LINKS=0`` to always seed through the UI.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Set, Tuple
+from weakref import WeakKeyDictionary
+
+from selenium.common.exceptions import WebDriverException
+
+from pages.login_page import LoginPage
+from pages.login_state import remember, signed_in_as
+from pages.navigation import (
+    CART,
+    CHECKOUT_COMPLETE,
+    CHECKOUT_INFO,
+    CHECKOUT_OVERVIEW,
+    LOGIN,
+    NavigationError,
+    PRODUCTS,
+    SWAG_LABS,
+    current_screen,
+    navigate_to,
+)
+from pages.product_detail_page import ProductDetailPage
+from utils.logger import get_logger
+from utils.timings import ACTION, timed
+
+LOGGER = get_logger(__name__)
+
+DEEP_LINK, UI = "deep_link", "ui"
+MECHANISMS = (DEEP_LINK, UI)
+DEEP_LINKS_ENV = "FRAMEWORK_DEEP_LINKS"
+DEEP_LINK_SCHEME = "swaglabs"
+DEEP_LINK_USERS = (LoginPage.DEFAULT_USERNAME,)
+# Screen a link opens -> link route; the product ids after the route become the cart.
+DEEP_LINK_ROUTES: Dict[str, str] = {
+    PRODUCTS: "swag-overview",
+    CART: "cart",
+    CHECKOUT_INFO: "personal-info",
+    CHECKOUT_OVERVIEW: "checkout-overview",
+}
+
+_UNSUPPORTED: "WeakKeyDictionary[object, Set[str]]" = WeakKeyDictionary()
+
+
+@dataclass(frozen=True)
+class CartItem:
+    name: str
+    product_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class AppState:
+    """Signed in as ``user`` with exactly ``cart`` in the cart, showing ``screen``."""
+
+    user: str = LoginPage.DEFAULT_USERNAME
+    cart: Tuple[CartItem, ...] = ()
+    screen: str = PRODUCTS
+
+    @classmethod
+    def from_cart_payload(cls, payload: Dict, screen: str = CART) -> "AppState":
+        """State for a ``MobileApiClient.build_cart_payload()`` result."""
+        items = tuple(CartItem(product["name"], product.get("id")) for product in payload["products"])
+        return cls(user=payload["user"], cart=items, screen=screen)
+
+
+def deep_links_enabled() -> bool:
+    return os.environ.get(DEEP_LINKS_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def deep_link_url(state: AppState) -> Optional[str]:
+    """The link that opens ``state`` directly, or ``None`` when no link can express it."""
+    if state.user not in DEEP_LINK_USERS or state.screen == LOGIN:
+        return None
+    if any(item.product_id is None for item in state.cart):
+        return None
+    if state.screen == CHECKOUT_COMPLETE:
+        # Finishing an order empties the cart, so the link carries no ids.
+        return f"{DEEP_LINK_SCHEME}://complete"
+    # Screens without a route of their own are reached by navigating from the products screen.
+    route = DEEP_LINK_ROUTES.get(state.screen, DEEP_LINK_ROUTES[PRODUCTS])
+    return f"{DEEP_LINK_SCHEME}://{route}/" + ",".join(str(item.product_id) for item in state.cart)
+
+
+def _app_package(driver) -> Optional[str]:
+    capabilities = getattr(driver, "capabilities", None) or {}
+    return capabilities.get("appium:appPackage") or capabilities.get("appPackage")
+
+
+def _seed_by_deep_link(driver, state: AppState) -> bool:
+    url = deep_link_url(state)
+    if url is None:
+        return False
+    if signed_in_as(driver) != state.user and current_screen(driver) != LOGIN:
+        # The link keeps whoever is signed in, so sign out an unknown or different user first.
+        navigate_to(driver, LOGIN)
+    LOGGER.info("Seeding state via deep link %s", url)
+    try:
+        driver.execute_script("mobile: deepLink", {"url": url, "package": _app_package(driver)})
+    except WebDriverException as exc:
+        LOGGER.info("Deep link rejected, seeding through the UI instead: %s", exc.msg)
+        _UNSUPPORTED.setdefault(driver, set()).add(DEEP_LINK)
+        return False
+    # From the login screen the link signs in as the default user, which is the only one it serves.
+    remember(driver, state.user)
+    navigate_to(driver, state.screen)
+    return True
+
+
+def _seed_by_ui(driver, state: AppState) -> bool:
+    try:
+        SWAG_LABS.route(CART, state.screen)
+    except NavigationError as exc:
+        LOGGER.info("Cannot seed %s through the UI: %s", state.screen, exc)
+        return False
+    LOGGER.info("Seeding state through the UI: %s with %d cart item(s)", state.user, len(state.cart))
+    # Logging out first is the only way to be sure which user is signed in.
+    navigate_to(driver, LOGIN)
+    LoginPage(driver).login(state.user)
+    remember(driver, state.user)
+    cart_page = navigate_to(driver, CART)
+    while cart_page.has_items():
+        cart_page.remove_first_item()
+    for item in state.cart:
+        products_page = navigate_to(driver, PRODUCTS)
+        products_page.open_product_by_name(item.name)
+        detail_page = ProductDetailPage(driver)
+        detail_page.wait_until_loaded()
+        detail_page.add_to_cart()
+    navigate_to(driver, state.screen)
+    return True
+
+
+_SEEDERS = {DEEP_LINK: _seed_by_deep_link, UI: _seed_by_ui}
+
+
+def seed_state(driver, state: AppState, mechanisms: Sequence[str] = MECHANISMS) -> str:
+    """Reach ``state`` with the first mechanism that can; returns the mechanism used."""
+    unsupported = _UNSUPPORTED.setdefault(driver, set())
+    for mechanism in mechanisms:
+        if mechanism in unsupported or (mechanism == DEEP_LINK and not deep_links_enabled()):
+            continue
+        with timed(ACTION, "seed_state", mechanism):
+            if _SEEDERS[mechanism](driver, state):
+                return mechanism
+    raise NavigationError(f"None of {list(mechanisms)} could seed {state}")
@@ -0,0 +1,5 @@
+"""Localhost stand-in for an Appium server serving a scripted SwagLabs UI."""
+
+from stub_server.server import StubAppiumServer, StubConfig, StubError, start_stub_server
+
+__all__ = ["StubAppiumServer", "StubConfig", "StubError", "start_stub_server"]
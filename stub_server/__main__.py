@@ -0,0 +1,35 @@
+"""Run the stub server in the foreground: ``python -m stub_server --port 4723``."""
+
+import argparse
+import time
+
+from stub_server.server import StubConfig, start_stub_server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a scripted SwagLabs UI over the W3C WebDriver protocol.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4723)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency added to every command")
+    parser.add_argument("--flakiness", type=float, default=0.0, help="Probability that a command fails")
+    parser.add_argument("--render-delay-ms", type=float, default=0.0, help="Blank frames after each transition")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        default_latency=args.latency_ms / 1000,
+        default_flakiness=args.flakiness,
+        render_delay=args.render_delay_ms / 1000,
+        seed=args.seed,
+    )
+    server = start_stub_server(config, args.host, args.port)
+    print(f"Stub Appium server listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,514 @@
+"""
+Scripted SwagLabs-like app: a small state machine that renders its current screen as a
+:class:`~stub_server.ui_tree.UiNode` tree using the accessibility ids from ``pages/*.py``.
+
+Element keys are semantic (``products.item.1.add``) so an element stays valid while it is on
+screen, and goes stale once a transition removes it, just like on a device.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from stub_server.ui_tree import UiNode
+
+APP_PACKAGE = "com.swaglabsmobileapp"
+VALID_PASSWORD = "secret_sauce"
+KNOWN_USERS = ("standard_user", "locked_out_user", "problem_user", "performance_glitch_user")
+
+# Mirrors ``appium`` app states.
+APP_STATE_NOT_RUNNING = 1
+APP_STATE_RUNNING_IN_FOREGROUND = 4
+
+# ``swaglabs://<route>/<ids>`` deep links of the sample app; they open signed in, without the login screen.
+DEEP_LINK_SCHEME = "swaglabs"
+DEEP_LINK_ROUTES = {
+    "swag-overview": "products",
+    "swag-item": "detail",
+    "cart": "cart",
+    "personal-info": "checkout",
+    "checkout-overview": "overview",
+    "complete": "complete",
+}
+
+HEADER_HEIGHT = 260
+LIST_TOP = 420
+ITEM_HEIGHT = 460
+
+
+@dataclass(frozen=True)
+class CatalogItem:
+    item_id: int
+    name: str
+    price: str
+    description: str
+
+
+CATALOG = (
+    CatalogItem(0, "Sauce Labs Backpack", "$29.99", "carry.allTheThings() with the sleek, streamlined Sly Pack"),
+    CatalogItem(1, "Sauce Labs Bike Light", "$9.99", "A red light that puts the joy back in night riding"),
+    CatalogItem(2, "Sauce Labs Bolt T-Shirt", "$15.99", "Run your tests in style with the Bolt Tee"),
+    CatalogItem(3, "Sauce Labs Fleece Jacket", "$49.99", "A midweight quarter-zip fleece jacket"),
+    CatalogItem(4, "Sauce Labs Onesie", "$7.99", "Rib snap infant onesie for the junior automation engineer"),
+    CatalogItem(5, "Test.allTheThings() T-Shirt (Red)", "$15.99", "This classic Sauce Labs t-shirt is perfect"),
+)
+
+
+@dataclass
+class AppData:
+    """Data that survives app restarts until ``mobile: clearApp`` (or a ``noReset=false`` session)."""
+
+    cart: List[int] = field(default_factory=list)
+
+
+class SwagLabsApp:
+    """Current screen, navigation stack and per-screen state of the stub app."""
+
+    def __init__(self, width: int = 1080, height: int = 2400, render_delay: float = 0.0, glitch_delay: float = 1.5):
+        self.width = width
+        self.height = height
+        self.render_delay = render_delay
+        self.glitch_delay = glitch_delay
+        self.data = AppData()
+        self.state = APP_STATE_NOT_RUNNING
+        self.screen = "login"
+        self._reset_ui()
+
+    # -- lifecycle -----------------------------------------------------------------------
+
+    def _reset_ui(self) -> None:
+        self.screen = "login"
+        self.back_stack: List[str] = []
+        self.user: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+        self.error: Optional[str] = None
+        self.menu_open = False
+        self.scroll_offset = 0
+        self.detail_item: Optional[int] = None
+        self._ready_at = 0.0
+
+    def launch(self) -> None:
+        if self.state != APP_STATE_RUNNING_IN_FOREGROUND:
+            self._reset_ui()
+            self.state = APP_STATE_RUNNING_IN_FOREGROUND
+
+    def terminate(self) -> bool:
+        was_running = self.state != APP_STATE_NOT_RUNNING
+        self.state = APP_STATE_NOT_RUNNING
+        return was_running
+
+    def clear_data(self) -> None:
+        self.terminate()
+        self.data = AppData()
+
+    # -- navigation ----------------------------------------------------------------------
+
+    def navigate(self, screen: str, push: bool = True, delay: Optional[float] = None) -> None:
+        if screen != self.screen:
+            # Like an unmounted form, a screen's inputs are gone once it is left.
+            self.fields = {key: value for key, value in self.fields.items() if not key.startswith(f"{self.screen}.")}
+        if push and screen != self.screen:
+            self.back_stack.append(self.screen)
+        self.screen = screen
+        self.error = None
+        self.menu_open = False
+        pause = self.render_delay if delay is None else delay
+        self._ready_at = time.monotonic() + pause if pause > 0 else 0.0
+
+    def open_deep_link(self, url: str) -> None:
+        """Open ``swaglabs://<route>/<ids>``; the ids become the cart (or the item for ``swag-item``)."""
+        parsed = urlparse(url)
+        screen = DEEP_LINK_ROUTES.get(parsed.netloc)
+        if parsed.scheme != DEEP_LINK_SCHEME or screen is None:
+            raise ValueError(f"No activity handles {url!r}")
+        try:
+            ids = [int(part) for part in parsed.path.strip("/").split(",") if part]
+        except ValueError:
+            raise ValueError(f"Malformed product ids in {url!r}") from None
+        if any(not 0 <= item_id < len(CATALOG) for item_id in ids):
+            raise ValueError(f"Unknown product id in {url!r}")
+        self.launch()
+        self.user = self.user or KNOWN_USERS[0]
+        if screen == "detail":
+            self.detail_item = ids[0] if ids else 0
+        elif screen != "complete":
+            self.data.cart = ids
+        self.scroll_offset = 0
+        self.navigate(screen, push=False)
+        self.back_stack = [] if screen in ("products", "complete") else ["products"]
+
+    def back(self) -> None:
+        if self.menu_open:
+            self.menu_open = False
+            return
+        if self.screen in ("products", "login", "complete") or not self.back_stack:
+            return
+        self.navigate(self.back_stack.pop(), push=False)
+
+    @property
+    def rendering(self) -> bool:
+        return self._ready_at > time.monotonic()
+
+    def max_scroll(self) -> int:
+        content = LIST_TOP + ITEM_HEIGHT * len(CATALOG)
+        return max(content - self.height, 0)
+
+    def scroll_by(self, delta: int) -> bool:
+        """Scroll the product list; returns False when already at that end of the list."""
+        if self.screen != "products" or self.menu_open:
+            return False
+        target = min(max(self.scroll_offset + delta, 0), self.max_scroll())
+        moved = target != self.scroll_offset
+        self.scroll_offset = target
+        return moved
+
+    # -- input ---------------------------------------------------------------------------
+
+    def set_field(self, key: str, value: str) -> None:
+        self.fields[key] = value
+
+    def field(self, key: str) -> str:
+        return self.fields.get(key, "")
+
+    def _login(self) -> None:
+        username, password = self.field("login.username"), self.field("login.password")
+        if not username:
+            self.error = "Username is required"
+        elif not password:
+            self.error = "Password is required"
+        elif username == "locked_out_user" and password == VALID_PASSWORD:
+            self.error = "Sorry, this user has been locked out."
+        elif username not in KNOWN_USERS or password != VALID_PASSWORD:
+            self.error = "Username and password do not match any user in this service."
+        else:
+            self.user = username
+            self.fields.clear()
+            delay = self.glitch_delay if username == "performance_glitch_user" else None
+            self.navigate("products", push=False, delay=delay)
+            self.back_stack.clear()
+
+    def _logout(self) -> None:
+        self._reset_ui()
+
+    def _toggle_cart(self, item_id: int) -> None:
+        if item_id in self.data.cart:
+            self.data.cart.remove(item_id)
+        else:
+            self.data.cart.append(item_id)
+
+    def _open_detail(self, item_id: int) -> None:
+        self.detail_item = item_id
+        self.navigate("detail")
+
+    def _continue_checkout(self) -> None:
+        for key, label in (
+            ("checkout.first_name", "First Name"),
+            ("checkout.last_name", "Last Name"),
+            ("checkout.postal_code", "Postal Code"),
+        ):
+            if not self.field(key):
+                self.error = f"{label} is required"
+                return
+        self.navigate("overview")
+
+    def _finish(self) -> None:
+        self.data.cart.clear()
+        self.navigate("complete")
+        self.back_stack.clear()
+
+    # -- rendering -----------------------------------------------------------------------
+
+    def render(self) -> "RenderedScreen":
+        screen = RenderedScreen(self)
+        if self.state != APP_STATE_RUNNING_IN_FOREGROUND:
+            return screen.launcher()
+        if self.rendering:
+            return screen.loading()
+        return screen.build()
+
+
+class RenderedScreen:
+    """One frame: the view tree plus the click handlers for its keyed nodes."""
+
+    def __init__(self, app: SwagLabsApp):
+        self.app = app
+        self.actions: Dict[str, Callable[[], None]] = {}
+        self.inputs: Dict[str, str] = {}
+        self.root = UiNode("android.widget.FrameLayout", key="root", bounds=(0, 0, app.width, app.height))
+
+    # -- node factories ------------------------------------------------------------------
+
+    def _button(self, key: str, desc: str, label: str, top: int, action: Callable[[], None], height: int = 140) -> UiNode:
+        bounds = (60, top, self.app.width - 60, top + height)
+        self.actions[key] = action
+        return UiNode(
+            "android.view.ViewGroup", key=key, content_desc=desc, bounds=bounds, clickable=True, focusable=True
+        ).add(UiNode("android.widget.TextView", key=f"{key}.label", text=label, bounds=bounds))
+
+    def _input(self, key: str, desc: str, hint: str, top: int, password: bool = False) -> UiNode:
+        value = self.app.field(key)
+        shown = ("•" * len(value) if password else value) or hint
+        self.inputs[key] = desc
+        return UiNode(
+            "android.widget.EditText",
+            key=key,
+            content_desc=desc,
+            text=shown,
+            bounds=(60, top, self.app.width - 60, top + 140),
+            clickable=True,
+            focusable=True,
+            password=password,
+        )
+
+    def _text(self, key: str, text: str, top: int, desc: str = "", height: int = 80) -> UiNode:
+        return UiNode(
+            "android.widget.TextView", key=key, text=text, content_desc=desc, bounds=(60, top, self.app.width - 60, top + height)
+        )
+
+    def _error(self, top: int) -> Optional[UiNode]:
+        if not self.app.error:
+            return None
+        bounds = (60, top, self.app.width - 60, top + 120)
+        return UiNode("android.view.ViewGroup", key="error", content_desc="test-Error message", bounds=bounds).add(
+            UiNode("android.widget.TextView", key="error.text", text=self.app.error, bounds=bounds)
+        )
+
+    def _header(self) -> UiNode:
+        app = self.app
+        header = UiNode("android.view.ViewGroup", key="header", bounds=(0, 0, app.width, HEADER_HEIGHT))
+        self.actions["header.menu"] = self._open_menu
+        self.actions["header.cart"] = lambda: app.navigate("cart")
+        header.add(
+            UiNode(
+                "android.view.ViewGroup",
+                key="header.menu",
+                content_desc="test-Menu",
+                bounds=(20, 60, 200, 220),
+                clickable=True,
+            ).add(UiNode("android.widget.ImageView", key="header.menu.icon", bounds=(50, 90, 170, 190))),
+        )
+        cart = UiNode(
+            "android.view.ViewGroup",
+            key="header.cart",
+            content_desc="test-Cart",
+            bounds=(app.width - 200, 60, app.width - 20, 220),
+            clickable=True,
+        )
+        cart.add(UiNode("android.widget.ImageView", key="header.cart.icon", bounds=(app.width - 170, 90, app.width - 50, 190)))
+        if app.data.cart:
+            cart.add(
+                UiNode(
+                    "android.widget.TextView",
+                    key="header.cart.badge",
+                    content_desc="test-Cart badge",
+                    text=str(len(app.data.cart)),
+                    bounds=(app.width - 90, 70, app.width - 30, 130),
+                )
+            )
+        header.add(cart)
+        return header
+
+    def _open_menu(self) -> None:
+        self.app.menu_open = True
+
+    # -- screens -------------------------------------------------------------------------
+
+    def launcher(self) -> "RenderedScreen":
+        self.root.add(UiNode("android.widget.TextView", key="launcher", text="Home", bounds=(0, 0, 0, 0)))
+        return self
+
+    def loading(self) -> "RenderedScreen":
+        self.root.add(UiNode("android.widget.ProgressBar", key="loading", bounds=(440, 1100, 640, 1300)))
+        return self
+
+    def build(self) -> "RenderedScreen":
+        getattr(self, f"_screen_{self.app.screen}")()
+        if self.app.menu_open and self.app.screen != "login":
+            self.root.add(self._menu())
+        return self
+
+    def _screen_login(self) -> None:
+        app = self.app
+        form = UiNode("android.widget.ScrollView", key="login", content_desc="test-Login", bounds=(0, 0, app.width, app.height))
+        form.add(
+            self._input("login.username", "test-Username", "Username", 900),
+            self._input("login.password", "test-Password", "Password", 1080, password=True),
+            self._button("login.submit", "test-LOGIN", "LOGIN", 1260, app._login),
+        )
+        error = self._error(1440)
+        if error:
+            form.add(error)
+        self.root.add(form)
+
+    def _screen_products(self) -> None:
+        app = self.app
+        self.root.add(self._header())
+        self.root.add(self._text("products.title", "PRODUCTS", HEADER_HEIGHT + 20))
+        drop_zone = UiNode(
+            "android.view.ViewGroup", key="products.zone", content_desc="test-Cart drop zone", bounds=(0, LIST_TOP, app.width, app.height)
+        )
+        listing = UiNode(
+            "android.widget.ScrollView",
+            key="products.list",
+            content_desc="test-PRODUCTS",
+            bounds=(0, LIST_TOP, app.width, app.height),
+            scrollable=True,
+        )
+        for item in CATALOG:
+            top = LIST_TOP + item.item_id * ITEM_HEIGHT - app.scroll_offset
+            bottom = top + ITEM_HEIGHT
+            # Like a RecyclerView, only rows overlapping the viewport exist in the hierarchy.
+            if bottom <= LIST_TOP or top >= app.height:
+                continue
+            listing.add(self._product_row(item, max(top, LIST_TOP), min(bottom, app.height), top))
+        drop_zone.add(listing)
+        self.root.add(drop_zone)
+
+    def _product_row(self, item: CatalogItem, top: int, bottom: int, origin: int) -> UiNode:
+        app = self.app
+        key = f"products.item.{item.item_id}"
+        self.actions[key] = lambda: app._open_detail(item.item_id)
+        self.actions[f"{key}.title"] = self.actions[key]
+        row = UiNode("android.view.ViewGroup", key=key, content_desc="test-Item", bounds=(0, top, app.width, bottom), clickable=True)
+        title_top, price_top, button_top = origin + 40, origin + 140, origin + 260
+        if LIST_TOP <= title_top < app.height:
+            row.add(
+                UiNode(
+                    "android.widget.TextView",
+                    key=f"{key}.title",
+                    content_desc="test-Item title",
+                    text=item.name,
+                    bounds=(60, title_top, app.width - 60, title_top + 80),
+                )
+            )
+        if LIST_TOP <= price_top < app.height:
+            row.add(self._text(f"{key}.price", item.price, price_top, desc="test-Price"))
+        if LIST_TOP <= button_top and button_top + 140 <= app.height:
+            in_cart = item.item_id in app.data.cart
+            row.add(
+                self._button(
+                    f"{key}.{'remove' if in_cart else 'add'}",
+                    "test-REMOVE" if in_cart else "test-ADD TO CART",
+                    "REMOVE" if in_cart else "ADD TO CART",
+                    button_top,
+                    lambda: app._toggle_cart(item.item_id),
+                )
+            )
+        return row
+
+    def _menu(self) -> UiNode:
+        app = self.app
+        menu = UiNode("android.view.ViewGroup", key="menu", content_desc="test-Menu items", bounds=(0, 0, app.width * 3 // 4, app.height))
+        self.actions["menu.close"] = lambda: setattr(app, "menu_open", False)
+        self.actions["menu.all"] = lambda: setattr(app, "menu_open", False)
+        menu.add(
+            self._button("menu.close", "test-Close", "X", 80, self.actions["menu.close"]),
+            self._button("menu.all", "test-ALL ITEMS", "ALL ITEMS", 300, self.actions["menu.all"]),
+            self._button("menu.logout", "test-Logout", "LOGOUT", 480, app._logout),
+        )
+        return menu
+
+    def _screen_detail(self) -> None:
+        app = self.app
+        item = CATALOG[app.detail_item or 0]
+        self.root.add(self._header())
+        self.root.add(self._button("detail.back", "test-BACK TO PRODUCTS", "BACK TO PRODUCTS", HEADER_HEIGHT + 20, app.back))
+        body = UiNode("android.widget.ScrollView", key="detail.body", bounds=(0, 460, app.width, app.height), scrollable=True)
+        body.add(
+            UiNode("android.widget.ImageView", key="detail.image", bounds=(60, 480, app.width - 60, 1180)),
+            self._text("detail.title", item.name, 1220, desc="test-Item title"),
+            UiNode(
+                "android.view.ViewGroup", key="detail.description", content_desc="test-Description", bounds=(60, 1320, app.width - 60, 1500)
+            ).add(self._text("detail.description.text", item.description, 1320, height=180)),
+            self._text("detail.price", item.price, 1540, desc="test-Price"),
+        )
+        in_cart = item.item_id in app.data.cart
+        body.add(
+            self._button(
+                "detail.remove" if in_cart else "detail.add",
+                "test-REMOVE" if in_cart else "test-ADD TO CART",
+                "REMOVE" if in_cart else "ADD TO CART",
+                1660,
+                lambda: app._toggle_cart(item.item_id),
+            )
+        )
+        self.root.add(body)
+
+    def _screen_cart(self) -> None:
+        app = self.app
+        self.root.add(self._header())
+        self.root.add(self._text("cart.title", "YOUR CART", HEADER_HEIGHT + 20))
+        listing = UiNode("android.widget.ScrollView", key="cart.list", bounds=(0, LIST_TOP, app.width, app.height - 400), scrollable=True)
+        for position, item_id in enumerate(app.data.cart[:4]):
+            item = CATALOG[item_id]
+            top = LIST_TOP + position * 360
+            key = f"cart.item.{item_id}"
+            listing.add(
+                UiNode("android.view.ViewGroup", key=key, content_desc="test-Item", bounds=(0, top, app.width, top + 340)).add(
+                    self._text(f"{key}.title", item.name, top + 20, desc="test-Item title"),
+                    self._text(f"{key}.price", item.price, top + 110, desc="test-Price"),
+                    self._button(f"{key}.remove", "test-REMOVE", "REMOVE", top + 200, lambda i=item_id: app._toggle_cart(i), height=120),
+                )
+            )
+        self.root.add(listing)
+        self.root.add(
+            self._button("cart.continue", "test-CONTINUE SHOPPING", "CONTINUE SHOPPING", app.height - 380, app.back),
+            self._button("cart.checkout", "test-CHECKOUT", "CHECKOUT", app.height - 200, lambda: app.navigate("checkout")),
+        )
+
+    def _screen_checkout(self) -> None:
+        app = self.app
+        self.root.add(self._header())
+        self.root.add(self._text("checkout.title", "CHECKOUT: INFORMATION", HEADER_HEIGHT + 20))
+        form = UiNode("android.widget.ScrollView", key="checkout.form", content_desc="test-Checkout: Your Info", bounds=(0, LIST_TOP, app.width, app.height))
+        form.add(
+            self._input("checkout.first_name", "test-First Name", "First Name", 480),
+            self._input("checkout.last_name", "test-Last Name", "Last Name", 660),
+            self._input("checkout.postal_code", "test-Zip/Postal Code", "Zip/Postal Code", 840),
+        )
+        error = self._error(1020)
+        if error:
+            form.add(error)
+        form.add(
+            self._button("checkout.cancel", "test-CANCEL", "CANCEL", 1200, app.back),
+            self._button("checkout.continue", "test-CONTINUE", "CONTINUE", 1380, app._continue_checkout),
+        )
+        self.root.add(form)
+
+    def _screen_overview(self) -> None:
+        app = self.app
+        self.root.add(self._header())
+        self.root.add(self._text("overview.title", "CHECKOUT: OVERVIEW", HEADER_HEIGHT + 20))
+        summary = UiNode("android.widget.ScrollView", key="overview.list", content_desc="test-CHECKOUT: OVERVIEW", bounds=(0, LIST_TOP, app.width, app.height))
+        for position, item_id in enumerate(app.data.cart[:3]):
+            item = CATALOG[item_id]
+            top = LIST_TOP + position * 240
+            summary.add(
+                UiNode("android.view.ViewGroup", key=f"overview.item.{item_id}", content_desc="test-Item", bounds=(0, top, app.width, top + 220)).add(
+                    self._text(f"overview.item.{item_id}.title", item.name, top + 20),
+                    self._text(f"overview.item.{item_id}.price", item.price, top + 110, desc="test-Price"),
+                )
+            )
+        total = sum(float(CATALOG[item_id].price.lstrip("$")) for item_id in app.data.cart)
+        summary.add(
+            self._text("overview.total", f"Item total: ${total:.2f}", 1260),
+            self._button("overview.cancel", "test-CANCEL", "CANCEL", 1420, app.back),
+            self._button("overview.finish", "test-FINISH", "FINISH", 1600, app._finish),
+        )
+        self.root.add(summary)
+
+    def _screen_complete(self) -> None:
+        app = self.app
+        self.root.add(self._header())
+        done = UiNode(
+            "android.widget.ScrollView", key="complete", content_desc="test-CHECKOUT: COMPLETE!", bounds=(0, LIST_TOP, app.width, app.height)
+        )
+        done.add(
+            self._text("complete.title", "CHECKOUT: COMPLETE!", 480),
+            self._text("complete.thanks", "THANK YOU FOR YOU ORDER", 620),
+            self._button("complete.home", "test-BACK HOME", "BACK HOME", 900, lambda: app.navigate("products", push=False)),
+        )
+        self.root.add(done)
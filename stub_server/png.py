@@ -0,0 +1,59 @@
+"""Dependency-free PNG renderer that paints element bounds so screenshots change with the UI."""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Dict, Tuple
+
+from stub_server.ui_tree import UiNode
+
+Color = Tuple[int, int, int]
+BACKGROUND: Color = (245, 245, 245)
+CLASS_COLORS: Dict[str, Color] = {
+    "android.view.ViewGroup": (226, 35, 26),
+    "android.widget.EditText": (255, 255, 255),
+    "android.widget.TextView": (72, 76, 85),
+    "android.widget.ImageView": (132, 38, 192),
+    "android.widget.ProgressBar": (19, 35, 34),
+    "android.widget.ScrollView": (238, 238, 238),
+}
+
+
+def render_png(root: UiNode, width: int, height: int, scale: int = 4) -> bytes:
+    """Paint every displayed node's bounds (children over parents) at ``1/scale`` resolution."""
+    out_width, out_height = max(width // scale, 1), max(height // scale, 1)
+    rows = [bytearray(bytes(BACKGROUND) * out_width) for _ in range(out_height)]
+
+    for node in root.walk():
+        if node is root or not node.displayed:
+            continue
+        color = CLASS_COLORS.get(node.class_name)
+        if color is None or (node.class_name == "android.view.ViewGroup" and not node.clickable):
+            continue
+        left, top, right, bottom = (value // scale for value in node.bounds)
+        left, right = max(left, 0), min(right, out_width)
+        top, bottom = max(top, 0), min(bottom, out_height)
+        if right <= left or bottom <= top:
+            continue
+        if node.class_name == "android.widget.TextView" and node.text:
+            # Text renders as a bar whose length follows the copy, so different labels differ visually.
+            right = min(left + max(len(node.text) * 4, 4), right)
+            top, bottom = top + (bottom - top) // 3, bottom - (bottom - top) // 3
+        fill = bytes(color) * (right - left)
+        for y in range(top, max(bottom, top + 1)):
+            rows[y][left * 3:right * 3] = fill
+
+    raw = b"".join(b"\x00" + bytes(row) for row in rows)
+    return b"".join(
+        (
+            b"\x89PNG\r\n\x1a\n",
+            _chunk(b"IHDR", struct.pack(">IIBBBBB", out_width, out_height, 8, 2, 0, 0, 0)),
+            _chunk(b"IDAT", zlib.compress(raw, 6)),
+            _chunk(b"IEND", b""),
+        )
+    )
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
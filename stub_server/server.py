@@ -0,0 +1,535 @@
+"""
+Localhost W3C WebDriver endpoint that drives :class:`SwagLabsApp` instead of a device.
+
+Only the routes the framework uses are served (sessions, timeouts, element lookup and
+interaction, page source, screenshots, back, W3C actions and ``mobile:`` execute
+commands). Each command can be given extra latency and a failure rate so waits, retries
+and the AI fallback can be exercised deterministically on a plain Linux box.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from stub_server.app_model import APP_PACKAGE, SwagLabsApp
+from stub_server.png import render_png
+from stub_server.ui_tree import KEY_ATTRIBUTE, find_by_key, render_xml
+from utils.logger import get_logger
+from utils.page_snapshot import PageSnapshot
+
+LOGGER = get_logger(__name__)
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+FIND_COMMANDS = ("find_element", "find_elements", "find_child_element", "find_child_elements")
+_SCROLL_INTO_VIEW = re.compile(r"^new UiScrollable\(.*?\)\.scrollIntoView\((new UiSelector\(\).*)\)\s*;?\s*$", re.S)
+
+
+class StubError(Exception):
+    """W3C error response: ``error`` code plus HTTP status."""
+
+    def __init__(self, error: str, message: str, status: int = 500):
+        super().__init__(message)
+        self.error = error
+        self.status = status
+
+
+@dataclass
+class StubConfig:
+    """Per-command latency (seconds) and failure probability; keys are command names."""
+
+    latency: Dict[str, float] = field(default_factory=dict)
+    default_latency: float = 0.0
+    flakiness: Dict[str, float] = field(default_factory=dict)
+    default_flakiness: float = 0.0
+    render_delay: float = 0.0
+    seed: Optional[int] = None
+    width: int = 1080
+    height: int = 2400
+    screenshot_scale: int = 4
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "StubConfig":
+        """Build from the ``stub_server`` section of ``config.yaml`` (latencies in milliseconds)."""
+        data = dict(data or {})
+        latency = {name: float(ms) / 1000 for name, ms in (data.pop("latency_ms", None) or {}).items()}
+        flakiness = {name: float(rate) for name, rate in (data.pop("flakiness", None) or {}).items()}
+        render_delay_ms = data.pop("render_delay_ms", 0)
+        return cls(
+            latency=latency,
+            default_latency=latency.pop("default", 0.0),
+            flakiness=flakiness,
+            default_flakiness=flakiness.pop("default", 0.0),
+            render_delay=float(render_delay_ms) / 1000,
+            **{key: value for key, value in data.items() if key in ("seed", "width", "height", "screenshot_scale")},
+        )
+
+    def latency_for(self, command: str) -> float:
+        return self.latency.get(command, self.default_latency)
+
+    def flakiness_for(self, command: str) -> float:
+        return self.flakiness.get(command, self.default_flakiness)
+
+
+@dataclass
+class StubSession:
+    session_id: str
+    capabilities: Dict[str, Any]
+    implicit_wait: float = 0.0
+
+
+MobileCommand = Callable[["StubAppiumServer", Dict[str, Any]], Any]
+
+
+class StubAppiumServer:
+    """Owns the stub device (one app instance shared by every session) and the HTTP server."""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StubConfig()
+        self.app = SwagLabsApp(self.config.width, self.config.height, render_delay=self.config.render_delay)
+        self.sessions: Dict[str, StubSession] = {}
+        self.command_counts: Dict[str, int] = {}
+        self.lock = threading.RLock()
+        self._random = random.Random(self.config.seed)
+        self._mobile_commands: Dict[str, MobileCommand] = dict(DEFAULT_MOBILE_COMMANDS)
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubAppiumServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-appium", daemon=True)
+            self._thread.start()
+            LOGGER.info("Stub Appium server listening on %s", self.url)
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubAppiumServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def register_mobile_command(self, name: str, handler: MobileCommand) -> None:
+        """Serve ``driver.execute_script("mobile: <name>", args)`` with ``handler(server, args)``."""
+        self._mobile_commands[name] = handler
+
+    # -- command plumbing ----------------------------------------------------------------
+
+    def dispatch(self, method: str, path: str, body: Dict[str, Any]) -> Any:
+        command, handler, params = self._route(method, path)
+        with self.lock:
+            self.command_counts[command] = self.command_counts.get(command, 0) + 1
+        delay = self.config.latency_for(command)
+        if delay > 0:
+            time.sleep(delay)
+        if self._random.random() < self.config.flakiness_for(command):
+            if command == "find_elements" or command == "find_child_elements":
+                return []
+            if command in FIND_COMMANDS:
+                raise StubError("no such element", f"Injected flaky failure for {command}", 404)
+            raise StubError("unknown error", f"Injected flaky failure for {command}")
+        if "session_id" in params and params["session_id"] not in self.sessions:
+            raise StubError("invalid session id", f"Session {params['session_id']} does not exist", 404)
+        return handler(body, **params)
+
+    def _route(self, method: str, path: str) -> Tuple[str, Callable[..., Any], Dict[str, str]]:
+        for route_method, pattern, command, name in _ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match:
+                return command, getattr(self, name), match.groupdict()
+        raise StubError("unknown command", f"Unhandled route {method} {path}", 404)
+
+    # -- sessions ------------------------------------------------------------------------
+
+    def status(self, body) -> Dict[str, Any]:
+        return {"ready": True, "message": "stub appium server ready", "build": {"version": "stub"}}
+
+    def new_session(self, body) -> Dict[str, Any]:
+        requested = (body.get("capabilities") or {}).get("alwaysMatch") or {}
+        capabilities = {"platformName": "Android", "appium:appPackage": APP_PACKAGE, **requested}
+        session = StubSession(session_id=uuid.uuid4().hex, capabilities=capabilities)
+        with self.lock:
+            if not capabilities.get("appium:noReset", False):
+                self.app.clear_data()
+            self.app.terminate()
+            self.app.launch()
+            self.sessions[session.session_id] = session
+        LOGGER.debug("Stub session %s created", session.session_id)
+        return {"sessionId": session.session_id, "capabilities": capabilities}
+
+    def delete_session(self, body, session_id: str) -> None:
+        self.sessions.pop(session_id, None)
+
+    def set_timeouts(self, body, session_id: str) -> None:
+        if body.get("implicit") is not None:
+            self.sessions[session_id].implicit_wait = float(body["implicit"]) / 1000
+
+    def get_timeouts(self, body, session_id: str) -> Dict[str, int]:
+        return {"implicit": int(self.sessions[session_id].implicit_wait * 1000), "pageLoad": 300000, "script": 30000}
+
+    # -- element lookup ------------------------------------------------------------------
+
+    def find_element(self, body, session_id: str) -> Dict[str, str]:
+        return self._first(self._find(session_id, body, None))
+
+    def find_elements(self, body, session_id: str) -> List[Dict[str, str]]:
+        return [_element_ref(key) for key in self._find(session_id, body, None, wait=True)]
+
+    def find_child_element(self, body, session_id: str, element_id: str) -> Dict[str, str]:
+        return self._first(self._find(session_id, body, element_id))
+
+    def find_child_elements(self, body, session_id: str, element_id: str) -> List[Dict[str, str]]:
+        return [_element_ref(key) for key in self._find(session_id, body, element_id, wait=True)]
+
+    def _first(self, keys: List[str]) -> Dict[str, str]:
+        if not keys:
+            raise StubError("no such element", "An element could not be located on the page using the given search parameters.", 404)
+        return _element_ref(keys[0])
+
+    def _find(self, session_id: str, body: Dict[str, Any], parent_id: Optional[str], wait: bool = True) -> List[str]:
+        strategy, value = body.get("using"), body.get("value", "")
+        deadline = time.monotonic() + self.sessions[session_id].implicit_wait
+        while True:
+            with self.lock:
+                keys = self._query(strategy, value, parent_id)
+            if keys or not wait or time.monotonic() >= deadline:
+                return keys
+            time.sleep(0.05)
+
+    def _query(self, strategy: str, value: str, parent_id: Optional[str]) -> List[str]:
+        if strategy == "-android uiautomator":
+            scroll = _SCROLL_INTO_VIEW.match(value.strip())
+            if scroll:
+                return self._scroll_into_view(scroll.group(1))
+
+        snapshot = self._keyed_snapshot()
+        nodes = snapshot.find_all((strategy, value))
+        if nodes is None:
+            raise StubError("invalid selector", f"Unsupported locator strategy {strategy!r} with value {value!r}", 400)
+        if parent_id is not None:
+            parent = next((node for node in snapshot.nodes if node.get(KEY_ATTRIBUTE) == parent_id), None)
+            if parent is None:
+                raise _stale(parent_id)
+            nodes = [node for node in nodes if _is_descendant(snapshot, node, parent.index)]
+        return [node.get(KEY_ATTRIBUTE) for node in nodes if node.get(KEY_ATTRIBUTE)]
+
+    def _scroll_into_view(self, selector: str) -> List[str]:
+        app = self.app
+        original = app.scroll_offset
+        for offset in [original] + list(range(0, app.max_scroll() + 1, 200)) + [app.max_scroll()]:
+            app.scroll_offset = offset
+            keys = self._query("-android uiautomator", selector, None)
+            if keys:
+                return keys[:1]
+        app.scroll_offset = original
+        return []
+
+    def _keyed_snapshot(self) -> PageSnapshot:
+        frame = self.app.render()
+        return PageSnapshot(render_xml(frame.root, APP_PACKAGE, self.app.width, self.app.height, with_keys=True))
+
+    def _resolve(self, element_id: str):
+        frame = self.app.render()
+        node = find_by_key(frame.root, element_id)
+        if node is None:
+            raise _stale(element_id)
+        return frame, node
+
+    # -- element interaction -------------------------------------------------------------
+
+    def click(self, body, session_id: str, element_id: str) -> None:
+        with self.lock:
+            frame, node = self._resolve(element_id)
+            if not node.enabled:
+                return
+            key = element_id
+            # Taps bubble up to the nearest clickable container, as on Android.
+            while key and key not in frame.actions:
+                key = key.rpartition(".")[0]
+            action = frame.actions.get(key) if key else None
+            if action:
+                action()
+
+    def send_keys(self, body, session_id: str, element_id: str) -> None:
+        text = body.get("text")
+        if text is None:
+            text = "".join(body.get("value") or [])
+        with self.lock:
+            frame, node = self._resolve(element_id)
+            if element_id not in frame.inputs:
+                raise StubError("element not interactable", f"Element {element_id} does not accept text input", 400)
+            self.app.set_field(element_id, self.app.field(element_id) + text)
+
+    def clear(self, body, session_id: str, element_id: str) -> None:
+        with self.lock:
+            frame, _ = self._resolve(element_id)
+            if element_id in frame.inputs:
+                self.app.set_field(element_id, "")
+
+    def element_text(self, body, session_id: str, element_id: str) -> str:
+        with self.lock:
+            return self._resolve(element_id)[1].text
+
+    def element_attribute(self, body, session_id: str, element_id: str, name: str) -> Optional[str]:
+        with self.lock:
+            node = self._resolve(element_id)[1]
+        attributes = node.attributes(0, APP_PACKAGE)
+        aliases = {"name": "content-desc", "contentDescription": "content-desc", "resourceId": "resource-id", "className": "class"}
+        value = attributes.get(aliases.get(name, name))
+        return value if value != "" or name == "text" else None
+
+    def element_displayed(self, body, session_id: str, element_id: str) -> bool:
+        with self.lock:
+            return self._resolve(element_id)[1].displayed
+
+    def element_enabled(self, body, session_id: str, element_id: str) -> bool:
+        with self.lock:
+            return self._resolve(element_id)[1].enabled
+
+    def element_selected(self, body, session_id: str, element_id: str) -> bool:
+        with self.lock:
+            self._resolve(element_id)
+        return False
+
+    def element_name(self, body, session_id: str, element_id: str) -> str:
+        with self.lock:
+            return self._resolve(element_id)[1].class_name
+
+    def element_rect(self, body, session_id: str, element_id: str) -> Dict[str, int]:
+        with self.lock:
+            left, top, right, bottom = self._resolve(element_id)[1].bounds
+        return {"x": left, "y": top, "width": right - left, "height": bottom - top}
+
+    # -- screen --------------------------------------------------------------------------
+
+    def page_source(self, body, session_id: str) -> str:
+        with self.lock:
+            frame = self.app.render()
+        return render_xml(frame.root, APP_PACKAGE, self.app.width, self.app.height)
+
+    def screenshot(self, body, session_id: str) -> str:
+        with self.lock:
+            frame = self.app.render()
+        png = render_png(frame.root, self.app.width, self.app.height, self.config.screenshot_scale)
+        return base64.b64encode(png).decode("ascii")
+
+    def back(self, body, session_id: str) -> None:
+        with self.lock:
+            self.app.back()
+
+    def window_rect(self, body, session_id: str) -> Dict[str, int]:
+        return {"x": 0, "y": 0, "width": self.app.width, "height": self.app.height}
+
+    def perform_actions(self, body, session_id: str) -> None:
+        """Interpret a single-finger W3C pointer sequence as a tap or a vertical swipe."""
+        for source in body.get("actions") or []:
+            if source.get("type") != "pointer":
+                continue
+            points = [(step.get("x"), step.get("y")) for step in source.get("actions", []) if step.get("type") == "pointerMove"]
+            points = [(int(x), int(y)) for x, y in points if x is not None and y is not None]
+            if len(points) < 2:
+                continue
+            (_, start_y), (_, end_y) = points[0], points[-1]
+            with self.lock:
+                self.app.scroll_by(start_y - end_y)
+
+    def release_actions(self, body, session_id: str) -> None:
+        return None
+
+    def execute(self, body, session_id: str) -> Any:
+        script = (body.get("script") or "").strip()
+        args = body.get("args") or []
+        if not script.startswith("mobile:"):
+            raise StubError("unsupported operation", f"Only 'mobile:' scripts are supported, got {script!r}")
+        name = script.split(":", 1)[1].strip()
+        handler = self._mobile_commands.get(name)
+        if handler is None:
+            raise StubError("unsupported operation", f"Unsupported mobile command {name!r}")
+        with self.lock:
+            return handler(self, args[0] if args and isinstance(args[0], dict) else {})
+
+
+def _element_ref(key: str) -> Dict[str, str]:
+    return {ELEMENT_KEY: key, "ELEMENT": key}
+
+
+def _stale(element_id: str) -> StubError:
+    return StubError("stale element reference", f"Element {element_id} is no longer attached to the page", 404)
+
+
+def _is_descendant(snapshot: PageSnapshot, node, ancestor_index: int) -> bool:
+    current = node.parent
+    while current is not None:
+        if current == ancestor_index:
+            return True
+        current = snapshot.nodes[current].parent
+    return False
+
+
+def _require_package(args: Dict[str, Any]) -> str:
+    package = args.get("appId") or args.get("bundleId") or args.get("package")
+    if package != APP_PACKAGE:
+        raise StubError("invalid argument", f"App {package!r} is not installed", 400)
+    return package
+
+
+def _clear_app(server: StubAppiumServer, args: Dict[str, Any]) -> None:
+    _require_package(args)
+    server.app.clear_data()
+
+
+def _terminate_app(server: StubAppiumServer, args: Dict[str, Any]) -> bool:
+    _require_package(args)
+    return server.app.terminate()
+
+
+def _activate_app(server: StubAppiumServer, args: Dict[str, Any]) -> None:
+    _require_package(args)
+    server.app.launch()
+
+
+def _query_app_state(server: StubAppiumServer, args: Dict[str, Any]) -> int:
+    _require_package(args)
+    return server.app.state
+
+
+def _deep_link(server: StubAppiumServer, args: Dict[str, Any]) -> None:
+    _require_package(args)
+    try:
+        server.app.open_deep_link(str(args.get("url") or ""))
+    except ValueError as exc:
+        raise StubError("invalid argument", str(exc), 400) from None
+
+
+def _swipe_gesture(server: StubAppiumServer, args: Dict[str, Any]) -> bool:
+    distance = int(server.app.height * float(args.get("percent", 0.5)))
+    direction = (args.get("direction") or "up").lower()
+    return server.app.scroll_by(distance if direction == "up" else -distance)
+
+
+def _scroll_gesture(server: StubAppiumServer, args: Dict[str, Any]) -> bool:
+    distance = int(server.app.height * float(args.get("percent", 0.5)))
+    direction = (args.get("direction") or "down").lower()
+    # Returns True while more content remains, matching UiAutomator2's scrollGesture.
+    server.app.scroll_by(distance if direction == "down" else -distance)
+    return 0 < server.app.scroll_offset < server.app.max_scroll()
+
+
+DEFAULT_MOBILE_COMMANDS: Dict[str, MobileCommand] = {
+    "clearApp": _clear_app,
+    "terminateApp": _terminate_app,
+    "activateApp": _activate_app,
+    "queryAppState": _query_app_state,
+    "deepLink": _deep_link,
+    "getCurrentPackage": lambda server, args: APP_PACKAGE,
+    "swipeGesture": _swipe_gesture,
+    "scrollGesture": _scroll_gesture,
+    "pressKey": lambda server, args: server.app.back() if int(args.get("keycode", 0)) == 4 else None,
+}
+
+_SESSION = r"/session/(?P<session_id>[^/]+)"
+_ELEMENT = _SESSION + r"/element/(?P<element_id>[^/]+)"
+_ROUTES = [
+    (method, re.compile(f"^{pattern}/?$"), command, name)
+    for method, pattern, command, name in (
+        ("GET", r"/status", "status", "status"),
+        ("POST", r"/session", "new_session", "new_session"),
+        ("DELETE", _SESSION, "delete_session", "delete_session"),
+        ("POST", _SESSION + r"/timeouts", "set_timeouts", "set_timeouts"),
+        ("GET", _SESSION + r"/timeouts", "get_timeouts", "get_timeouts"),
+        ("POST", _SESSION + r"/element", "find_element", "find_element"),
+        ("POST", _SESSION + r"/elements", "find_elements", "find_elements"),
+        ("POST", _ELEMENT + r"/element", "find_element", "find_child_element"),
+        ("POST", _ELEMENT + r"/elements", "find_elements", "find_child_elements"),
+        ("POST", _ELEMENT + r"/click", "click", "click"),
+        ("POST", _ELEMENT + r"/value", "send_keys", "send_keys"),
+        ("POST", _ELEMENT + r"/clear", "clear", "clear"),
+        ("GET", _ELEMENT + r"/text", "get_text", "element_text"),
+        ("GET", _ELEMENT + r"/attribute/(?P<name>[^/]+)", "get_attribute", "element_attribute"),
+        ("GET", _ELEMENT + r"/displayed", "is_displayed", "element_displayed"),
+        ("GET", _ELEMENT + r"/enabled", "is_enabled", "element_enabled"),
+        ("GET", _ELEMENT + r"/selected", "is_selected", "element_selected"),
+        ("GET", _ELEMENT + r"/name", "get_tag_name", "element_name"),
+        ("GET", _ELEMENT + r"/rect", "get_rect", "element_rect"),
+        ("GET", _SESSION + r"/source", "page_source", "page_source"),
+        ("GET", _SESSION + r"/screenshot", "screenshot", "screenshot"),
+        ("POST", _SESSION + r"/back", "back", "back"),
+        ("GET", _SESSION + r"/window/rect", "window_rect", "window_rect"),
+        ("POST", _SESSION + r"/actions", "actions", "perform_actions"),
+        ("DELETE", _SESSION + r"/actions", "actions", "release_actions"),
+        ("POST", _SESSION + r"/execute/sync", "execute", "execute"),
+    )
+]
+
+
+def _make_handler(server: StubAppiumServer):
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without TCP_NODELAY every response waits on delayed ACKs.
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            LOGGER.debug("stub %s", format % args)
+
+        def _handle(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else {}
+                path = self.path.split("?", 1)[0]
+                for prefix in ("/wd/hub",):
+                    if path.startswith(prefix):
+                        path = path[len(prefix):]
+                value = server.dispatch(method, path, body if isinstance(body, dict) else {})
+                self._send(200, {"value": value})
+            except StubError as exc:
+                self._send(exc.status, {"value": {"error": exc.error, "message": str(exc), "stacktrace": ""}})
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.exception("Stub server failed handling %s %s", method, self.path)
+                self._send(500, {"value": {"error": "unknown error", "message": str(exc), "stacktrace": ""}})
+
+        def _send(self, status: int, payload: Dict[str, Any]) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):  # noqa: N802
+            self._handle("GET")
+
+        def do_POST(self):  # noqa: N802
+            self._handle("POST")
+
+        def do_DELETE(self):  # noqa: N802
+            self._handle("DELETE")
+
+    return _Handler
+
+
+def start_stub_server(config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0) -> StubAppiumServer:
+    """Start a stub server on a background thread (``port=0`` picks a free port)."""
+    return StubAppiumServer(config, host, port).start()
@@ -0,0 +1,95 @@
+"""Minimal Android-style view tree rendered to UiAutomator2-like page source XML."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import quoteattr
+
+Bounds = Tuple[int, int, int, int]
+KEY_ATTRIBUTE = "stub-key"
+
+
+@dataclass
+class UiNode:
+    class_name: str
+    key: str = ""
+    content_desc: str = ""
+    text: str = ""
+    resource_id: str = ""
+    bounds: Bounds = (0, 0, 0, 0)
+    clickable: bool = False
+    enabled: bool = True
+    displayed: bool = True
+    focusable: bool = False
+    scrollable: bool = False
+    password: bool = False
+    children: List["UiNode"] = field(default_factory=list)
+
+    def add(self, *children: "UiNode") -> "UiNode":
+        self.children.extend(children)
+        return self
+
+    def walk(self) -> Iterator["UiNode"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def attributes(self, index: int, package: str) -> Dict[str, str]:
+        left, top, right, bottom = self.bounds
+        return {
+            "index": str(index),
+            "package": package,
+            "class": self.class_name,
+            "text": self.text,
+            "resource-id": self.resource_id,
+            "content-desc": self.content_desc,
+            "checkable": "false",
+            "checked": "false",
+            "clickable": _flag(self.clickable),
+            "enabled": _flag(self.enabled),
+            "focusable": _flag(self.focusable),
+            "focused": "false",
+            "long-clickable": "false",
+            "password": _flag(self.password),
+            "scrollable": _flag(self.scrollable),
+            "selected": "false",
+            "bounds": f"[{left},{top}][{right},{bottom}]",
+            "displayed": _flag(self.displayed),
+        }
+
+
+def _flag(value: bool) -> str:
+    return "true" if value else "false"
+
+
+def render_xml(root: UiNode, package: str, width: int, height: int, with_keys: bool = False) -> str:
+    """Serialize the tree the way UiAutomator2 does; ``with_keys`` adds internal element keys."""
+    lines = [
+        "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>",
+        f'<hierarchy index="0" class="hierarchy" rotation="0" width="{width}" height="{height}">',
+    ]
+    _render_node(root, 0, package, with_keys, lines, depth=1)
+    lines.append("</hierarchy>")
+    return "\n".join(lines)
+
+
+def _render_node(node: UiNode, index: int, package: str, with_keys: bool, lines: List[str], depth: int) -> None:
+    attrs = node.attributes(index, package)
+    if with_keys:
+        attrs[KEY_ATTRIBUTE] = node.key
+    rendered = " ".join(f"{name}={quoteattr(value)}" for name, value in attrs.items())
+    indent = "  " * depth
+    if not node.children:
+        lines.append(f"{indent}<{node.class_name} {rendered} />")
+        return
+    lines.append(f"{indent}<{node.class_name} {rendered}>")
+    for child_index, child in enumerate(node.children):
+        _render_node(child, child_index, package, with_keys, lines, depth + 1)
+    lines.append(f"{indent}</{node.class_name}>")
+
+
+def find_by_key(root: UiNode, key: str) -> Optional[UiNode]:
+    if not key:
+        return None
+    return next((node for node in root.walk() if node.key == key), None)
@@ -1,28 +1,188 @@
+import os
+
 import pytest
+import yaml
+from selenium.common.exceptions import WebDriverException
 
-from utils.driver_manager import get_driver, quit_driver
+from pages.login_page import LoginPage
+from pages.login_state import LOGGED_OUT, forget, login_reuse_enabled, restore_login
+from pages.navigation import NavigationError
+from pages.products_page import ProductsPage
+from utils.artifact_store import get_artifact_store
+from utils.driver_manager import APPIUM_SERVER_URL_ENV, CONFIG_PATH, DriverManager, get_session_pool
 from utils.helpers import attach_screenshot
 from utils.logger import get_logger
+from utils.screenshot_writer import flush_screenshots
+from utils.test_scheduling import DurationSchedulePlugin, duration_schedule_requested
+from utils.timings import (
+    clear_timings,
+    enable_timings,
+    enabled_from_env,
+    format_summary,
+    load_spans,
+    set_current_test,
+    timings_enabled,
+    write_timings,
+)
 
 LOGGER = get_logger(__name__)
+STUB_SERVER_ENV = "FRAMEWORK_STUB_SERVER"
+STUB_SERVER_KEY = pytest.StashKey()
 
 
 def pytest_addoption(parser):
     parser.addoption("--env", action="store", default="qa", help="Target test environment")
     parser.addoption("--platform", action="store", default="android", help="Mobile platform to run against")
+    parser.addoption(
+        "--stub-server",
+        action="store_true",
+        default=False,
+        help="Run against the in-process stub Appium server instead of a real device",
+    )
+    parser.addoption(
+        "--timings",
+        action="store_true",
+        default=False,
+        help="Record per-command/per-step timings and print a summary (also FRAMEWORK_TIMINGS=1)",
+    )
+    parser.addoption(
+        "--duration-schedule",
+        action="store_true",
+        default=False,
+        help="Under xdist, run historically longest tests first and keep starting_state groups on one worker "
+        "(also FRAMEWORK_DURATION_SCHEDULE=1)",
+    )
+
+
+def _stub_server_requested(config) -> bool:
+    if config.getoption("--stub-server"):
+        return True
+    return os.environ.get(STUB_SERVER_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _is_xdist_controller(config) -> bool:
+    return not hasattr(config, "workerinput") and bool(config.getoption("numprocesses", default=None))
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(
+        DurationSchedulePlugin(config, schedule=duration_schedule_requested(config)), "duration-schedule"
+    )
+    if config.getoption("--timings") or enabled_from_env():
+        enable_timings()
+        if not hasattr(config, "workerinput"):
+            clear_timings()
+    if not hasattr(config, "workerinput"):
+        _enforce_artifact_retention()
+    # Under xdist the controller never drives a device; each worker starts its own stub.
+    if _stub_server_requested(config) and not _is_xdist_controller(config):
+        _start_stub_server(config)
+
+
+def _enforce_artifact_retention() -> None:
+    store = get_artifact_store()
+    if store is not None:
+        store.enforce_retention()
+
+
+def _start_stub_server(config) -> None:
+    from stub_server import StubConfig, start_stub_server  # local import keeps device runs free of it
+
+    settings = {}
+    if CONFIG_PATH.exists():
+        with CONFIG_PATH.open("r", encoding="utf-8") as config_file:
+            settings = (yaml.safe_load(config_file) or {}).get("stub_server") or {}
+    server = start_stub_server(StubConfig.from_dict(settings))
+    os.environ[APPIUM_SERVER_URL_ENV] = server.url
+    config.stash[STUB_SERVER_KEY] = server
+    LOGGER.info("Running against stub Appium server at %s", server.url)
+
+
+def pytest_unconfigure(config):
+    server = config.stash.get(STUB_SERVER_KEY, None)
+    if server is not None:
+        server.stop()
+
+
+@pytest.fixture
+def stub_server():
+    """A seeded stub Appium server for tests that drive the scripted app directly."""
+    from stub_server import StubConfig, start_stub_server
+
+    server = start_stub_server(StubConfig(seed=7))
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def stub_driver(stub_server):
+    """A fresh (unpooled) session against :func:`stub_server`."""
+    with DriverManager(server_url=stub_server.url) as driver_instance:
+        yield driver_instance
+
+
+def _starting_user(request):
+    """User from ``@pytest.mark.starting_state``; ``None`` when unmarked or logged out."""
+    marker = request.node.get_closest_marker("starting_state")
+    state = marker.args[0] if marker and marker.args else None
+    return None if state in (None, LOGGED_OUT) else state
 
 
 @pytest.fixture(scope="function")
 def driver(request):
-    driver_instance = get_driver()
+    pool = get_session_pool()
+    # Tests that start signed in keep the app running and restore the login via `logged_in`.
+    keep_app_state = _starting_user(request) is not None and login_reuse_enabled()
+    driver_instance = pool.acquire(keep_app_state=keep_app_state)
     yield driver_instance
 
-    rep_call = getattr(request.node, "rep_call", None)
-    if rep_call and rep_call.failed:
-        LOGGER.error("Test %s failed. Capturing screenshot.", request.node.name)
-        attach_screenshot(driver_instance, name=request.node.name)
+    try:
+        rep_call = getattr(request.node, "rep_call", None)
+        if rep_call and rep_call.failed:
+            LOGGER.error("Test %s failed. Capturing screenshot.", request.node.name)
+            attach_screenshot(driver_instance, name=request.node.name)
+    finally:
+        # Screenshots are written in the background; attach them while this test is still current.
+        flush_screenshots()
+        pool.release(driver_instance)
+
+
+@pytest.fixture(scope="function")
+def logged_in(request, driver):
+    """Products page, signed in as the ``starting_state`` user (default ``standard_user``)."""
+    user = _starting_user(request) or LoginPage.DEFAULT_USERNAME
+    try:
+        restore_login(driver, user)
+    except (NavigationError, WebDriverException) as exc:
+        LOGGER.warning("Could not restore login state for %s, resetting the app: %s", user, exc)
+        forget(driver)
+        if not get_session_pool().reset_app():
+            raise
+        restore_login(driver, user)
+    return ProductsPage(driver)
+
+
+def pytest_runtest_logstart(nodeid, location):
+    set_current_test(nodeid)
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    set_current_test(None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    flush_screenshots(attach=False)
+    get_session_pool().close()
+    if timings_enabled() and not _is_xdist_controller(session.config):
+        write_timings()
+
 
-    quit_driver(driver_instance)
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not timings_enabled() or hasattr(config, "workerinput"):
+        return
+    terminalreporter.section("framework timings")
+    for line in format_summary(load_spans()):
+        terminalreporter.write_line(line)
 
 
 @pytest.hookimpl(hookwrapper=True)
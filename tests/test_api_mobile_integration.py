@@ -2,9 +2,8 @@ import pytest
 
 from mobile_api_ai_framework.api.client import MobileApiClient
 from pages.cart_page import CartPage
-from pages.login_page import LoginPage
-from pages.product_detail_page import ProductDetailPage
-from pages.products_page import ProductsPage
+from pages.navigation import CART
+from pages.state_seeding import AppState, seed_state
 from utils.logger import get_logger
 
 
@@ -14,32 +13,15 @@ class TestApiMobileIntegration:
         self.logger = get_logger(self.__class__.__name__)
         self.api_client = MobileApiClient()
 
-    def _login(self, driver):
-        login_page = LoginPage(driver)
-        login_page.login()
-        products_page = ProductsPage(driver)
-        assert products_page.is_loaded(), "Products screen not loaded after login"
-        return products_page
-
+    @pytest.mark.starting_state("standard_user")
     @pytest.mark.regression
     def test_api_prepared_cart_bundle(self, driver):
         bundle_payload = self.api_client.build_cart_payload()
         bundle_products = bundle_payload["products"]
 
-        products_page = self._login(driver)
-
-        for product in bundle_products:
-            products_page.open_product_by_name(product["name"])
-            detail_page = ProductDetailPage(driver)
-            detail_page.wait_until_loaded(timeout=20)
-            detail_page.add_to_cart()
-            try:
-                detail_page.click(("accessibility id", "test-CONTINUE SHOPPING"))
-            except Exception:  # pylint: disable=broad-except
-                detail_page.go_back_to_products()
-            products_page = ProductsPage(driver)
+        mechanism = seed_state(driver, AppState.from_cart_payload(bundle_payload, screen=CART))
+        self.logger.info("Cart bundle seeded via %s", mechanism)
 
-        products_page.go_to_cart()
         cart_page = CartPage(driver)
         cart_page.wait_for_items(timeout=20)
 
@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import perturbed_screenshot, synthetic_screenshot
+from utils.artifact_store import ArtifactSettings, ArtifactStore
+
+
+def _png(image):
+    return cv2.imencode(".png", image)[1].tobytes()
+
+
+class TestArtifactStore:
+    def test_near_duplicates_share_one_downscaled_object(self, tmp_path):
+        store = ArtifactStore(tmp_path / "store", ArtifactSettings(max_width=360))
+        screen = synthetic_screenshot(720, 1280)
+        cursor_blink = screen.copy()
+        cursor_blink[100:104, 100:102] = 0
+
+        first = store.put(_png(screen), tmp_path / "click_failure_1.json")
+        second = store.put(_png(cursor_blink), tmp_path / "test_case_1.json")
+        changed = store.put(_png(perturbed_screenshot(screen, patches=6)), tmp_path / "other_1.json")
+
+        assert not first.duplicate and second.duplicate and not changed.duplicate
+        assert second.path == first.path and first.path.suffix == ".webp"
+        assert cv2.imread(str(first.path)).shape[1] == 360
+        assert second.ref_path.exists()
+
+    def test_retention_evicts_by_age_and_size(self, tmp_path):
+        store = ArtifactStore(tmp_path / "store", ArtifactSettings(format="png", max_age_days=1))
+        rng = np.random.default_rng(3)
+        old = store.put(_png(rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)), tmp_path / "old.json")
+        new = store.put(_png(rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)), tmp_path / "new.json")
+        store._connection.execute("UPDATE objects SET last_used = last_used - 2 * 86400 WHERE digest=?", (old.digest,))
+
+        assert store.enforce_retention() == 1
+        assert not old.path.exists() and not old.ref_path.exists()
+        assert new.path.exists()
+
+        store.settings.max_total_mb = 0
+        assert store.enforce_retention() == 1 and store.total_bytes() == 0
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from benchmarks.fake_driver import FakeDriver
+from pages.base_page import BasePage
+from pages.login_page import LoginPage
+
+LOCKED_OUT_SCREEN = """<hierarchy rotation="0">
+<android.widget.FrameLayout class="android.widget.FrameLayout" bounds="[0,0][1080,2400]">
+  <android.view.ViewGroup class="android.view.ViewGroup" content-desc="test-Error" displayed="true" bounds="[0,900][1080,1000]">
+    <android.widget.TextView class="android.widget.TextView" text="Sorry, this user has been locked out." displayed="true" bounds="[0,900][1080,1000]" />
+  </android.view.ViewGroup>
+</android.widget.FrameLayout>
+</hierarchy>"""
+
+
+class _RecordingDriver(FakeDriver):
+    def __init__(self, page_source):
+        super().__init__(page_source)
+        self.probes = []
+
+    def find_elements(self, by, value):
+        self.probes.append((by, value))
+        return super().find_elements(by, value)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_win_counts(monkeypatch):
+    monkeypatch.setattr(BasePage, "_locator_wins", {})
+
+
+class TestWaitForAny:
+    def test_first_match_in_declaration_order_wins(self):
+        driver = _RecordingDriver(LOCKED_OUT_SCREEN)
+        element, winner = LoginPage(driver).wait_for_any(LoginPage.ERROR_LOCATORS, timeout=1)
+        assert winner == LoginPage.ERROR_BANNER
+        assert element.get_attribute("content-desc") == "test-Error"
+        assert driver.probes == [LoginPage.ERROR_MESSAGE_TEXT, LoginPage.ERROR_BANNER]
+
+    def test_winners_are_probed_first_next_time(self):
+        driver = _RecordingDriver(LOCKED_OUT_SCREEN)
+        page = LoginPage(driver)
+
+        def _has_copy(element):
+            return element.text.startswith("Sorry")
+
+        assert page.wait_for_any(LoginPage.ERROR_LOCATORS, timeout=1, condition=_has_copy)[1] == LoginPage.LOCKED_OUT_TEXT
+        assert page.locator_win_rates(LoginPage.ERROR_LOCATORS)[LoginPage.LOCKED_OUT_TEXT] == 1.0
+
+        driver.probes.clear()
+        assert page.wait_for_any(LoginPage.ERROR_LOCATORS, timeout=1)[1] == LoginPage.LOCKED_OUT_TEXT
+        assert driver.probes == [LoginPage.LOCKED_OUT_TEXT]
+        # Win counts are shared by every page object in the process.
+        assert LoginPage(driver)._order_by_wins(tuple(LoginPage.ERROR_LOCATORS))[0] == LoginPage.LOCKED_OUT_TEXT
+
+    def test_times_out_after_polling_every_candidate(self, monkeypatch):
+        driver = _RecordingDriver("<hierarchy />")
+        page = LoginPage(driver)
+        monkeypatch.setattr(page, "POLL_INTERVAL", 0.05)
+
+        started = time.monotonic()
+        with pytest.raises(TimeoutException):
+            page.wait_for_any(LoginPage.ERROR_LOCATORS, timeout=0.3)
+        assert 0.3 <= time.monotonic() - started < 1.5
+        assert len(driver.probes) >= 2 * len(LoginPage.ERROR_LOCATORS)
+        assert len(driver.probes) % len(LoginPage.ERROR_LOCATORS) == 0
+        assert page.locator_win_rates(LoginPage.ERROR_LOCATORS) == dict.fromkeys(LoginPage.ERROR_LOCATORS, 0.0)
@@ -0,0 +1,40 @@
+from benchmarks import suite  # noqa: F401  (registers the benchmarks)
+from benchmarks.__main__ import DEFAULT_BASELINE
+from benchmarks.harness import (
+    Benchmark,
+    BenchmarkResult,
+    compare,
+    load_baseline,
+    registered,
+    run_benchmark,
+    save_results,
+)
+
+
+def _result(name, median_ms, peak_kb=100.0):
+    return BenchmarkResult(name, median_ms, median_ms, 0.0, 10, 3, peak_kb)
+
+
+class TestBenchmarkHarness:
+    def test_run_benchmark_calibrates_and_measures_memory(self):
+        result = run_benchmark(Benchmark("alloc", lambda: lambda: bytearray(256 * 1024)), rounds=3, min_round_time=0.001)
+        assert result.iterations >= 1 and result.rounds == 3
+        assert result.median_ms > 0
+        assert result.peak_kb >= 256
+
+    def test_compare_flags_time_and_memory_regressions(self, tmp_path):
+        path = tmp_path / "baseline.json"
+        save_results([_result("fast", 1.0), _result("heavy", 1.0), _result("steady", 1.0)], path)
+        current = [_result("fast", 1.5), _result("heavy", 1.0, peak_kb=400.0), _result("steady", 1.05), _result("new", 2.0)]
+
+        outcome = {item.name: item for item in compare(current, load_baseline(path), threshold=0.15)}
+
+        assert outcome["fast"].regressed and outcome["fast"].notes == ["time +50%"]
+        assert outcome["heavy"].regressed and outcome["heavy"].notes == ["memory +300%"]
+        assert not outcome["steady"].regressed
+        assert not outcome["new"].regressed and outcome["new"].notes == ["new"]
+
+    def test_every_registered_benchmark_has_a_baseline(self):
+        # A benchmark without a baseline entry is reported as "new" and can never regress.
+        baseline = load_baseline(DEFAULT_BASELINE)["results"]
+        assert [bench.name for bench in registered(None) if bench.name not in baseline] == []
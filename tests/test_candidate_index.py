@@ -0,0 +1,46 @@
+import pytest
+
+from ai_locators.candidate_index import CandidateIndex
+from ai_locators.fallback_locator import AILocatorFallback
+from benchmarks.synthetic import fallback_queries, synthetic_page_source
+from utils.page_snapshot import PageSnapshot
+
+
+class TestCandidateIndex:
+    @pytest.mark.parametrize("seed", range(6))
+    @pytest.mark.parametrize("node_count", [60, 600])
+    def test_indexed_search_matches_exhaustive_ranking(self, seed, node_count):
+        fallback = AILocatorFallback(driver=None)
+        source = synthetic_page_source(node_count, seed=seed)
+        index = CandidateIndex(node.attributes for node in PageSnapshot(source).nodes)
+
+        for primary, description in fallback_queries():
+            queries = fallback._build_queries(primary, description)
+            expected = fallback._search_dom_exhaustive(source, queries)
+            match = index.search(queries, fallback.MIN_SIMILARITY)
+
+            if expected is None:
+                assert match is None
+                continue
+            node, score = match
+            assert score == expected.score
+            assert node.attributes == expected.attributes
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_rank_returns_exact_top_n(self, seed):
+        fallback = AILocatorFallback(driver=None)
+        snapshot = PageSnapshot(synthetic_page_source(400, seed=seed))
+        index = CandidateIndex(node.attributes for node in snapshot.nodes)
+
+        for primary, description in fallback_queries():
+            queries = fallback._build_queries(primary, description)
+            expected = sorted(
+                (
+                    (fallback._score_candidate(node.attributes, queries), node.position)
+                    for node in index.nodes
+                ),
+                key=lambda item: (-item[0], item[1]),
+            )
+            expected = [item for item in expected if item[0] >= fallback.MIN_SIMILARITY][:5]
+            ranked = index.rank(queries, fallback.MIN_SIMILARITY, limit=5)
+            assert [(score, node.position) for node, score in ranked] == expected
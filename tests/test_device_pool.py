@@ -0,0 +1,73 @@
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from utils.device_pool import DeviceScheduler, DeviceUnavailableError, load_registry
+
+REGISTRY = """
+ports:
+  system_port: 8200
+devices:
+  - {udid: emulator-5554, server_url: "http://127.0.0.1:4723"}
+  - {udid: emulator-5556, server_url: "http://127.0.0.1:4723", chromedriver_port: 9600}
+"""
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    registry = tmp_path / "devices.yaml"
+    registry.write_text(REGISTRY, encoding="utf-8")
+    return DeviceScheduler(load_registry(registry), lock_dir=tmp_path / "locks")
+
+
+class TestDevicePool:
+    def test_registry_allocates_ports_and_rejects_duplicates(self, scheduler, tmp_path):
+        first, second = scheduler.devices
+        assert (first.system_port, second.system_port) == (8200, 8201)
+        assert (first.chromedriver_port, second.chromedriver_port) == (9515, 9600)
+        capabilities = second.apply_to({"appium:deviceName": "Android Emulator"})
+        assert capabilities["appium:udid"] == "emulator-5556"
+        assert capabilities["appium:systemPort"] == 8201
+
+        duplicate = tmp_path / "duplicate.yaml"
+        duplicate.write_text("devices:\n  - {udid: a, system_port: 8300}\n  - {udid: b, system_port: 8300}\n")
+        with pytest.raises(ValueError, match="system_port 8300"):
+            load_registry(duplicate)
+
+    def test_workers_lease_distinct_devices(self, scheduler):
+        first = scheduler.lease("gw0", timeout=0)
+        second = scheduler.lease("gw0", timeout=0)
+        assert {first.device.udid, second.device.udid} == {"emulator-5554", "emulator-5556"}
+        with pytest.raises(DeviceUnavailableError):
+            scheduler.lease("gw2", timeout=0)
+
+        first.release()
+        assert scheduler.lease("gw2", timeout=0).device.udid == first.device.udid
+        assert scheduler.holders()[second.device.udid]["worker"] == "gw0"
+
+    def test_lease_is_released_when_the_holder_crashes(self, scheduler):
+        script = textwrap.dedent(
+            f"""
+            import sys, time
+            from pathlib import Path
+            from utils.device_pool import DeviceScheduler
+            scheduler = DeviceScheduler({scheduler.devices!r}, lock_dir=Path({str(scheduler.lock_dir)!r}))
+            leases = [scheduler.lease("gw9", timeout=0) for _ in scheduler.devices]
+            print("leased", flush=True)
+            time.sleep(60)
+            """
+        )
+        holder = subprocess.Popen(
+            [sys.executable, "-c", "from utils.device_pool import DeviceSpec\n" + script],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            assert holder.stdout.readline().strip() == "leased"
+            assert scheduler.try_lease("gw0") is None
+        finally:
+            holder.kill()
+            holder.wait()
+        assert scheduler.lease("gw0", timeout=0).device.udid == "emulator-5554"
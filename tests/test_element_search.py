@@ -0,0 +1,37 @@
+from appium.webdriver.common.appiumby import AppiumBy
+
+from pages.login_page import LoginPage
+from pages.product_detail_page import ProductDetailPage
+from pages.products_page import ProductsPage
+from utils import gestures
+from utils.element_search import CLIENT_SCAN, UISCROLLABLE, XPATH, TextQuery, compile_query, find_by_text
+
+LAST_PRODUCT = "Test.allTheThings() T-Shirt (Red)"
+
+
+class TestElementSearch:
+    def test_queries_compile_to_single_locators(self):
+        query = TextQuery('Say "hi"', description="test-Item title")
+        assert compile_query(query, UISCROLLABLE) == (
+            AppiumBy.ANDROID_UIAUTOMATOR,
+            "new UiScrollable(new UiSelector().scrollable(true).instance(0))"
+            '.scrollIntoView(new UiSelector().description("test-Item title").text("Say \\"hi\\""))',
+        )
+        assert compile_query(query, XPATH) == (AppiumBy.XPATH, "//*[@content-desc='test-Item title'][@text='Say \"hi\"']")
+        assert compile_query(TextQuery("it's", exact=False), XPATH)[1] == '//*[contains(@text, "it\'s")]'
+        assert compile_query(query, CLIENT_SCAN) is None
+
+    def test_device_side_search_wins_and_client_scan_is_the_fallback(self, stub_server, stub_driver):
+        LoginPage(stub_driver).login()
+        before = stub_server.command_counts.get("find_elements", 0)
+        assert ProductsPage(stub_driver).open_product_by_name(LAST_PRODUCT) == UISCROLLABLE
+        # One render poll plus the single UiScrollable query.
+        assert stub_server.command_counts["find_elements"] - before == 2
+        assert ProductDetailPage(stub_driver).is_title_displayed(LAST_PRODUCT)
+
+        stub_driver.back()
+        gestures.scroll_until(stub_driver, lambda snapshot: None, direction="up")
+        result = find_by_text(stub_driver, TextQuery(LAST_PRODUCT, description="test-Item title"), (XPATH, CLIENT_SCAN))
+        assert result.strategy == CLIENT_SCAN
+        assert result.attempts[0] == (XPATH, "not found")
+        assert result.element.text == LAST_PRODUCT
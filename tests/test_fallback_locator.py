@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from ai_locators.fallback_locator import AILocatorFallback, LocatorCandidate
+from ai_locators.healing_cache import HealingCache
+from pages import base_page
+from pages.base_page import FALLBACK_RACE_ENV
+from pages.login_page import LoginPage
+from pages.products_page import ProductsPage
+from utils.page_snapshot import PageSnapshot
+
+DETAIL_SCREEN = """<hierarchy rotation="0">
+<android.widget.FrameLayout class="android.widget.FrameLayout" bounds="[0,0][1080,2400]">
+  <android.view.ViewGroup class="android.view.ViewGroup" content-desc="test-Cart" clickable="true" enabled="true" displayed="true" bounds="[900,100][1000,200]">
+    <android.widget.ImageView class="android.widget.ImageView" clickable="false" displayed="true" bounds="[900,100][1000,200]" />
+  </android.view.ViewGroup>
+  <android.view.ViewGroup class="android.view.ViewGroup" content-desc="test-BACK TO PRODUCTS" clickable="true" enabled="true" displayed="true" bounds="[0,300][500,400]">
+    <android.widget.TextView class="android.widget.TextView" text="BACK TO PRODUCTS" clickable="false" displayed="true" bounds="[0,300][500,400]" />
+  </android.view.ViewGroup>
+  <android.widget.EditText class="android.widget.EditText" content-desc="test-Username v2" clickable="true" enabled="true" displayed="true" bounds="[0,700][1080,800]" />
+  <android.widget.TextView class="android.widget.TextView" content-desc="test-Price" text="$29.99" clickable="false" displayed="true" bounds="[0,500][500,600]" />
+</android.widget.FrameLayout>
+</hierarchy>"""
+
+
+class TestFallbackGuard:
+    def setup_method(self):
+        self.fallback = AILocatorFallback(driver=None)
+        self.snapshot = PageSnapshot(DETAIL_SCREEN)
+
+    def test_low_confidence_click_heal_is_rejected(self):
+        candidate = self.fallback.search_snapshot(
+            self.snapshot, ("accessibility id", "test-ADD TO CART"), "product details add to cart", "click"
+        )
+        assert candidate is None
+
+    def test_label_and_container_count_as_one_tap_target(self):
+        candidate = self.fallback.search_snapshot(
+            self.snapshot, ("accessibility id", "test-BACK TO PRODUCT"), "back to products", "click"
+        )
+        assert candidate is not None
+        assert candidate.locator == ("accessibility id", "test-BACK TO PRODUCTS")
+
+    def test_type_heal_only_considers_editable_fields(self):
+        candidate = self.fallback.search_snapshot(
+            self.snapshot, ("accessibility id", "test-Username"), "login username", "type"
+        )
+        assert candidate is not None
+        assert candidate.locator == ("accessibility id", "test-Username v2")
+        assert self.fallback.search_snapshot(self.snapshot, ("accessibility id", "test-Price"), "price", "type") is None
+
+
+class TestRacingFallback:
+    @pytest.fixture(autouse=True)
+    def _racing(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(FALLBACK_RACE_ENV, "1")
+        self.cache = HealingCache(tmp_path / "heal.sqlite")
+        monkeypatch.setattr(base_page, "get_healing_cache", lambda: self.cache)
+
+    def test_renamed_element_heals_after_miss_cycles_and_primary_budget(self, stub_server, stub_driver):
+        page = LoginPage(stub_driver)
+        renamed = ("accessibility id", "test-LOGIN v0")
+        polls = stub_server.command_counts.get("page_source", 0)
+
+        started = time.monotonic()
+        page.click(renamed, timeout=2, description="login button")
+        elapsed = time.monotonic() - started
+
+        assert 2 * base_page.BasePage.RACE_PRIMARY_BUDGET <= elapsed < 2
+        assert stub_server.command_counts["page_source"] - polls >= base_page.BasePage.RACE_MISS_CYCLES
+        healed = self.cache.get(*page._heal_key(renamed, "login button"))
+        assert healed and stub_driver.find_elements(*healed)
+        assert stub_server.app.error == "Username is required"
+
+    def test_late_primary_wins_over_an_available_candidate(self, monkeypatch, stub_driver):
+        # performance_glitch_user shows blank frames for a while before the products screen renders.
+        LoginPage(stub_driver).login("performance_glitch_user")
+        page = ProductsPage(stub_driver)
+        candidate = LocatorCandidate(ProductsPage.MENU_BUTTON, 0.99, {})
+        monkeypatch.setattr(page.ai_locator, "search_snapshot", lambda *args: candidate)
+
+        assert page._race_for_locator(ProductsPage.CART_ICON, "cart", timeout=10) == ProductsPage.CART_ICON
+        assert len(self.cache) == 0
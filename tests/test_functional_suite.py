@@ -21,12 +21,14 @@ class TestFunctionalSuite:
         assert products_page.is_loaded(), "Expected inventory screen to be visible after login"
         return login_page, products_page
 
+    @pytest.mark.starting_state("logged_out")
     @pytest.mark.smoke
     def test_login_successful(self, driver):
         """Validate a standard user can sign into the app."""
         _, products_page = self._perform_login(driver)
         assert products_page.is_loaded()
 
+    @pytest.mark.starting_state("logged_out")
     @pytest.mark.regression
     def test_login_negative_locked_out_user(self, driver):
         """Ensure locked out user receives inline error messaging."""
@@ -37,20 +39,21 @@ class TestFunctionalSuite:
         error_message = login_page.get_error_message(timeout=5).lower()
         assert "locked out" in error_message
 
+    @pytest.mark.starting_state("standard_user")
     @pytest.mark.regression
-    def test_logout_flow(self, driver):
+    def test_logout_flow(self, driver, logged_in):
         """User can log out via menu and return to login screen."""
         login_page = LoginPage(driver)
-        login_page.login()
         home_page = HomePage(driver)
         assert home_page.is_user_logged_in(), "Expected user to be logged in before logout"
         home_page.logout()
         assert login_page.is_visible(LoginPage.LOGIN_BUTTON, description="login button"), "Expected to see login screen after logout"
 
+    @pytest.mark.starting_state("standard_user")
     @pytest.mark.regression
-    def test_add_item_to_cart(self, driver):
+    def test_add_item_to_cart(self, driver, logged_in):
         """Add product to cart from product grid."""
-        _, products_page = self._perform_login(driver)
+        products_page = logged_in
         products_page.add_first_item_to_cart()
         # Wait for badge to appear to ensure state was updated
         assert products_page.is_visible(ProductsPage.CART_BADGE, timeout=15, description="cart badge"), "Cart badge should appear after adding an item"
@@ -60,10 +63,11 @@ class TestFunctionalSuite:
         cart_page.wait_for_items(timeout=20)
         assert cart_page.has_items(), "Cart page should contain added item"
 
+    @pytest.mark.starting_state("standard_user")
     @pytest.mark.regression
-    def test_remove_item_from_cart(self, driver):
+    def test_remove_item_from_cart(self, driver, logged_in):
         """Remove cart item from product list."""
-        _, products_page = self._perform_login(driver)
+        products_page = logged_in
         products_page.add_first_item_to_cart()
         products_page.go_to_cart()
         cart_page = CartPage(driver)
@@ -72,10 +76,11 @@ class TestFunctionalSuite:
         cart_page.wait_until_empty()
         assert not cart_page.has_items(), "Cart should be empty after removing the only item"
 
+    @pytest.mark.starting_state("standard_user")
     @pytest.mark.regression
-    def test_product_details_information(self, driver):
+    def test_product_details_information(self, driver, logged_in):
         """Validate product details surface metadata and pricing."""
-        _, products_page = self._perform_login(driver)
+        products_page = logged_in
         products_page.open_first_product()
         detail_page = ProductDetailPage(driver)
         detail_page.wait_until_loaded(timeout=20)
@@ -88,11 +93,12 @@ class TestFunctionalSuite:
         detail_page.go_back_to_products()
         assert products_page.is_loaded(), "Expected to return to products page"
 
+    @pytest.mark.starting_state("standard_user")
     @pytest.mark.regression
     @pytest.mark.smoke
-    def test_checkout_flow_success(self, driver):
+    def test_checkout_flow_success(self, driver, logged_in):
         """Full checkout journey from adding item to confirming order."""
-        _, products_page = self._perform_login(driver)
+        products_page = logged_in
         products_page.add_first_item_to_cart()
         products_page.go_to_cart()
         cart_page = CartPage(driver)
@@ -103,10 +109,11 @@ class TestFunctionalSuite:
         checkout_page.finish()
         assert checkout_page.is_order_complete(), "Order completion banner should be visible"
 
+    @pytest.mark.starting_state("standard_user")
     @pytest.mark.regression
-    def test_checkout_missing_information_shows_error(self, driver):
+    def test_checkout_missing_information_shows_error(self, driver, logged_in):
         """Checkout should block progress when required fields are empty."""
-        _, products_page = self._perform_login(driver)
+        products_page = logged_in
         products_page.add_first_item_to_cart()
         products_page.go_to_cart()
         cart_page = CartPage(driver)
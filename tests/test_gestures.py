@@ -0,0 +1,25 @@
+from appium.webdriver.common.appiumby import AppiumBy
+
+from pages.login_page import LoginPage
+from utils import gestures
+
+
+class TestGestures:
+    def test_scroll_to_last_product_stops_at_end_of_list(self, stub_server, stub_driver):
+        LoginPage(stub_driver).login()
+        last_product = (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().text("Test.allTheThings() T-Shirt (Red)")')
+        element = gestures.scroll_to_locator(stub_driver, last_product)
+        assert element.text == "Test.allTheThings() T-Shirt (Red)"
+        scrolls = stub_server.command_counts["actions"]
+        assert 1 <= scrolls <= 4
+        assert stub_server.command_counts["page_source"] <= scrolls + 2
+
+        moves = [gestures.scroll(stub_driver)[0] for _ in range(4)]
+        assert moves[-1] is False
+        assert gestures.scroll_until(stub_driver, lambda snapshot: None, max_scrolls=10) is None
+        assert stub_server.command_counts["actions"] - scrolls <= 5
+
+    def test_scroll_points_follow_the_window(self):
+        start, end = gestures.scroll_points({"x": 0, "y": 0, "width": 1440, "height": 3200}, "down", 0.5)
+        assert start == (720, 2240) and end == (720, 640)
+        assert gestures.scroll_points({"width": 720, "height": 1600}, "up")[0] == (360, 320)
@@ -0,0 +1,128 @@
+import multiprocessing
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from ai_locators.healing_cache import HealingCache
+from pages import base_page
+from pages.login_page import LoginPage
+from pages.products_page import ProductsPage
+
+PRIMARY = ("accessibility id", "test-LOGIN")
+HEALED = ("accessibility id", "test-LOGIN v2")
+
+
+def _write_heals(path, worker, count):
+    cache = HealingCache(path)
+    for index in range(count):
+        cache.put("LoginPage", ("id", f"{worker}-{index}"), "button", "1.0", ("id", f"healed-{worker}-{index}"))
+        assert cache.get("LoginPage", ("id", f"{worker}-{index}"), "button", "1.0") == ("id", f"healed-{worker}-{index}")
+    cache.close()
+
+
+class TestHealingCache:
+    def test_entries_are_keyed_by_app_version_and_can_be_invalidated(self, tmp_path):
+        cache = HealingCache(tmp_path / "heal.sqlite")
+        cache.put("LoginPage", PRIMARY, "login button", "1.0", HEALED, 0.9)
+        assert cache.get("LoginPage", PRIMARY, "login button", "1.0") == HEALED
+        assert cache.get("LoginPage", PRIMARY, "login button", "2.0") is None
+        assert cache.get("CartPage", PRIMARY, "login button", "1.0") is None
+
+        cache.invalidate("LoginPage", PRIMARY, "login button", "1.0")
+        assert cache.get("LoginPage", PRIMARY, "login button", "1.0") is None
+        assert len(cache) == 0
+
+    def test_expired_entries_are_dropped(self, tmp_path):
+        cache = HealingCache(tmp_path / "heal.sqlite", ttl_seconds=60)
+        cache.put("LoginPage", PRIMARY, "login button", "1.0", HEALED)
+        cache._connection.execute("UPDATE healed_locators SET created_at = created_at - 120")
+        assert cache.get("LoginPage", PRIMARY, "login button", "1.0") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted_and_hits_are_written_in_batches(self, tmp_path):
+        cache = HealingCache(tmp_path / "heal.sqlite", max_entries=2, flush_every=10)
+        cache.put("LoginPage", ("id", "a"), "", "1.0", ("id", "a2"))
+        cache.put("LoginPage", ("id", "b"), "", "1.0", ("id", "b2"))
+        cache._connection.execute("UPDATE healed_locators SET last_used = last_used - 60")
+        assert cache.get("LoginPage", ("id", "a"), "", "1.0") == ("id", "a2")
+        # Lookups do not write until the batch fills or the next put.
+        assert cache._connection.execute("SELECT SUM(hits) FROM healed_locators").fetchone()[0] == 0
+
+        cache.put("LoginPage", ("id", "c"), "", "1.0", ("id", "c2"))
+        assert cache.get("LoginPage", ("id", "b"), "", "1.0") is None
+        assert cache.get("LoginPage", ("id", "a"), "", "1.0") == ("id", "a2")
+        assert cache._connection.execute("SELECT hits FROM healed_locators WHERE healed_locator LIKE '%a2%'").fetchone()[0] == 1
+        cache.close()
+
+    def test_two_processes_write_concurrently(self, tmp_path):
+        path = tmp_path / "heal.sqlite"
+        HealingCache(path).close()
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=_write_heals, args=(path, worker, 40)) for worker in ("gw0", "gw1")]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+        assert [worker.exitcode for worker in workers] == [0, 0]
+        assert len(HealingCache(path)) == 80
+
+
+class TestCachedHealLookup:
+    def test_stale_heal_is_dropped_without_waiting_when_the_primary_works(self, tmp_path, monkeypatch, stub_driver):
+        cache = HealingCache(tmp_path / "heal.sqlite")
+        monkeypatch.setattr(base_page, "get_healing_cache", lambda: cache)
+        page = LoginPage(stub_driver)
+        cache.put(*page._heal_key(LoginPage.USERNAME_FIELD, "login username"), ("accessibility id", "test-Gone"))
+
+        started = time.monotonic()
+        page.type(LoginPage.USERNAME_FIELD, "standard_user", timeout=5, description="login username")
+        assert time.monotonic() - started < 2
+        assert len(cache) == 0
+
+    def test_cached_heal_replaces_a_missing_primary_without_a_scan(self, tmp_path, monkeypatch, stub_driver):
+        cache = HealingCache(tmp_path / "heal.sqlite")
+        monkeypatch.setattr(base_page, "get_healing_cache", lambda: cache)
+        page = LoginPage(stub_driver)
+        renamed = ("accessibility id", "test-Username-old")
+        cache.put(*page._heal_key(renamed, "login username"), LoginPage.USERNAME_FIELD)
+        monkeypatch.setattr(page.ai_locator, "find_with_fallback", lambda *args, **kwargs: pytest.fail("scanned"))
+
+        started = time.monotonic()
+        page.type(renamed, "standard_user", timeout=5, description="login username")
+        assert time.monotonic() - started < 2
+        assert cache.get(*page._heal_key(renamed, "login username")) == LoginPage.USERNAME_FIELD
+
+    def test_heal_whose_action_fails_is_dropped_and_rescanned(self, tmp_path, monkeypatch, stub_driver):
+        cache = HealingCache(tmp_path / "heal.sqlite")
+        monkeypatch.setattr(base_page, "get_healing_cache", lambda: cache)
+        page = LoginPage(stub_driver)
+        renamed = ("accessibility id", "test-Username-old")
+        key = page._heal_key(renamed, "login username")
+        cache.put(*key, LoginPage.LOGIN_BUTTON)
+
+        def _type(target):
+            # The stale heal is on screen but the action on it never succeeds.
+            if target == LoginPage.LOGIN_BUTTON:
+                raise TimeoutException("not editable")
+            return target
+
+        assert page._execute_with_logging("type", renamed, _type, use_fallback=True, description="login username") == (
+            LoginPage.USERNAME_FIELD
+        )
+        assert cache.get(*key) == LoginPage.USERNAME_FIELD
+
+    def test_heal_is_used_as_soon_as_a_slow_screen_renders(self, tmp_path, monkeypatch, stub_driver):
+        cache = HealingCache(tmp_path / "heal.sqlite")
+        monkeypatch.setattr(base_page, "get_healing_cache", lambda: cache)
+        # performance_glitch_user shows blank frames for a while before the products screen renders.
+        LoginPage(stub_driver).login("performance_glitch_user")
+        page = ProductsPage(stub_driver)
+        renamed = ("accessibility id", "test-Cart-old")
+        cache.put(*page._heal_key(renamed, "cart"), ProductsPage.CART_ICON)
+        monkeypatch.setattr(page.ai_locator, "find_with_fallback", lambda *args, **kwargs: pytest.fail("scanned"))
+
+        started = time.monotonic()
+        page.click(renamed, timeout=10, description="cart")
+        assert time.monotonic() - started < 4
+        assert cache.get(*page._heal_key(renamed, "cart")) == ProductsPage.CART_ICON
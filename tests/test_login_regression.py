@@ -10,6 +10,7 @@ class TestLoginRegression:
     def setup_method(self):
         self.logger = get_logger(self.__class__.__name__)
 
+    @pytest.mark.starting_state("logged_out")
     @pytest.mark.smoke
     @pytest.mark.regression
     def test_valid_login(self, driver):
@@ -22,6 +23,7 @@ class TestLoginRegression:
         # TODO: Replace placeholder assertion with reliable verification once app identifiers exist.
         assert home_page.is_user_logged_in(), "Expected user to be logged in after valid credentials"
 
+    @pytest.mark.starting_state("logged_out")
     @pytest.mark.regression
     def test_invalid_login_wrong_password(self, driver):
         login_page = LoginPage(driver)
@@ -32,6 +34,7 @@ class TestLoginRegression:
         # TODO: Validate specific error text once UI copy is finalized.
         assert login_page.has_validation_error(), "Expected an error when logging in with wrong password"
 
+    @pytest.mark.starting_state("logged_out")
     @pytest.mark.regression
     @pytest.mark.smoke
     def test_login_empty_fields_validation(self, driver):
@@ -0,0 +1,48 @@
+from pages.login_page import LoginPage
+from pages.login_state import LOGGED_IN, RESTORED, restore_login, signed_in_as
+from pages.navigation import LOGIN, PRODUCTS, current_screen, navigate_to
+from pages.products_page import ProductsPage
+from utils.driver_manager import DriverManager
+
+
+class TestLoginState:
+    def test_restores_signed_in_user_without_logging_in_again(self, stub_server, stub_driver):
+        assert restore_login(stub_driver, "standard_user") == LOGGED_IN
+        assert signed_in_as(stub_driver) == "standard_user"
+
+        # Leave the app the way a finished test might: item in the cart, detail screen open.
+        products_page = ProductsPage(stub_driver)
+        products_page.add_first_item_to_cart()
+        products_page.open_first_product()
+
+        typed = stub_server.command_counts["send_keys"]
+        assert restore_login(stub_driver, "standard_user") == RESTORED
+        assert stub_server.command_counts["send_keys"] == typed
+        assert current_screen(stub_driver) == PRODUCTS
+        assert stub_server.app.data.cart == []
+
+        assert restore_login(stub_driver, "performance_glitch_user") == LOGGED_IN
+        assert stub_server.app.user == "performance_glitch_user"
+        assert current_screen(stub_driver) == PRODUCTS
+
+    def test_a_login_as_another_user_is_not_restored(self, stub_server, stub_driver):
+        assert restore_login(stub_driver, "standard_user") == LOGGED_IN
+
+        # A logged-out test signs in through the UI as someone else and leaves the app there.
+        navigate_to(stub_driver, LOGIN)
+        LoginPage(stub_driver).login("performance_glitch_user")
+        assert signed_in_as(stub_driver) is None
+
+        assert restore_login(stub_driver, "standard_user") == LOGGED_IN
+        assert stub_server.app.user == "standard_user"
+
+    def test_app_reset_forgets_the_signed_in_user(self, stub_server):
+        manager = DriverManager(server_url=stub_server.url)
+        driver = manager.start()
+        try:
+            assert restore_login(driver, "standard_user") == LOGGED_IN
+            manager.reset_app("restart")
+            assert signed_in_as(driver) is None
+            assert restore_login(driver, "standard_user") == LOGGED_IN
+        finally:
+            manager.stop()
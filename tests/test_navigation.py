@@ -0,0 +1,40 @@
+import pytest
+
+from pages.cart_page import CartPage
+from pages.navigation import (
+    CART,
+    CHECKOUT_INFO,
+    LOGIN,
+    MENU,
+    PRODUCT_DETAIL,
+    PRODUCTS,
+    SWAG_LABS,
+    NavigationError,
+    current_screen,
+    navigate_to,
+)
+from pages.product_detail_page import ProductDetailPage
+
+
+class TestNavigationGraph:
+    def test_routes_take_the_cheapest_known_path(self):
+        assert [(step.source, step.target) for step in SWAG_LABS.route(LOGIN, CART)] == [(LOGIN, PRODUCTS), (PRODUCTS, CART)]
+        assert [step.target for step in SWAG_LABS.route(PRODUCT_DETAIL, CHECKOUT_INFO)] == [CART, CHECKOUT_INFO]
+        assert SWAG_LABS.route(CART, CART) == []
+        with pytest.raises(NavigationError):
+            SWAG_LABS.route(LOGIN, "settings")
+
+    def test_navigates_from_whatever_screen_the_app_is_on(self, stub_server, stub_driver):
+        assert current_screen(stub_driver) == LOGIN
+        assert isinstance(navigate_to(stub_driver, PRODUCT_DETAIL), ProductDetailPage)
+        assert isinstance(navigate_to(stub_driver, CART), CartPage)
+
+        # Already signed in: reaching products again costs one tap, not a login.
+        logins = stub_server.command_counts.get("send_keys", 0)
+        navigate_to(stub_driver, MENU)
+        navigate_to(stub_driver, PRODUCTS)
+        assert current_screen(stub_driver) == PRODUCTS
+        assert stub_server.command_counts.get("send_keys", 0) == logins
+
+        navigate_to(stub_driver, LOGIN)
+        assert current_screen(stub_driver) == LOGIN
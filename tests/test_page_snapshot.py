@@ -0,0 +1,73 @@
+from appium.webdriver.common.appiumby import AppiumBy
+
+from utils.page_snapshot import PageSnapshot
+
+PRODUCTS_SCREEN = """<?xml version="1.0" encoding="UTF-8"?>
+<hierarchy rotation="0">
+<android.widget.FrameLayout class="android.widget.FrameLayout" index="0" bounds="[0,0][1080,2400]">
+  <android.view.ViewGroup class="android.view.ViewGroup" index="0" resource-id="com.swaglabsmobileapp:id/header" content-desc="test-Cart" clickable="true" bounds="[900,100][1000,200]" />
+  <android.widget.ScrollView class="android.widget.ScrollView" index="1" content-desc="test-PRODUCTS" scrollable="true" bounds="[0,300][1080,2400]">
+    <android.view.ViewGroup class="android.view.ViewGroup" index="0" content-desc="test-Item" clickable="true" bounds="[0,300][540,900]">
+      <android.widget.TextView class="android.widget.TextView" index="0" content-desc="test-Item title" text="Sauce Labs Backpack" bounds="[0,700][540,760]" />
+      <android.widget.TextView class="android.widget.TextView" index="1" content-desc="test-Price" text="$29.99" bounds="[0,780][540,840]" />
+    </android.view.ViewGroup>
+    <android.view.ViewGroup class="android.view.ViewGroup" index="1" content-desc="test-Item" clickable="true" bounds="[540,300][1080,900]">
+      <android.widget.TextView class="android.widget.TextView" index="0" content-desc="test-Item title" text="Say &quot;hi&quot; T-Shirt" bounds="[540,700][1080,760]" />
+    </android.view.ViewGroup>
+  </android.widget.ScrollView>
+</android.widget.FrameLayout>
+</hierarchy>"""
+
+TITLES = ["Sauce Labs Backpack", 'Say "hi" T-Shirt']
+
+
+def _texts(nodes):
+    return [node.text for node in nodes]
+
+
+class TestPageSnapshot:
+    def setup_method(self):
+        self.snapshot = PageSnapshot(PRODUCTS_SCREEN)
+
+    def test_accessibility_id_id_and_class_name(self):
+        assert _texts(self.snapshot.find_all((AppiumBy.ACCESSIBILITY_ID, "test-Item title"))) == TITLES
+        assert self.snapshot.find_all((AppiumBy.ACCESSIBILITY_ID, "test-Missing")) == []
+        header = self.snapshot.find((AppiumBy.ID, "com.swaglabsmobileapp:id/header"))
+        assert header is not None and header.content_desc == "test-Cart"
+        assert self.snapshot.find((AppiumBy.ID, "header")) is header
+        assert self.snapshot.count((AppiumBy.CLASS_NAME, "android.widget.TextView")) == 3
+
+    def test_ui_selector_chains(self):
+        selector = 'new UiSelector().className("android.widget.TextView").textContains("Backpack")'
+        assert _texts(self.snapshot.find_all((AppiumBy.ANDROID_UIAUTOMATOR, selector))) == TITLES[:1]
+        escaped = 'new UiSelector().text("Say \\"hi\\" T-Shirt")'
+        assert _texts(self.snapshot.find_all((AppiumBy.ANDROID_UIAUTOMATOR, escaped))) == TITLES[1:]
+        second = 'new UiSelector().description("test-Item").clickable(true).instance(1);'
+        assert self.snapshot.find((AppiumBy.ANDROID_UIAUTOMATOR, second)).children
+        assert self.snapshot.exists((AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().scrollable(true).index(1)'))
+        assert self.snapshot.exists((AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().descriptionStartsWith("test-Z")')) is False
+
+    def test_xpath_subset(self):
+        assert _texts(self.snapshot.find_all((AppiumBy.XPATH, "//*[@content-desc='test-Item title']"))) == TITLES
+        typed = '//android.widget.TextView[@content-desc="test-Price"]'
+        assert _texts(self.snapshot.find_all((AppiumBy.XPATH, typed))) == ["$29.99"]
+        assert self.snapshot.get_text((AppiumBy.XPATH, "//*[@content-desc='test-Item']")) == "Sauce Labs Backpack"
+
+    def test_unanswerable_locators_return_none(self):
+        unsupported = [
+            ("-ios predicate string", "name == 'test-Cart'"),
+            (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiScrollable(new UiSelector().scrollable(true)).scrollIntoView(new UiSelector().text("x"))'),
+            (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().childSelector(new UiSelector().text("x"))'),
+            (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().textMatches("Sauce.*")'),
+            (AppiumBy.XPATH, "/hierarchy/android.widget.FrameLayout"),
+            (AppiumBy.XPATH, "//*[contains(@text, 'Sauce')]"),
+        ]
+        for locator in unsupported:
+            assert self.snapshot.find_all(locator) is None, locator
+            assert self.snapshot.exists(locator) is None
+            assert not self.snapshot.supports(locator)
+
+        broken = PageSnapshot("<hierarchy><unclosed></hierarchy>")
+        assert broken.nodes == []
+        assert broken.find_all((AppiumBy.XPATH, "//*")) is None
+        assert broken.find_all((AppiumBy.ACCESSIBILITY_ID, "test-Cart")) == []
@@ -0,0 +1,51 @@
+import pytest
+
+from pages.login_page import LoginPage
+from pages.products_page import ProductsPage
+from stub_server import start_stub_server
+from utils.driver_manager import DriverManager
+from utils.record_replay import ReplayMismatchError, TraceReader, attach_recorder, create_replay_driver
+
+
+@pytest.fixture
+def recorded_trace(tmp_path):
+    server = start_stub_server()
+    trace_dir = tmp_path / "trace"
+    try:
+        manager = DriverManager(server_url=server.url)
+        driver = manager.start()
+        attach_recorder(driver, trace_dir)
+        LoginPage(driver).login()
+        ProductsPage(driver).is_loaded()
+        recorded = {"source": driver.page_source, "screenshot": driver.get_screenshot_as_png()}
+        manager.stop()
+    finally:
+        server.stop()
+    return trace_dir, recorded
+
+
+class TestRecordReplay:
+    def test_trace_is_streamed_with_blobs(self, recorded_trace):
+        trace_dir, _ = recorded_trace
+        trace = TraceReader(trace_dir)
+        commands = [record["command"] for record in trace]
+        assert commands[-1] == "quit"
+        assert "clickElement" in commands
+        assert any(path.suffix == ".png" for path in (trace_dir / "blobs").iterdir())
+
+    def test_replay_serves_recorded_responses_offline(self, recorded_trace):
+        trace_dir, recorded = recorded_trace
+        driver = create_replay_driver(trace_dir)
+        LoginPage(driver).login()
+        assert ProductsPage(driver).is_loaded()
+        assert driver.page_source == recorded["source"]
+        assert driver.get_screenshot_as_png() == recorded["screenshot"]
+        # Extra polls beyond the recording are answered with the last result.
+        assert driver.get_screenshot_as_png() == recorded["screenshot"]
+        driver.quit()
+
+    def test_replay_rejects_divergent_commands(self, recorded_trace):
+        trace_dir, _ = recorded_trace
+        driver = create_replay_driver(trace_dir)
+        with pytest.raises(ReplayMismatchError):
+            driver.back()
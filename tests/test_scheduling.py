@@ -0,0 +1,28 @@
+from utils.test_scheduling import DurationStore, plan_work_units
+
+DURATIONS = {"slow": 120.0, "a1": 10.0, "a2": 12.0, "a3": 8.0, "b1": 5.0, "free": 20.0}
+
+
+class TestDurationScheduling:
+    def test_units_are_longest_first_and_grouped_by_state(self):
+        states = {"a1": "standard_user", "a2": "standard_user", "a3": "standard_user", "b1": "logged_out"}
+        units = plan_work_units(DURATIONS, DURATIONS.get, states, workers=2)
+
+        assert units[0] == ("slow", ["slow"])
+        assert ("standard_user#2", ["a2", "a1", "a3"]) in units
+        assert [nodeids for _, nodeids in units][1:] == [["a2", "a1", "a3"], ["free"], ["b1"]]
+
+    def test_oversized_state_group_is_split(self):
+        durations = {f"t{index}": 10.0 for index in range(8)}
+        units = plan_work_units(durations, durations.get, {nodeid: "standard_user" for nodeid in durations}, workers=4)
+        assert [len(nodeids) for _, nodeids in units] == [2, 2, 2, 2]
+
+    def test_store_smooths_history_and_estimates_unknown_tests(self, tmp_path):
+        store = DurationStore(tmp_path / "durations.json")
+        store.update({"a": 10.0, "b": 2.0, "c": 4.0})
+        store.save()
+
+        reloaded = DurationStore(tmp_path / "durations.json")
+        reloaded.update({"a": 20.0})
+        assert reloaded.estimate("a") == 15.0
+        assert reloaded.estimate("unknown") == 4.0
@@ -0,0 +1,84 @@
+import base64
+import json
+import threading
+
+import cv2
+import numpy as np
+
+from utils import helpers, screenshot_writer
+from utils.artifact_store import ArtifactSettings, ArtifactStore
+from utils.screenshot_writer import ScreenshotWriter, capture_screenshot, resolve_screenshot
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\nfake"
+
+
+class _Driver:
+    def __init__(self, png_bytes=PNG_BYTES):
+        self.saved = []
+        self.png_bytes = png_bytes
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(self.png_bytes).decode("ascii")
+
+    def save_screenshot(self, path):
+        self.saved.append(path)
+        with open(path, "wb") as handle:
+            handle.write(PNG_BYTES)
+        return True
+
+
+class TestScreenshotWriter:
+    def test_capture_returns_before_write_and_flush_completes_it(self, tmp_path, monkeypatch):
+        writer = ScreenshotWriter(max_workers=1, max_pending=4)
+        monkeypatch.setattr(screenshot_writer, "_WRITER", writer)
+        release = threading.Event()
+        writer._executor.submit(release.wait)  # occupy the only worker thread
+
+        path = capture_screenshot(_Driver(), tmp_path / "shot.png", "shot")
+        assert not path.exists()
+
+        release.set()
+        assert screenshot_writer.flush_screenshots(attach=False) == [path]
+        assert path.read_bytes() == PNG_BYTES
+        assert screenshot_writer.flush_screenshots(attach=False) == []
+        writer.shutdown()
+
+    def test_sync_mode_writes_on_the_calling_thread(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(screenshot_writer.ASYNC_SCREENSHOTS_ENV, "0")
+        driver = _Driver()
+        path = capture_screenshot(driver, tmp_path / "sync.png", "sync", attach=False)
+        assert driver.saved == [str(path)] and path.exists()
+
+    def test_attach_screenshot_returns_the_reference_that_is_written(self, tmp_path, monkeypatch):
+        store = ArtifactStore(tmp_path / "store", ArtifactSettings(format="png"))
+        monkeypatch.setattr(screenshot_writer, "get_artifact_store", lambda: store)
+        monkeypatch.setattr(helpers, "SCREENSHOT_DIR", tmp_path)
+        png = cv2.imencode(".png", np.full((64, 64, 3), 128, dtype=np.uint8))[1].tobytes()
+
+        path = helpers.attach_screenshot(_Driver(png), name="click_failure")
+        screenshot_writer.flush_screenshots(attach=False)
+        assert path.suffix == ".json" and path.exists()
+        assert (path.parent / json.loads(path.read_text())["object"]).exists()
+
+    def test_store_failure_falls_back_to_a_plain_png(self, tmp_path, monkeypatch):
+        store = ArtifactStore(tmp_path / "store")
+        monkeypatch.setattr(screenshot_writer, "get_artifact_store", lambda: store)
+        # PNG_BYTES is not decodable, so the store rejects it.
+        capture_screenshot(_Driver(), tmp_path / "broken.png", "broken", store=True)
+        assert screenshot_writer.flush_screenshots(attach=False) == [tmp_path / "broken.png"]
+        assert (tmp_path / "broken.png").read_bytes() == PNG_BYTES
+
+    def test_async_store_failure_resolves_to_the_png(self, tmp_path, monkeypatch):
+        writer = ScreenshotWriter(max_workers=1, max_pending=4)
+        monkeypatch.setattr(screenshot_writer, "_WRITER", writer)
+        store = ArtifactStore(tmp_path / "store")
+        monkeypatch.setattr(screenshot_writer, "get_artifact_store", lambda: store)
+
+        path = capture_screenshot(_Driver(), tmp_path / "broken.png", "broken", store=True)
+        assert path == tmp_path / "broken.json"
+        assert resolve_screenshot(path) == tmp_path / "broken.png"
+        assert (tmp_path / "broken.png").read_bytes() == PNG_BYTES
+        assert not path.exists()
+        screenshot_writer.flush_screenshots(attach=False)
+        assert resolve_screenshot(path) == tmp_path / "broken.png"
+        writer.shutdown()
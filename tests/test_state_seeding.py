@@ -0,0 +1,56 @@
+import pytest
+
+from mobile_api_ai_framework.api.client import MobileApiClient
+from pages.cart_page import CartPage
+from pages.login_state import LOGGED_IN, restore_login, signed_in_as
+from pages.navigation import CART, CHECKOUT_COMPLETE, CHECKOUT_INFO, CHECKOUT_OVERVIEW, LOGIN, NavigationError, current_screen
+from pages.state_seeding import DEEP_LINK, UI, AppState, CartItem, deep_link_url, seed_state
+from stub_server.server import StubError
+from utils.driver_manager import DriverManager
+
+BUNDLE = ["Sauce Labs Backpack", "Sauce Labs Bike Light"]
+
+
+class TestStateSeeding:
+    def test_deep_link_urls(self):
+        state = AppState.from_cart_payload(MobileApiClient().build_cart_payload())
+        assert deep_link_url(state) == "swaglabs://cart/0,1"
+        assert deep_link_url(AppState(screen=CHECKOUT_INFO)) == "swaglabs://personal-info/"
+        assert deep_link_url(AppState(user="problem_user")) is None
+        assert deep_link_url(AppState(cart=(CartItem("Sauce Labs Onesie"),))) is None
+        assert deep_link_url(AppState(screen=LOGIN)) is None
+
+    def test_deep_link_seeds_in_one_command_and_ui_is_the_fallback(self, stub_server, stub_driver):
+        state = AppState.from_cart_payload(MobileApiClient().build_cart_payload(), screen=CART)
+        assert seed_state(stub_driver, state) == DEEP_LINK
+        assert current_screen(stub_driver) == CART
+        assert CartPage(stub_driver).get_item_names() == BUNDLE
+        assert stub_server.command_counts.get("send_keys", 0) == 0
+
+        def _rejected(stub, args):
+            raise StubError("unsupported operation", "Unsupported mobile command 'deepLink'")
+
+        stub_server.register_mobile_command("deepLink", _rejected)
+        with DriverManager(server_url=stub_server.url) as driver:
+            assert seed_state(driver, state) == UI
+            assert current_screen(driver) == CART
+            assert CartPage(driver).get_item_names() == BUNDLE
+            # The rejection is remembered for this driver.
+            executes = stub_server.command_counts["execute"]
+            assert seed_state(driver, AppState(screen=CART)) == UI
+            assert stub_server.command_counts["execute"] == executes
+            assert not CartPage(driver).has_items()
+
+    def test_deep_link_signs_out_a_different_user_first(self, stub_server, stub_driver):
+        assert restore_login(stub_driver, "performance_glitch_user") == LOGGED_IN
+        assert seed_state(stub_driver, AppState(cart=(CartItem("Sauce Labs Onesie", 4),), screen=CART)) == DEEP_LINK
+        assert stub_server.app.user == "standard_user"
+        assert signed_in_as(stub_driver) == "standard_user"
+        assert CartPage(stub_driver).get_item_names() == ["Sauce Labs Onesie"]
+
+    def test_ui_declines_unreachable_screens_before_doing_any_work(self, stub_server, stub_driver):
+        for screen in (CHECKOUT_OVERVIEW, CHECKOUT_COMPLETE):
+            with pytest.raises(NavigationError):
+                seed_state(stub_driver, AppState(screen=screen), mechanisms=(UI,))
+        assert stub_server.command_counts.get("send_keys", 0) == 0
+        assert current_screen(stub_driver) == LOGIN
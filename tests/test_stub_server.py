@@ -0,0 +1,41 @@
+import pytest
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+from pages.login_page import LoginPage
+from pages.products_page import ProductsPage
+from stub_server import StubConfig, start_stub_server
+from utils.driver_manager import DriverManager
+
+
+class TestStubServer:
+    def test_page_objects_drive_the_scripted_app(self, stub_server):
+        with DriverManager(server_url=stub_server.url) as driver:
+            LoginPage(driver).login()
+            products_page = ProductsPage(driver)
+            assert products_page.is_loaded()
+            assert products_page.get_first_product_name() == "Sauce Labs Backpack"
+            products_page.add_first_item_to_cart()
+            assert products_page.has_items_in_cart()
+            assert "test-Cart badge" in driver.page_source
+            assert driver.get_screenshot_as_png().startswith(b"\x89PNG")
+
+    def test_elements_go_stale_after_navigation(self, stub_server):
+        with DriverManager(server_url=stub_server.url) as driver:
+            login_button = driver.find_element(*LoginPage.LOGIN_BUTTON)
+            LoginPage(driver).login()
+            with pytest.raises(StaleElementReferenceException):
+                login_button.click()
+            with pytest.raises(NoSuchElementException):
+                driver.find_element(AppiumBy.ACCESSIBILITY_ID, "test-Missing")
+
+    def test_injected_flakiness_and_latency(self):
+        server = start_stub_server(StubConfig(flakiness={"find_elements": 1.0}, latency={"page_source": 0.05}))
+        try:
+            with DriverManager(server_url=server.url) as driver:
+                assert driver.find_elements(*LoginPage.LOGIN_BUTTON) == []
+                assert driver.find_element(*LoginPage.LOGIN_BUTTON)
+                assert "test-LOGIN" in driver.page_source
+            assert server.command_counts["find_elements"] == 1
+        finally:
+            server.stop()
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from utils import timings
+from utils.timings import COMMAND, FALLBACK, WAIT, enable_timings, format_summary, get_recorder, set_current_test, timed
+
+
+@pytest.fixture
+def recorder():
+    recorder = get_recorder()
+    previous = recorder.enabled
+    recorder.reset()
+    enable_timings()
+    set_current_test("test_case")
+    yield recorder
+    recorder.reset()
+    set_current_test(None)
+    enable_timings(previous)
+
+
+class TestTimings:
+    def test_nested_spans_record_self_time(self, recorder):
+        with timed(WAIT, "outer"):
+            time.sleep(0.02)
+            with timed(COMMAND, "findElement"):
+                time.sleep(0.03)
+
+        inner, outer = recorder.spans
+        assert (inner.depth, outer.depth) == (1, 0)
+        assert inner.test == outer.test == "test_case"
+        assert outer.duration >= inner.duration + 0.02
+        assert outer.self_time == pytest.approx(outer.duration - inner.duration, abs=1e-6)
+
+    def test_disabled_instrumentation_is_a_shared_no_op(self, recorder):
+        enable_timings(False)
+        assert timed(WAIT, "ignored") is timed(COMMAND, "ignored")
+        with timed(WAIT, "ignored"):
+            pass
+        assert recorder.spans == []
+
+    def test_summary_reports_fallback_cost(self, recorder):
+        with timed(FALLBACK, "search_dom", "login button"):
+            time.sleep(0.01)
+        summary = "\n".join(format_summary(recorder.spans))
+        assert "AI fallback: 1 searches" in summary
+        assert timings.summarize_spans(recorder.spans)["test_case"]["fallback_calls"] == 1
@@ -0,0 +1,169 @@
+import base64
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import perturbed_screenshot, synthetic_screenshot
+from visual.baseline_cache import BaselineCache
+from visual.comparison import MultiScaleComparator
+from visual import visual_validator
+from visual.visual_validator import VisualValidator
+
+
+class TestMultiScaleComparison:
+    def test_matches_whole_frame_score_and_skips_clean_frames(self):
+        baseline = synthetic_screenshot(720, 1280)
+        actual = perturbed_screenshot(baseline)
+        comparator = MultiScaleComparator()
+
+        clean = comparator.compare(baseline, baseline.copy())
+        assert clean.score == 1.0
+        assert clean.tiles_escalated == 0
+
+        coarse_to_fine = comparator.compare(baseline, actual)
+        exact = comparator.compare(baseline, actual, multiscale=False)
+        assert 0 < coarse_to_fine.tiles_escalated < coarse_to_fine.tiles_total
+        assert coarse_to_fine.score == exact.score < 1.0
+        assert MultiScaleComparator(scoring="ssim").compare(baseline, actual).score < 1.0
+
+    def test_regions_sidecar_masks_status_bar(self, tmp_path):
+        baseline = synthetic_screenshot(720, 1280)
+        clock_changed = baseline.copy()
+        clock_changed[5:35, 600:700] = 255 - clock_changed[5:35, 600:700]
+        validator = VisualValidator(
+            tmp_path / "baseline", tmp_path / "actual", tmp_path / "diff", BaselineCache(sidecar_dir=None)
+        )
+        actual_path = validator.actual_dir / "home.png"
+        cv2.imwrite(str(actual_path), clock_changed)
+        cv2.imwrite(str(validator.baseline_dir / "home.png"), baseline)
+
+        assert not validator.compare_with_baseline(actual_path, "home.png", threshold=0.999).matched
+
+        (validator.baseline_dir / "home.regions.json").write_text(json.dumps({"status_bar": True}))
+        result = validator.compare_with_baseline(actual_path, "home.png", threshold=0.999)
+        assert result.matched
+        assert result.score == 1.0
+
+
+class TestBaselineCache:
+    def test_reuses_decoded_baseline_until_file_changes(self, tmp_path):
+        baseline = synthetic_screenshot(360, 640)
+        path = tmp_path / "home.png"
+        cv2.imwrite(str(path), baseline)
+        cache = BaselineCache(sidecar_dir=tmp_path / "sidecars")
+
+        first = cache.get(path)
+        assert cache.get(path) is first
+        assert first.mask() is None and first.coarse(2).shape == (160, 90, 3)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Another worker maps the raw sidecar instead of decoding the PNG.
+        shared = BaselineCache(sidecar_dir=tmp_path / "sidecars").get(path)
+        assert isinstance(shared.image, np.memmap)
+        assert np.array_equal(shared.image, baseline)
+
+        cv2.imwrite(str(path), perturbed_screenshot(baseline))
+        os.utime(path, ns=(time.time_ns() + 10**9,) * 2)
+        assert cache.get(path) is not first
+        assert len(list((tmp_path / "sidecars").glob("*.npy"))) == 1
+
+    def test_trim_evicts_least_recently_used(self, tmp_path):
+        paths = []
+        for index in range(3):
+            paths.append(tmp_path / f"screen{index}.png")
+            cv2.imwrite(str(paths[-1]), synthetic_screenshot(360, 640, seed=index))
+        cache = BaselineCache(max_bytes=2 * 360 * 640 * 3, sidecar_dir=None)
+        for path in paths:
+            cache.get(path)
+        cache.get(paths[0])
+        cache.trim()
+
+        cache.get(paths[0])
+        cache.get(paths[2])
+        assert cache.misses == 3
+        cache.get(paths[1])
+        assert cache.misses == 4
+
+
+class TestCompareMany:
+    def test_process_pool_streams_results_and_writes_report(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("FRAMEWORK_BASELINE_CACHE", "0")
+        validator = VisualValidator(tmp_path / "baseline", tmp_path / "actual", tmp_path / "diff")
+        pairs = []
+        for index, name in enumerate(("cart.png", "menu.png")):
+            baseline = synthetic_screenshot(360, 640, seed=index)
+            cv2.imwrite(str(validator.baseline_dir / name), baseline)
+            actual = baseline if name == "cart.png" else perturbed_screenshot(baseline, patches=12)
+            cv2.imwrite(str(validator.actual_dir / name), actual)
+            pairs.append((validator.actual_dir / name, name))
+        pairs.append((validator.actual_dir / "menu.png", "missing.png"))
+
+        results = {
+            result.baseline_path.name: result
+            for result in validator.compare_many(pairs, workers=2, report_path=tmp_path / "report.json")
+        }
+
+        assert results["cart.png"].matched and results["cart.png"].diff_path is None
+        assert not results["menu.png"].matched and results["menu.png"].diff_path.exists()
+        assert "missing.png" in results["missing.png"].error
+        report = json.loads((tmp_path / "report.json").read_text())
+        assert (report["total"], report["matched"], report["failed"], report["errors"]) == (3, 1, 1, 1)
+        assert [entry["baseline_path"].rsplit("/", 1)[-1] for entry in report["results"]] == [
+            "cart.png",
+            "menu.png",
+            "missing.png",
+        ]
+
+
+    def test_abandoned_sweep_cancels_queued_comparisons(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("FRAMEWORK_BASELINE_CACHE", "0")
+        shutdowns = []
+
+        class _RecordingExecutor(visual_validator.ProcessPoolExecutor):
+            def shutdown(self, wait=True, *, cancel_futures=False):
+                shutdowns.append(cancel_futures)
+                super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+        monkeypatch.setattr(visual_validator, "ProcessPoolExecutor", _RecordingExecutor)
+        validator = VisualValidator(tmp_path / "baseline", tmp_path / "actual", tmp_path / "diff")
+        baseline = synthetic_screenshot(360, 640)
+        cv2.imwrite(str(validator.baseline_dir / "home.png"), baseline)
+        cv2.imwrite(str(validator.actual_dir / "home.png"), baseline)
+        pairs = [(validator.actual_dir / "home.png", "home.png")] * 20
+
+        sweep = validator.compare_many(pairs, workers=2, report_path=tmp_path / "report.json")
+        assert next(sweep).matched
+        sweep.close()
+
+        assert shutdowns == [True]
+        assert not (tmp_path / "report.json").exists()
+
+
+class TestInMemoryCapture:
+    def test_passing_check_writes_nothing_and_failure_keeps_artifacts(self, tmp_path):
+        baseline = synthetic_screenshot(360, 640)
+        validator = VisualValidator(
+            tmp_path / "baseline", tmp_path / "actual", tmp_path / "diff", BaselineCache(sidecar_dir=None)
+        )
+        cv2.imwrite(str(validator.baseline_dir / "home.png"), baseline)
+
+        class _Driver:
+            screen = baseline
+
+            def get_screenshot_as_png(self):
+                return cv2.imencode(".png", self.screen)[1].tobytes()
+
+        driver = _Driver()
+        passed = validator.check_screen(driver, "home.png")
+        assert passed.matched and passed.actual_path is None
+        assert not any(validator.actual_dir.iterdir()) and not any(validator.diff_dir.iterdir())
+
+        driver.screen = perturbed_screenshot(baseline, patches=12)
+        encoded = base64.b64encode(driver.get_screenshot_as_png()).decode("ascii")
+        failed = validator.compare_image(encoded, "home.png")
+        assert not failed.matched
+        assert failed.actual_path.read_bytes() == base64.b64decode(encoded)
+        assert failed.diff_path.exists()
@@ -0,0 +1,279 @@
+"""
+Content-addressed store for failure screenshots.
+
+A failing action and the test teardown usually capture the same screen within a second of
+each other. Instead of one full-resolution PNG per capture, every screenshot is stored once
+under ``reports/screenshots/store/objects`` (optionally downscaled and re-encoded as WebP or
+JPEG) and each capture writes a small ``<name>_<timestamp>.json`` reference next to the
+legacy PNGs. Exact duplicates are found by SHA-1; near duplicates by a 64-bit perceptual
+hash (DCT pHash) confirmed with a thumbnail pixel diff, so a changed error banner is not
+mistaken for the same screen.
+
+The SQLite index (WAL mode, like the healing cache) is shared by all xdist workers.
+:meth:`ArtifactStore.enforce_retention` evicts objects by age and total size, together
+with the references pointing at them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+import yaml
+
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+STORE_DIR = REPO_ROOT / "reports" / "screenshots" / "store"
+CONFIG_PATH = REPO_ROOT / "config" / "config.yaml"
+ARTIFACT_STORE_ENV = "FRAMEWORK_ARTIFACT_STORE"
+
+FORMATS = {"png": ".png", "webp": ".webp", "jpeg": ".jpg"}
+THUMBNAIL_WIDTH = 360
+# Two screens are the same when at most this share of thumbnail pixels changed noticeably;
+# a blinking cursor or clock passes, a different error banner or product title does not.
+THUMBNAIL_CHANGED_SHARE = 0.0005
+PIXEL_CHANGE_LEVEL = 30
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS objects (
+        digest TEXT PRIMARY KEY,
+        phash TEXT NOT NULL,
+        path TEXT NOT NULL,
+        bytes INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS refs (
+        ref_path TEXT PRIMARY KEY,
+        digest TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+)
+
+
+@dataclass
+class ArtifactSettings:
+    format: str = "webp"
+    quality: int = 80
+    max_width: Optional[int] = 1080
+    phash_distance: int = 4
+    max_age_days: float = 14.0
+    max_total_mb: float = 500.0
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ArtifactSettings":
+        data = data or {}
+        settings = cls(**{key: data[key] for key in cls.__dataclass_fields__ if key in data})
+        if settings.format not in FORMATS:
+            raise ValueError(f"Unknown artifact format '{settings.format}'. Expected one of {tuple(FORMATS)}.")
+        return settings
+
+
+@dataclass
+class StoredArtifact:
+    path: Path
+    ref_path: Path
+    digest: str
+    duplicate: bool
+
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """64-bit DCT pHash: sign of the low-frequency coefficients against their median."""
+    grey = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(grey, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def _thumbnail(image: np.ndarray, size=None) -> np.ndarray:
+    grey = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    if size is None:
+        height, width = grey.shape
+        size = (THUMBNAIL_WIDTH, max(1, round(height * THUMBNAIL_WIDTH / width)))
+    return cv2.resize(grey, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+class ArtifactStore:
+    """Deduplicating screenshot store shared by every worker on the machine."""
+
+    def __init__(self, root: Path = STORE_DIR, settings: Optional[ArtifactSettings] = None):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.settings = settings or ArtifactSettings()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.root / "index.sqlite"), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA busy_timeout=30000")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+    def put(self, png_bytes: bytes, ref_path: Path, metadata: Optional[Dict[str, Any]] = None) -> StoredArtifact:
+        """Store a screenshot (or reuse an equivalent one) and write the reference ``ref_path``."""
+        ref_path = Path(ref_path)
+        digest = hashlib.sha1(png_bytes).hexdigest()
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT path FROM objects WHERE digest=?", (digest,)).fetchone()
+            duplicate = row is not None
+            if duplicate:
+                object_path = Path(row[0])
+            else:
+                image = cv2.imdecode(np.frombuffer(png_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if image is None:
+                    raise ValueError(f"Screenshot for {ref_path.name} is not a decodable image")
+                phash = perceptual_hash(image)
+                near = self._find_near_duplicate(phash, image)
+                if near:
+                    digest, object_path = near
+                    duplicate = True
+                else:
+                    object_path = self._write_object(digest, image)
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO objects (digest, phash, path, bytes, created_at, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (digest, f"{phash:016x}", str(object_path), object_path.stat().st_size, now, now),
+                    )
+            self._connection.execute("UPDATE objects SET last_used=? WHERE digest=?", (now, digest))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO refs (ref_path, digest, created_at) VALUES (?, ?, ?)",
+                (str(ref_path), digest, now),
+            )
+
+        ref_path.parent.mkdir(parents=True, exist_ok=True)
+        ref_path.write_text(
+            json.dumps(
+                {
+                    "object": os.path.relpath(object_path, ref_path.parent),
+                    "digest": digest,
+                    "duplicate": duplicate,
+                    "created_at": now,
+                    **(metadata or {}),
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        return StoredArtifact(object_path, ref_path, digest, duplicate)
+
+    def _find_near_duplicate(self, phash: int, image: np.ndarray):
+        """Closest stored object within ``phash_distance`` whose thumbnail also matches."""
+        rows = self._connection.execute(
+            "SELECT digest, phash, path FROM objects ORDER BY last_used DESC LIMIT 500"
+        ).fetchall()
+        candidates = []
+        for digest, stored_hash, path in rows:
+            distance = bin(phash ^ int(stored_hash, 16)).count("1")
+            if distance <= self.settings.phash_distance:
+                candidates.append((distance, digest, Path(path)))
+        if not candidates:
+            return None
+        thumbnail = _thumbnail(image)
+        size = (thumbnail.shape[1], thumbnail.shape[0])
+        for _, digest, path in sorted(candidates):
+            stored = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+            if stored is None:
+                continue
+            changed = np.abs(_thumbnail(stored, size) - thumbnail) > PIXEL_CHANGE_LEVEL
+            if float(np.mean(changed)) <= THUMBNAIL_CHANGED_SHARE:
+                return digest, path
+        return None
+
+    def _write_object(self, digest: str, image: np.ndarray) -> Path:
+        settings = self.settings
+        height, width = image.shape[:2]
+        if settings.max_width and width > settings.max_width:
+            scale = settings.max_width / width
+            image = cv2.resize(image, (settings.max_width, round(height * scale)), interpolation=cv2.INTER_AREA)
+        extension = FORMATS[settings.format]
+        params = []
+        if settings.format == "webp":
+            params = [cv2.IMWRITE_WEBP_QUALITY, settings.quality]
+        elif settings.format == "jpeg":
+            params = [cv2.IMWRITE_JPEG_QUALITY, settings.quality]
+        ok, encoded = cv2.imencode(extension, image, params)
+        if not ok:
+            raise ValueError(f"Could not encode screenshot as {settings.format}")
+        path = self.objects_dir / digest[:2] / f"{digest}{extension}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(encoded.tobytes())
+        tmp_path.replace(path)
+        return path
+
+    def total_bytes(self) -> int:
+        return self._connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM objects").fetchone()[0]
+
+    def enforce_retention(self, now: Optional[float] = None) -> int:
+        """Evict objects unused for ``max_age_days``, then least recently used beyond ``max_total_mb``."""
+        now = now or time.time()
+        max_bytes = self.settings.max_total_mb * 1024 * 1024
+        evicted = []
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT digest, path, bytes, last_used FROM objects ORDER BY last_used DESC"
+            ).fetchall()
+            kept_bytes = 0
+            for digest, path, size, last_used in rows:
+                expired = now - last_used > self.settings.max_age_days * 86400
+                if expired or kept_bytes + size > max_bytes:
+                    evicted.append((digest, Path(path)))
+                else:
+                    kept_bytes += size
+            for digest, path in evicted:
+                for (ref_path,) in self._connection.execute("SELECT ref_path FROM refs WHERE digest=?", (digest,)):
+                    Path(ref_path).unlink(missing_ok=True)
+                self._connection.execute("DELETE FROM refs WHERE digest=?", (digest,))
+                self._connection.execute("DELETE FROM objects WHERE digest=?", (digest,))
+                path.unlink(missing_ok=True)
+        if evicted:
+            LOGGER.info("Evicted %s screenshots from %s", len(evicted), self.root)
+        return len(evicted)
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+_STORE: Optional[ArtifactStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def artifact_store_enabled() -> bool:
+    return os.environ.get(ARTIFACT_STORE_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def load_settings(config_path: Path = CONFIG_PATH) -> ArtifactSettings:
+    if not config_path.exists():
+        return ArtifactSettings()
+    with config_path.open("r", encoding="utf-8") as config_file:
+        return ArtifactSettings.from_dict((yaml.safe_load(config_file) or {}).get("artifacts"))
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """Process-wide store, or ``None`` when disabled via ``FRAMEWORK_ARTIFACT_STORE=0``."""
+    global _STORE  # pylint: disable=global-statement
+    if not artifact_store_enabled():
+        return None
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ArtifactStore(settings=load_settings())
+        return _STORE
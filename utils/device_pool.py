@@ -0,0 +1,278 @@
+"""
+Device registry and per-worker leasing for parallel runs.
+
+The registry (``config/devices.yaml``, see ``devices.example.yaml``) lists the devices or
+emulators available to a run, each with its udid, Appium server URL and the ports its
+UiAutomator2/Chromedriver helpers should bind. Every xdist worker leases one device for
+its lifetime by taking an exclusive ``flock`` on ``reports/locks/<udid>.lock``. The OS
+drops the lock when the holding process exits, so a crashed or killed worker never leaves
+a device stuck; there is no stale-lease cleanup to get wrong.
+
+Ports missing from the registry are allocated per device from ``ports`` bases
+(``base + index``), so two sessions on the same Appium server never collide.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+import yaml
+
+from utils.logger import get_logger
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+LOGGER = get_logger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEVICE_REGISTRY_PATH = REPO_ROOT / "config" / "devices.yaml"
+DEVICE_REGISTRY_ENV = "FRAMEWORK_DEVICES"
+LOCK_DIR = REPO_ROOT / "reports" / "locks"
+DEFAULT_LEASE_TIMEOUT = 600.0
+LEASE_POLL_INTERVAL = 1.0
+DEFAULT_PORT_BASES = {"system_port": 8200, "chromedriver_port": 9515, "mjpeg_server_port": 9100}
+
+_PORT_CAPABILITIES = {
+    "system_port": "appium:systemPort",
+    "chromedriver_port": "appium:chromedriverPort",
+    "mjpeg_server_port": "appium:mjpegServerPort",
+}
+
+
+class DeviceUnavailableError(RuntimeError):
+    """No device in the registry could be leased before the timeout."""
+
+
+@dataclass
+class DeviceSpec:
+    udid: str
+    name: str = ""
+    server_url: Optional[str] = None
+    system_port: Optional[int] = None
+    chromedriver_port: Optional[int] = None
+    mjpeg_server_port: Optional[int] = None
+    capabilities: Dict[str, Any] = field(default_factory=dict)
+
+    def apply_to(self, capabilities: Dict[str, Any]) -> Dict[str, Any]:
+        """Pin ``capabilities`` to this device; registry values win over capabilities.json."""
+        capabilities["appium:udid"] = self.udid
+        capabilities["appium:deviceName"] = self.name or self.udid
+        for attribute, capability in _PORT_CAPABILITIES.items():
+            port = getattr(self, attribute)
+            if port is not None:
+                capabilities[capability] = port
+        capabilities.update(self.capabilities)
+        return capabilities
+
+
+def load_registry(path: Path) -> List[DeviceSpec]:
+    """Parse the registry and fill in missing ports; duplicate udids or ports are configuration errors."""
+    with Path(path).open("r", encoding="utf-8") as registry_file:
+        data = yaml.safe_load(registry_file) or {}
+    port_bases = {**DEFAULT_PORT_BASES, **(data.get("ports") or {})}
+
+    devices = []
+    for index, entry in enumerate(data.get("devices") or []):
+        if not entry.get("udid"):
+            raise ValueError(f"Device #{index} in {path} has no udid")
+        device = DeviceSpec(
+            udid=str(entry["udid"]),
+            name=str(entry.get("name", "")),
+            server_url=entry.get("server_url"),
+            capabilities=dict(entry.get("capabilities") or {}),
+        )
+        for attribute in _PORT_CAPABILITIES:
+            port = entry.get(attribute)
+            setattr(device, attribute, int(port) if port is not None else port_bases[attribute] + index)
+        devices.append(device)
+
+    _check_unique(devices, path)
+    return devices
+
+
+def _check_unique(devices: List[DeviceSpec], path: Path) -> None:
+    seen: Dict[Any, str] = {}
+    for device in devices:
+        keys = [("udid", device.udid)]
+        # Ports only need to be unique per Appium server host.
+        host = device.server_url or ""
+        keys += [(attribute, host, getattr(device, attribute)) for attribute in _PORT_CAPABILITIES]
+        for key in keys:
+            if key in seen:
+                raise ValueError(f"{path}: {key[0]} {key[-1]} is used by both {seen[key]} and {device.udid}")
+            seen[key] = device.udid
+
+
+def registry_path_from_env() -> Optional[Path]:
+    """``FRAMEWORK_DEVICES`` wins; otherwise ``config/devices.yaml`` if it exists. ``0`` disables leasing."""
+    value = (os.environ.get(DEVICE_REGISTRY_ENV) or "").strip()
+    if value.lower() in ("0", "false", "no", "off"):
+        return None
+    if value:
+        return Path(value) if Path(value).is_absolute() else REPO_ROOT / value
+    return DEVICE_REGISTRY_PATH if DEVICE_REGISTRY_PATH.exists() else None
+
+
+def _try_lock(handle: IO[str]) -> bool:
+    try:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:  # pragma: no cover - Windows
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(handle: IO[str]) -> None:
+    if fcntl:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:  # pragma: no cover - Windows
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DeviceLease:
+    """Exclusive hold on one device; released explicitly or when the process dies."""
+
+    def __init__(self, device: DeviceSpec, handle: IO[str], lock_path: Path):
+        self.device = device
+        self.lock_path = lock_path
+        self._handle: Optional[IO[str]] = handle
+
+    @property
+    def active(self) -> bool:
+        return self._handle is not None
+
+    def release(self) -> None:
+        if self._handle is None:
+            return
+        try:
+            self._handle.seek(0)
+            self._handle.truncate()
+            _unlock(self._handle)
+        finally:
+            self._handle.close()
+            self._handle = None
+        LOGGER.info("Released device %s", self.device.udid)
+
+    def __enter__(self) -> DeviceSpec:
+        return self.device
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+
+def _lock_name(udid: str) -> str:
+    # udids of network devices look like ``192.168.1.5:5555``.
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", udid) + ".lock"
+
+
+def _worker_index(worker_id: str) -> int:
+    match = re.search(r"(\d+)$", worker_id)
+    return int(match.group(1)) if match else 0
+
+
+class DeviceScheduler:
+    """Hands out registry devices to workers, one exclusive lease each."""
+
+    def __init__(self, devices: List[DeviceSpec], lock_dir: Path = LOCK_DIR):
+        if not devices:
+            raise ValueError("Device registry is empty")
+        self.devices = devices
+        self.lock_dir = Path(lock_dir)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+
+    def _candidates(self, worker_id: str) -> List[DeviceSpec]:
+        """Start at the worker's own slot (gw2 -> device 2) so leases rarely contend."""
+        start = _worker_index(worker_id) % len(self.devices)
+        return self.devices[start:] + self.devices[:start]
+
+    def try_lease(self, worker_id: str) -> Optional[DeviceLease]:
+        for device in self._candidates(worker_id):
+            lock_path = self.lock_dir / _lock_name(device.udid)
+            handle = lock_path.open("a+", encoding="utf-8")
+            if not _try_lock(handle):
+                handle.close()
+                continue
+            handle.seek(0)
+            handle.truncate()
+            handle.write(json.dumps({"worker": worker_id, "pid": os.getpid(), "leased_at": time.time()}))
+            handle.flush()
+            LOGGER.info("Worker %s leased device %s (%s)", worker_id, device.udid, device.name or "unnamed")
+            return DeviceLease(device, handle, lock_path)
+        return None
+
+    def lease(
+        self,
+        worker_id: str,
+        timeout: float = DEFAULT_LEASE_TIMEOUT,
+        poll_interval: float = LEASE_POLL_INTERVAL,
+    ) -> DeviceLease:
+        """Block until a device is free; more workers than devices simply queue."""
+        deadline = time.monotonic() + timeout
+        while True:
+            lease = self.try_lease(worker_id)
+            if lease:
+                return lease
+            if time.monotonic() >= deadline:
+                raise DeviceUnavailableError(
+                    f"Worker {worker_id} could not lease any of {len(self.devices)} devices within {timeout:.0f}s"
+                )
+            LOGGER.debug("All devices busy; worker %s waiting for a lease", worker_id)
+            time.sleep(poll_interval)
+
+    def holders(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """udid -> lease metadata of the current holder (``None`` when free), for diagnostics."""
+        status = {}
+        for device in self.devices:
+            lock_path = self.lock_dir / _lock_name(device.udid)
+            lease = None
+            with lock_path.open("a+", encoding="utf-8") as handle:
+                if _try_lock(handle):
+                    _unlock(handle)
+                else:
+                    handle.seek(0)
+                    try:
+                        lease = json.loads(handle.read() or "{}")
+                    except json.JSONDecodeError:
+                        lease = {}
+            status[device.udid] = lease
+        return status
+
+
+_WORKER_LEASE: Optional[DeviceLease] = None
+
+
+def get_worker_device(timeout: Optional[float] = None) -> Optional[DeviceSpec]:
+    """
+    The device leased by this process (one per xdist worker), leasing it on first use.
+    Returns ``None`` when no registry is configured, keeping single-device runs unchanged.
+    """
+    global _WORKER_LEASE  # pylint: disable=global-statement
+    if _WORKER_LEASE and _WORKER_LEASE.active:
+        return _WORKER_LEASE.device
+    path = registry_path_from_env()
+    if path is None:
+        return None
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    scheduler = DeviceScheduler(load_registry(path))
+    _WORKER_LEASE = scheduler.lease(worker_id, timeout if timeout is not None else DEFAULT_LEASE_TIMEOUT)
+    return _WORKER_LEASE.device
+
+
+def release_worker_device() -> None:
+    global _WORKER_LEASE  # pylint: disable=global-statement
+    if _WORKER_LEASE:
+        _WORKER_LEASE.release()
+        _WORKER_LEASE = None
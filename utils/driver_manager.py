@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -7,14 +8,45 @@ import yaml
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
 
+from utils.device_pool import DEFAULT_LEASE_TIMEOUT, DeviceSpec, get_worker_device, release_worker_device
 from utils.logger import get_logger
+from utils.page_snapshot import invalidate_snapshot
+from utils.record_replay import (
+    TRACE_RECORD_ENV,
+    TRACE_REPLAY_ENV,
+    attach_recorder,
+    create_replay_driver,
+    session_trace_dir,
+    trace_root_from_env,
+)
+from utils.timings import instrument_driver, timings_enabled
+from utils.wait_policy import set_implicit_wait
 
 LOGGER = get_logger(__name__)
 REPO_ROOT = Path(__file__).resolve().parents[1]
 CAPABILITIES_PATH = REPO_ROOT / "config" / "capabilities.json"
 CONFIG_PATH = REPO_ROOT / "config" / "config.yaml"
-APPIUM_SERVER_URL = os.environ.get("APPIUM_SERVER_URL", "http://127.0.0.1:4723")
+APPIUM_SERVER_URL_ENV = "APPIUM_SERVER_URL"
+DEFAULT_APPIUM_SERVER_URL = "http://127.0.0.1:4723"
 ENV_CAPABILITY_PREFIX = "APPIUM_CAP_"
+SESSION_REUSE_ENV = "FRAMEWORK_SESSION_REUSE"
+APP_RESET_STRATEGIES = ("clear", "restart")
+APP_STATE_RUNNING_IN_FOREGROUND = 4
+
+# Sessions started by this process, used to pair recorded and replayed traces.
+_SESSION_COUNTER = 0
+
+
+def _forget_login(driver: webdriver.Remote) -> None:
+    """Drop the signed-in user kept for ``driver``; a reset or new session signs the app out."""
+    from pages.login_state import forget  # local import: pages depend on utils, not the other way round
+
+    forget(driver)
+
+
+def resolve_server_url() -> str:
+    """Read at call time so a server started during pytest configuration (e.g. the stub) is picked up."""
+    return os.environ.get(APPIUM_SERVER_URL_ENV, DEFAULT_APPIUM_SERVER_URL)
 
 
 class DriverManager:
@@ -24,12 +56,15 @@ class DriverManager:
         self,
         capabilities_path: Path = CAPABILITIES_PATH,
         config_path: Path = CONFIG_PATH,
-        server_url: str = APPIUM_SERVER_URL,
+        server_url: Optional[str] = None,
+        device: Optional[DeviceSpec] = None,
     ):
         self.capabilities_path = capabilities_path
         self.config_path = config_path
-        self.server_url = server_url
+        self.device = device
+        self.server_url = server_url or (device.server_url if device else None) or resolve_server_url()
         self.driver: Optional[webdriver.Remote] = None
+        self.capabilities: Dict[str, Any] = {}
 
     def _load_capabilities(self) -> Dict[str, Any]:
         LOGGER.info("Loading capabilities from %s", self.capabilities_path)
@@ -38,6 +73,8 @@ class DriverManager:
 
         self._apply_env_overrides(capabilities)
         self._normalize_app_path(capabilities)
+        if self.device:
+            self.device.apply_to(capabilities)
         return capabilities
 
     def _apply_env_overrides(self, capabilities: Dict[str, Any]) -> None:
@@ -81,21 +118,89 @@ class DriverManager:
 
         capabilities = self._load_capabilities()
         config = self._load_config()
+        self.capabilities = capabilities
 
-        LOGGER.info("Starting Appium session on %s", self.server_url)
-        options = UiAutomator2Options().load_capabilities(capabilities)
-        self.driver = webdriver.Remote(self.server_url, options=options)
+        self.driver = self._create_driver(capabilities)
 
-        implicit_wait = config.get("implicit_wait", 10)
-        self.driver.implicitly_wait(implicit_wait)
+        # Explicit waits do all blocking; a non-zero implicit wait stalls every empty find_elements.
+        implicit_wait = config.get("implicit_wait", 0)
+        set_implicit_wait(self.driver, implicit_wait)
         LOGGER.info("Driver started with implicit wait set to %ss", implicit_wait)
         return self.driver
 
+    def _create_driver(self, capabilities: Dict[str, Any]) -> webdriver.Remote:
+        global _SESSION_COUNTER  # pylint: disable=global-statement
+        _SESSION_COUNTER += 1
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+        replay_root = trace_root_from_env(TRACE_REPLAY_ENV)
+        if replay_root:
+            trace_dir = session_trace_dir(replay_root, worker_id, _SESSION_COUNTER)
+            LOGGER.info("Replaying Appium session from %s", trace_dir)
+            driver = create_replay_driver(trace_dir)
+            if timings_enabled():
+                instrument_driver(driver)
+            return driver
+
+        LOGGER.info("Starting Appium session on %s", self.server_url)
+        options = UiAutomator2Options().load_capabilities(capabilities)
+        driver = webdriver.Remote(self.server_url, options=options)
+
+        record_root = trace_root_from_env(TRACE_RECORD_ENV)
+        if record_root:
+            attach_recorder(
+                driver,
+                session_trace_dir(record_root, worker_id, _SESSION_COUNTER),
+                {"server_url": self.server_url, "worker": worker_id},
+            )
+        if timings_enabled():
+            instrument_driver(driver)
+        return driver
+
+    @property
+    def app_package(self) -> Optional[str]:
+        return self.capabilities.get("appium:appPackage") or self.capabilities.get("appPackage")
+
+    def fingerprint(self, capabilities: Optional[Dict[str, Any]] = None) -> str:
+        """Stable hash of the capabilities + server URL a session was (or would be) created with."""
+        payload = json.dumps(
+            {"server_url": self.server_url, "capabilities": capabilities or self.capabilities},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def reset_app(self, strategy: str = "clear") -> None:
+        """Bring the app under test back to a cold-start state without ending the session."""
+        if not self.driver:
+            raise RuntimeError("Cannot reset app state without an active driver session.")
+        if strategy not in APP_RESET_STRATEGIES:
+            raise ValueError(f"Unknown app reset strategy '{strategy}'. Expected one of {APP_RESET_STRATEGIES}.")
+
+        package = self.app_package
+        if not package:
+            raise RuntimeError("Capabilities do not declare an appPackage; cannot reset app state.")
+
+        invalidate_snapshot(self.driver)
+        _forget_login(self.driver)
+        if strategy == "clear":
+            # clearApp stops the app and wipes its data, mirroring a noReset=false session start.
+            self.driver.execute_script("mobile: clearApp", {"appId": package})
+        else:
+            self.driver.terminate_app(package)
+        self.driver.activate_app(package)
+
+        state = self.driver.query_app_state(package)
+        if state != APP_STATE_RUNNING_IN_FOREGROUND:
+            raise RuntimeError(f"App {package} is not in the foreground after reset (state={state}).")
+        LOGGER.info("Reset app %s using '%s' strategy", package, strategy)
+
     def stop(self) -> None:
         if not self.driver:
             LOGGER.debug("No active driver session to stop.")
             return
 
+        _forget_login(self.driver)
         try:
             self.driver.quit()
             LOGGER.info("Driver session quit successfully")
@@ -111,6 +216,129 @@ class DriverManager:
         self.stop()
 
 
+class SessionPool:
+    """
+    Keeps Appium sessions alive across tests and resets app state between them.
+
+    Every xdist worker is a separate process, so the module-level pool returned by
+    :func:`get_session_pool` naturally holds one session per worker. A fresh session
+    is only created when the app reset fails or the capabilities/server change. When a
+    device registry is configured each worker leases its own device on first acquire.
+    """
+
+    def __init__(
+        self,
+        capabilities_path: Path = CAPABILITIES_PATH,
+        config_path: Path = CONFIG_PATH,
+        server_url: Optional[str] = None,
+    ):
+        self.capabilities_path = capabilities_path
+        self.config_path = config_path
+        self.server_url = server_url
+        self.device: Optional[DeviceSpec] = None
+        self.worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        self._manager: Optional[DriverManager] = None
+        self._fingerprint: Optional[str] = None
+        self._in_use = False
+        self._needs_reset = False
+        self._reuse = True
+
+    def _new_manager(self) -> DriverManager:
+        return DriverManager(self.capabilities_path, self.config_path, self.server_url, self.device)
+
+    def _reuse_enabled(self, config: Dict[str, Any]) -> bool:
+        env_value = os.environ.get(SESSION_REUSE_ENV)
+        if env_value is not None:
+            return env_value.strip().lower() not in ("0", "false", "no", "off")
+        return bool(config.get("session_reuse", True))
+
+    def acquire(self, keep_app_state: bool = False) -> webdriver.Remote:
+        """
+        Return a ready driver, reusing the pooled session whenever possible. With
+        ``keep_app_state`` a reused session skips the app reset, so the caller can restore
+        a signed-in state instead of logging in again (see :mod:`pages.login_state`).
+        """
+        if self._in_use:
+            raise RuntimeError(f"Session pool for worker {self.worker_id} is already leased.")
+
+        config = DriverManager(self.capabilities_path, self.config_path, self.server_url)._load_config()
+        if self.device is None:
+            self.device = get_worker_device(float(config.get("device_lease_timeout", DEFAULT_LEASE_TIMEOUT)))
+        probe = self._new_manager()
+        fingerprint = probe.fingerprint(probe._load_capabilities())
+        self._reuse = self._reuse_enabled(config)
+
+        if self._manager and self._manager.driver:
+            if fingerprint != self._fingerprint:
+                LOGGER.info("Capabilities changed; discarding pooled session on worker %s", self.worker_id)
+                self._discard()
+            elif self._needs_reset and not keep_app_state and not self._try_reset(config.get("app_reset", "clear")):
+                self._discard()
+            else:
+                LOGGER.info("Reusing pooled Appium session on worker %s", self.worker_id)
+
+        if not self._manager or not self._manager.driver:
+            self._manager = self._new_manager()
+            self._manager.start()
+            self._fingerprint = self._manager.fingerprint()
+
+        self._in_use = True
+        self._needs_reset = True
+        return self._manager.driver
+
+    def release(self, driver: webdriver.Remote) -> None:
+        """Return the driver to the pool; the app is reset on the next acquire."""
+        self._in_use = False
+        if not self._manager or self._manager.driver is not driver:
+            LOGGER.debug("Releasing a driver that is not pooled; quitting it instead.")
+            quit_driver(driver)
+            return
+        if not self._reuse:
+            LOGGER.debug("Session reuse disabled; quitting session on worker %s", self.worker_id)
+            self._discard()
+
+    def reset_app(self) -> bool:
+        """Reset the app of the leased session now; ``False`` when there is none or the reset failed."""
+        if not self._manager or not self._manager.driver:
+            return False
+        config = self._manager._load_config()
+        return self._try_reset(config.get("app_reset", "clear"))
+
+    def _try_reset(self, strategy: str) -> bool:
+        try:
+            self._manager.reset_app(strategy)
+            return True
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning("App reset failed on worker %s, starting a fresh session: %s", self.worker_id, exc)
+            return False
+
+    def _discard(self) -> None:
+        if self._manager:
+            self._manager.stop()
+        self._manager = None
+        self._fingerprint = None
+
+    def close(self) -> None:
+        """Quit the pooled session and hand its device back, typically at the end of the pytest session."""
+        self._discard()
+        self._in_use = False
+        self._needs_reset = False
+        if self.device:
+            release_worker_device()
+            self.device = None
+
+
+_SESSION_POOL: Optional[SessionPool] = None
+
+
+def get_session_pool() -> SessionPool:
+    """Return the per-process (and therefore per-xdist-worker) session pool."""
+    global _SESSION_POOL  # pylint: disable=global-statement
+    if _SESSION_POOL is None:
+        _SESSION_POOL = SessionPool()
+    return _SESSION_POOL
+
+
 def get_driver() -> webdriver.Remote:
     """Backward compatible helper for existing fixtures."""
     return DriverManager().start()
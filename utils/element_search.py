@@ -0,0 +1,183 @@
+"""
+Text searches compiled into single on-device queries.
+
+Finding "the product called X" used to mean fetching every title element and reading
+``.text`` on each over the wire, swiping, and repeating. :func:`find_by_text` compiles a
+:class:`TextQuery` into one locator instead and tries strategies in order:
+
+``uiscrollable``
+    ``UiScrollable(...).scrollIntoView(UiSelector...)`` - UiAutomator matches and scrolls on
+    the device in one command (Android only).
+``xpath``
+    An XPath query for an element already on screen (any platform).
+``client_scan``
+    Last resort: scroll with :mod:`utils.gestures` and match against page-source snapshots.
+
+The winning strategy is returned on :class:`SearchResult` and logged. A strategy the driver
+rejects as an invalid selector is skipped for the rest of that driver's session.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Set, Tuple
+from weakref import WeakKeyDictionary
+
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import InvalidSelectorException, NoSuchElementException, WebDriverException
+
+from utils import gestures
+from utils.logger import get_logger
+from utils.page_snapshot import PageSnapshot, SnapshotNode
+from utils.timings import WAIT, timed
+from utils.wait_policy import probe_elements
+
+LOGGER = get_logger(__name__)
+
+Locator = Tuple[str, str]
+
+UISCROLLABLE, XPATH, CLIENT_SCAN = "uiscrollable", "xpath", "client_scan"
+STRATEGIES = (UISCROLLABLE, XPATH, CLIENT_SCAN)
+ANDROID_ONLY = (UISCROLLABLE,)
+
+_UNSUPPORTED: "WeakKeyDictionary[object, Set[str]]" = WeakKeyDictionary()
+
+
+@dataclass(frozen=True)
+class TextQuery:
+    """
+    An element whose text equals (or, with ``exact=False``, contains) ``text``. ``description``
+    narrows it to elements with that content-desc / accessibility id, e.g. ``"test-Item title"``.
+    """
+
+    text: str
+    exact: bool = True
+    description: Optional[str] = None
+
+    def matches(self, node: SnapshotNode) -> bool:
+        if self.description is not None and node.content_desc != self.description:
+            return False
+        text = node.text.strip()
+        return text == self.text if self.exact else self.text in text
+
+
+@dataclass
+class SearchResult:
+    element: object
+    strategy: str
+    attempts: List[Tuple[str, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def _java_string(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _xpath_literal(value: str) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+def ui_selector(query: TextQuery) -> str:
+    selector = "new UiSelector()"
+    if query.description is not None:
+        selector += f".description({_java_string(query.description)})"
+    method = "text" if query.exact else "textContains"
+    return selector + f".{method}({_java_string(query.text)})"
+
+
+def ui_scrollable(query: TextQuery) -> str:
+    return (
+        "new UiScrollable(new UiSelector().scrollable(true).instance(0))"
+        f".scrollIntoView({ui_selector(query)})"
+    )
+
+
+def xpath(query: TextQuery) -> str:
+    predicates = []
+    if query.description is not None:
+        predicates.append(f"[@content-desc={_xpath_literal(query.description)}]")
+    literal = _xpath_literal(query.text)
+    predicates.append(f"[@text={literal}]" if query.exact else f"[contains(@text, {literal})]")
+    return "//*" + "".join(predicates)
+
+
+def compile_query(query: TextQuery, strategy: str) -> Optional[Locator]:
+    """The single locator ``strategy`` sends to the driver; ``None`` for the client-side scan."""
+    if strategy == UISCROLLABLE:
+        return AppiumBy.ANDROID_UIAUTOMATOR, ui_scrollable(query)
+    if strategy == XPATH:
+        return AppiumBy.XPATH, xpath(query)
+    return None
+
+
+def _platform(driver) -> str:
+    capabilities = getattr(driver, "capabilities", None) or {}
+    return str(capabilities.get("platformName", "")).lower()
+
+
+def _client_scan(driver, query: TextQuery, max_scrolls: int):
+    """Match on snapshots, then fetch the element by its position among same-kind nodes."""
+
+    def finder(snapshot: PageSnapshot):
+        for node in snapshot.nodes:
+            if node.tag == "hierarchy" or not query.matches(node):
+                continue
+            if query.description is not None:
+                base: Locator = (AppiumBy.ACCESSIBILITY_ID, query.description)
+            else:
+                base = (AppiumBy.CLASS_NAME, node.tag)
+            siblings = snapshot.find_all(base) or []
+            elements = probe_elements(driver, base)
+            position = next((index for index, other in enumerate(siblings) if other.index == node.index), None)
+            if position is not None and position < len(elements):
+                return elements[position]
+        return None
+
+    return gestures.scroll_until(driver, finder, max_scrolls=max_scrolls)
+
+
+def find_by_text(
+    driver,
+    query: TextQuery,
+    strategies: Sequence[str] = STRATEGIES,
+    max_scrolls: int = gestures.DEFAULT_MAX_SCROLLS,
+) -> SearchResult:
+    """Try ``strategies`` in order; raises ``NoSuchElementException`` when none finds the element."""
+    unsupported = _UNSUPPORTED.setdefault(driver, set())
+    is_ios = _platform(driver) == "ios"
+    attempts: List[Tuple[str, str]] = []
+    started = time.perf_counter()
+    for strategy in strategies:
+        if strategy in unsupported or (is_ios and strategy in ANDROID_ONLY):
+            attempts.append((strategy, "skipped"))
+            continue
+        with timed(WAIT, "element_search", f"{strategy} {query.text!r}"):
+            try:
+                locator = compile_query(query, strategy)
+                if locator is None:
+                    element = _client_scan(driver, query, max_scrolls)
+                else:
+                    elements = probe_elements(driver, locator)
+                    element = elements[0] if elements else None
+            except InvalidSelectorException as exc:
+                LOGGER.debug("Driver rejected %s search: %s", strategy, exc.msg)
+                unsupported.add(strategy)
+                attempts.append((strategy, "unsupported"))
+                continue
+            except WebDriverException as exc:
+                attempts.append((strategy, f"error: {exc.msg}"))
+                continue
+        if element is None:
+            attempts.append((strategy, "not found"))
+            continue
+        attempts.append((strategy, "found"))
+        result = SearchResult(element, strategy, attempts, time.perf_counter() - started)
+        LOGGER.info("Found %r via %s in %.0fms", query.text, strategy, result.elapsed * 1000)
+        return result
+    raise NoSuchElementException(f"No element with text {query.text!r}; tried {attempts}")
@@ -0,0 +1,164 @@
+"""
+Swipes, flings and scroll-to-find built from W3C pointer actions.
+
+Coordinates come from the window rect (fetched once per driver), so gestures work at any
+resolution instead of assuming a 1080x1920 screen. A controlled :func:`drag` holds the
+finger still before lifting it, which stops the list from coasting, so the page source read
+right after the gesture is already the settled screen; there is no fixed sleep.
+
+Settling and the end of a list are both detected from page-source hashes: a scroll whose
+source hash equals the one before it did not move anything, so :func:`scroll_until` stops
+there instead of swiping blindly. Each step costs the gesture plus one page-source read,
+and the snapshot it reads is the one later element lookups are answered from.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+from weakref import WeakKeyDictionary
+
+from selenium.webdriver.common.actions import interaction
+from selenium.webdriver.common.actions.action_builder import ActionBuilder
+from selenium.webdriver.common.actions.mouse_button import MouseButton
+from selenium.webdriver.common.actions.pointer_input import PointerInput
+
+from utils.logger import get_logger
+from utils.page_snapshot import PageSnapshot, get_snapshot, invalidate_snapshot
+from utils.timings import ACTION, WAIT, timed
+from utils.wait_policy import probe_elements
+
+LOGGER = get_logger(__name__)
+
+Locator = Tuple[str, str]
+Point = Tuple[int, int]
+T = TypeVar("T")
+
+# Scrolls travel between these fractions of the window height, centred horizontally.
+SCROLL_EDGE = 0.2
+DRAG_DURATION_MS = 400
+HOLD_MS = 100
+FLING_DURATION_MS = 120
+SETTLE_TIMEOUT = 2.0
+SETTLE_INTERVAL = 0.1
+DEFAULT_MAX_SCROLLS = 10
+
+_WINDOW_RECTS: "WeakKeyDictionary[object, Dict[str, int]]" = WeakKeyDictionary()
+
+
+def window_rect(driver, refresh: bool = False) -> Dict[str, int]:
+    """``x``/``y``/``width``/``height`` of the app window, cached per driver."""
+    rect = _WINDOW_RECTS.get(driver)
+    if rect is None or refresh:
+        rect = driver.get_window_rect()
+        _WINDOW_RECTS[driver] = rect
+    return rect
+
+
+def scroll_points(rect: Dict[str, int], direction: str = "down", percent: float = 0.6) -> Tuple[Point, Point]:
+    """
+    Finger start and end for scrolling the content ``direction`` ("down" reveals what is
+    below, so the finger moves up). ``percent`` is the share of the window height travelled.
+    """
+    if direction not in ("up", "down"):
+        raise ValueError(f"Unsupported scroll direction '{direction}'")
+    percent = min(max(percent, 0.05), 1 - 2 * SCROLL_EDGE)
+    x = rect.get("x", 0) + rect["width"] // 2
+    top = rect.get("y", 0) + int(rect["height"] * SCROLL_EDGE)
+    bottom = top + int(rect["height"] * percent)
+    return ((x, bottom), (x, top)) if direction == "down" else ((x, top), (x, bottom))
+
+
+def _perform(driver, start: Point, end: Point, duration_ms: int, hold_ms: int) -> None:
+    finger = PointerInput(interaction.POINTER_TOUCH, "finger")
+    actions = ActionBuilder(driver, mouse=finger)
+    finger.create_pointer_move(duration=0, x=start[0], y=start[1])
+    finger.create_pointer_down(button=MouseButton.LEFT)
+    finger.create_pointer_move(duration=duration_ms, x=end[0], y=end[1])
+    if hold_ms:
+        finger.create_pause(hold_ms / 1000)
+    finger.create_pointer_up(MouseButton.LEFT)
+    actions.perform()
+    invalidate_snapshot(driver)
+
+
+def drag(driver, start: Point, end: Point, duration_ms: int = DRAG_DURATION_MS, hold_ms: int = HOLD_MS) -> None:
+    """Controlled swipe: the pause before lifting the finger leaves no fling momentum."""
+    LOGGER.debug("Dragging from %s to %s over %sms", start, end, duration_ms)
+    with timed(ACTION, "drag", f"{start}->{end}"):
+        _perform(driver, start, end, duration_ms, hold_ms)
+
+
+def fling(driver, direction: str = "down", percent: float = 0.6) -> PageSnapshot:
+    """Fast swipe that lets the list coast; returns the snapshot once it has settled."""
+    start, end = scroll_points(window_rect(driver), direction, percent)
+    LOGGER.debug("Flinging %s from %s to %s", direction, start, end)
+    with timed(ACTION, "fling", direction):
+        _perform(driver, start, end, FLING_DURATION_MS, 0)
+    return wait_for_settle(driver)
+
+
+def wait_for_settle(driver, timeout: float = SETTLE_TIMEOUT, interval: float = SETTLE_INTERVAL) -> PageSnapshot:
+    """Poll page-source hashes until two consecutive reads agree (or ``timeout`` passes)."""
+    deadline = time.monotonic() + timeout
+    with timed(WAIT, "wait_for_settle"):
+        snapshot = get_snapshot(driver, refresh=True)
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            current = get_snapshot(driver, refresh=True)
+            if current.source_hash == snapshot.source_hash:
+                return current
+            snapshot = current
+    LOGGER.debug("Screen still changing after %.1fs; continuing with the latest snapshot", timeout)
+    return snapshot
+
+
+def scroll(driver, direction: str = "down", percent: float = 0.6) -> Tuple[bool, PageSnapshot]:
+    """
+    Scroll once with a controlled drag. Returns whether anything moved (``False`` at the end
+    of the list) and the snapshot after the scroll.
+    """
+    before = get_snapshot(driver).source_hash
+    start, end = scroll_points(window_rect(driver), direction, percent)
+    drag(driver, start, end)
+    after = get_snapshot(driver, refresh=True)
+    return after.source_hash != before, after
+
+
+def scroll_until(
+    driver,
+    finder: Callable[[PageSnapshot], Optional[T]],
+    direction: str = "down",
+    max_scrolls: int = DEFAULT_MAX_SCROLLS,
+    percent: float = 0.6,
+) -> Optional[T]:
+    """
+    Scroll until ``finder`` returns something for the current snapshot, the list stops
+    moving, or ``max_scrolls`` is used up. Returns the finder's result or ``None``.
+    """
+    snapshot = get_snapshot(driver)
+    for step in range(max_scrolls + 1):
+        found = finder(snapshot)
+        if found is not None:
+            return found
+        if step == max_scrolls:
+            break
+        moved, snapshot = scroll(driver, direction, percent)
+        if not moved:
+            LOGGER.debug("End of list reached after %s scrolls", step)
+            break
+    return None
+
+
+def scroll_to_locator(driver, locator: Locator, direction: str = "down", max_scrolls: int = DEFAULT_MAX_SCROLLS):
+    """Scroll until ``locator`` is on screen and return its element; ``None`` when it never appears."""
+
+    def finder(snapshot: PageSnapshot):
+        present = snapshot.exists(locator)
+        if present is False:
+            return None
+        # Confirmed by the snapshot, or a locator the snapshot cannot answer: ask the driver.
+        elements = [element for element in probe_elements(driver, locator) if element.is_displayed()]
+        return elements[0] if elements else None
+
+    return scroll_until(driver, finder, direction, max_scrolls)
@@ -2,16 +2,15 @@ import time
 from pathlib import Path
 from typing import Optional, Tuple
 
-try:
-    import allure
-except ImportError:  # pragma: no cover - allure is optional in some environments
-    allure = None  # type: ignore
-
-from appium.webdriver.common.appiumby import AppiumBy
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from utils import gestures
+from utils.element_search import UISCROLLABLE, TextQuery, compile_query
 from utils.logger import get_logger
+from utils.page_snapshot import invalidate_snapshot
+from utils.screenshot_writer import capture_screenshot
+from utils.timings import WAIT, timed
 
 LOGGER = get_logger(__name__)
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -25,19 +24,22 @@ DEFAULT_TIMEOUT = 30
 def wait_for_element(driver, locator: Locator, timeout: Optional[int] = None):
     wait = WebDriverWait(driver, timeout or DEFAULT_TIMEOUT)
     LOGGER.debug("Waiting for element %s for %ss", locator, timeout or DEFAULT_TIMEOUT)
-    return wait.until(EC.presence_of_element_located(locator))
+    with timed(WAIT, "wait_for_element", locator):
+        return wait.until(EC.presence_of_element_located(locator))
 
 
 def wait_for_element_to_be_clickable(driver, locator: Locator, timeout: Optional[int] = None):
     wait = WebDriverWait(driver, timeout or DEFAULT_TIMEOUT)
     LOGGER.debug("Waiting for element %s to be clickable for %ss", locator, timeout or DEFAULT_TIMEOUT)
-    return wait.until(EC.element_to_be_clickable(locator))
+    with timed(WAIT, "wait_for_element_to_be_clickable", locator):
+        return wait.until(EC.element_to_be_clickable(locator))
 
 
 def tap_element(driver, locator: Locator, timeout: Optional[int] = None):
     element = wait_for_element_to_be_clickable(driver, locator, timeout)
     LOGGER.info("Tapping on element %s", locator)
     element.click()
+    invalidate_snapshot(driver)
 
 
 def type_text(driver, locator: Locator, text: str, timeout: Optional[int] = None):
@@ -45,35 +47,28 @@ def type_text(driver, locator: Locator, text: str, timeout: Optional[int] = None
     LOGGER.info("Typing into element %s", locator)
     element.clear()
     element.send_keys(text)
+    invalidate_snapshot(driver)
 
 
 def swipe(driver, start_x: int, start_y: int, end_x: int, end_y: int, duration_ms: int = 800):
+    """Controlled W3C drag between absolute points; see ``utils.gestures`` for window-relative scrolls."""
     LOGGER.info("Swiping from (%s,%s) to (%s,%s)", start_x, start_y, end_x, end_y)
-    driver.swipe(start_x, start_y, end_x, end_y, duration_ms)
-    time.sleep(1)
+    gestures.drag(driver, (start_x, start_y), (end_x, end_y), duration_ms)
 
 
 def scroll_to_text(driver, text: str):
     LOGGER.info("Scrolling to text containing '%s'", text)
-    ui_automator = (
-        "new UiScrollable(new UiSelector().scrollable(true).instance(0))"
-        f".scrollIntoView(new UiSelector().textContains(\"{text}\").instance(0));"
-    )
-    return driver.find_element(AppiumBy.ANDROID_UIAUTOMATOR, ui_automator)
+    element = driver.find_element(*compile_query(TextQuery(text, exact=False), UISCROLLABLE))
+    invalidate_snapshot(driver)
+    return element
 
 
-def scroll_to_element(driver, locator: Locator):
+def scroll_to_element(driver, locator: Locator, max_scrolls: int = gestures.DEFAULT_MAX_SCROLLS):
     LOGGER.info("Scrolling until element %s is visible", locator)
-    # Placeholder logic - to be replaced with custom scroll strategy when app is available.
-    for _ in range(5):
-        try:
-            element = driver.find_element(*locator)
-            if element.is_displayed():
-                return element
-        except Exception:  # pylint: disable=broad-except
-            pass
-        swipe(driver, 500, 1500, 500, 500)
-    raise TimeoutError(f"Element {locator} not visible after scrolling attempts")
+    element = gestures.scroll_to_locator(driver, locator, max_scrolls=max_scrolls)
+    if element is None:
+        raise TimeoutError(f"Element {locator} not visible after scrolling to the end of the list")
+    return element
 
 
 def get_text(driver, locator: Locator, timeout: Optional[int] = None) -> str:
@@ -95,12 +90,14 @@ def is_element_visible(driver, locator: Locator, timeout: Optional[int] = None)
 
 
 def attach_screenshot(driver, name: str = "screenshot") -> Optional[Path]:
-    """Save and attach a screenshot to Allure reports when available."""
+    """
+    Capture a screenshot for Allure. The image is stored in the background (deduplicated by
+    ``utils.artifact_store`` unless disabled) and attached when the test's screenshots are
+    flushed at teardown (see ``utils.screenshot_writer``). Returns the ``.json`` reference
+    path, or the PNG path when the store is disabled. The path is provisional until the
+    write finishes; ``resolve_screenshot`` gives the file that was actually written.
+    """
     timestamp = int(time.time() * 1000)
-    screenshot_path = SCREENSHOT_DIR / f"{name}_{timestamp}.png"
-    driver.save_screenshot(str(screenshot_path))
-    LOGGER.info("Screenshot saved at %s", screenshot_path)
-
-    if allure:
-        allure.attach.file(str(screenshot_path), name=name, attachment_type=allure.attachment_type.PNG)
+    screenshot_path = capture_screenshot(driver, SCREENSHOT_DIR / f"{name}_{timestamp}.png", name, store=True)
+    LOGGER.info("Screenshot queued at %s", screenshot_path)
     return screenshot_path
@@ -0,0 +1,273 @@
+"""
+Page-source snapshots: fetch ``driver.page_source`` once and answer many element
+queries locally from an indexed in-memory tree.
+
+Snapshots are cached per driver and dropped by :func:`invalidate_snapshot` after any
+mutating action (tap, type, swipe, app reset), so reads between two actions cost a
+single round-trip no matter how many elements are inspected.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+from xml.etree import ElementTree as ET
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__)
+
+Locator = Tuple[str, str]
+INDEXED_ATTRIBUTES = ("resource-id", "content-desc", "text", "class")
+
+_UI_SELECTOR_PREFIX = "new UiSelector()"
+_UI_SELECTOR_CALL = re.compile(r'\.(\w+)\(\s*("(?:[^"\\]|\\.)*"|[^()"]*)\s*\)')
+
+_SNAPSHOTS: "WeakKeyDictionary[object, PageSnapshot]" = WeakKeyDictionary()
+
+
+@dataclass
+class SnapshotNode:
+    index: int
+    tag: str
+    attributes: Dict[str, str]
+    parent: Optional[int] = None
+    children: List[int] = field(default_factory=list)
+
+    def get(self, name: str) -> str:
+        return self.attributes.get(name, "")
+
+    @property
+    def text(self) -> str:
+        return self.get("text")
+
+    @property
+    def content_desc(self) -> str:
+        return self.get("content-desc")
+
+    def flag(self, name: str) -> bool:
+        return self.get(name).lower() == "true"
+
+
+class PageSnapshot:
+    """Indexed, read-only view of one page source."""
+
+    def __init__(self, page_source: str, captured_at: Optional[float] = None):
+        self.page_source = page_source
+        self.captured_at = captured_at if captured_at is not None else time.monotonic()
+        self.nodes: List[SnapshotNode] = []
+        self._index: Dict[str, Dict[str, List[int]]] = {attr: {} for attr in INDEXED_ATTRIBUTES}
+        self._element_nodes: Dict[int, int] = {}
+        self._root: Optional[ET.Element] = None
+        self._hash: Optional[str] = None
+        self._build()
+
+    @classmethod
+    def capture(cls, driver) -> "PageSnapshot":
+        started = time.monotonic()
+        snapshot = cls(driver.page_source)
+        LOGGER.debug(
+            "Captured page snapshot with %s nodes in %.0fms",
+            len(snapshot.nodes),
+            (time.monotonic() - started) * 1000,
+        )
+        return snapshot
+
+    @property
+    def source_hash(self) -> str:
+        if self._hash is None:
+            self._hash = hashlib.sha1(self.page_source.encode("utf-8")).hexdigest()
+        return self._hash
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.captured_at
+
+    def _build(self) -> None:
+        try:
+            self._root = ET.fromstring(self.page_source)
+        except ET.ParseError as exc:
+            LOGGER.error("Failed to parse page source for snapshot: %s", exc)
+            return
+
+        stack: List[Tuple[ET.Element, Optional[int]]] = [(self._root, None)]
+        while stack:
+            element, parent = stack.pop()
+            node = SnapshotNode(index=len(self.nodes), tag=element.tag, attributes=dict(element.attrib), parent=parent)
+            self.nodes.append(node)
+            self._element_nodes[id(element)] = node.index
+            if parent is not None:
+                self.nodes[parent].children.append(node.index)
+            for attr in INDEXED_ATTRIBUTES:
+                value = node.attributes.get(attr)
+                if value:
+                    self._index[attr].setdefault(value, []).append(node.index)
+            # Reverse so children are visited (and numbered) in document order.
+            stack.extend((child, node.index) for child in reversed(list(element)))
+
+    def lookup(self, attribute: str, value: str) -> List[SnapshotNode]:
+        """Exact-match lookup on one of the indexed attributes."""
+        return [self.nodes[i] for i in self._index.get(attribute, {}).get(value, [])]
+
+    def supports(self, locator: Locator) -> bool:
+        return self.find_all(locator) is not None
+
+    def find_all(self, locator: Locator) -> Optional[List[SnapshotNode]]:
+        """
+        Resolve a locator against the snapshot. Returns ``None`` (not an empty list) when the
+        strategy cannot be evaluated locally, so callers know to fall back to the driver.
+        """
+        strategy, value = locator
+        if strategy == AppiumBy.ACCESSIBILITY_ID:
+            return self.lookup("content-desc", value)
+        if strategy == AppiumBy.ID:
+            if ":id/" in value:
+                return self.lookup("resource-id", value)
+            suffix = f":id/{value}"
+            return [
+                node for node in self.nodes if node.get("resource-id") == value or node.get("resource-id").endswith(suffix)
+            ]
+        if strategy == AppiumBy.CLASS_NAME:
+            return self.lookup("class", value)
+        if strategy == AppiumBy.ANDROID_UIAUTOMATOR:
+            return self._find_ui_selector(value)
+        if strategy == AppiumBy.XPATH:
+            return self._find_xpath(value)
+        return None
+
+    def find(self, locator: Locator) -> Optional[SnapshotNode]:
+        nodes = self.find_all(locator)
+        return nodes[0] if nodes else None
+
+    def exists(self, locator: Locator) -> Optional[bool]:
+        nodes = self.find_all(locator)
+        return None if nodes is None else bool(nodes)
+
+    def count(self, locator: Locator) -> Optional[int]:
+        nodes = self.find_all(locator)
+        return None if nodes is None else len(nodes)
+
+    def display_text(self, node: SnapshotNode) -> str:
+        """
+        Visible copy for a node: its own text, else the first text rendered inside it
+        (labelled containers such as ``test-Description``), else its accessibility label.
+        """
+        own = node.text.strip()
+        if own:
+            return own
+        stack = list(reversed(node.children))
+        while stack:
+            child = self.nodes[stack.pop()]
+            child_text = child.text.strip()
+            if child_text:
+                return child_text
+            stack.extend(reversed(child.children))
+        return node.content_desc.strip()
+
+    def get_text(self, locator: Locator) -> Optional[str]:
+        """Text of the first matching node that has any; ``None`` if unsupported or absent."""
+        nodes = self.find_all(locator)
+        if not nodes:
+            return None
+        for node in nodes:
+            text = self.display_text(node)
+            if text:
+                return text
+        return ""
+
+    def texts(self, locator: Locator) -> Optional[List[str]]:
+        nodes = self.find_all(locator)
+        if nodes is None:
+            return None
+        return [node.text.strip() for node in nodes if node.text.strip()]
+
+    def _find_ui_selector(self, expression: str) -> Optional[List[SnapshotNode]]:
+        expression = expression.strip().rstrip(";")
+        if not expression.startswith(_UI_SELECTOR_PREFIX):
+            return None
+        calls_source = expression[len(_UI_SELECTOR_PREFIX):]
+        calls = _UI_SELECTOR_CALL.findall(calls_source)
+        # Anything the regex did not consume (nested selectors, UiScrollable, ...) is unsupported.
+        if _UI_SELECTOR_CALL.sub("", calls_source).strip():
+            return None
+
+        predicates = []
+        instance: Optional[int] = None
+        for method, raw_arg in calls:
+            arg = _parse_ui_selector_arg(raw_arg)
+            if method == "instance":
+                instance = int(arg)
+                continue
+            predicate = _ui_selector_predicate(method, arg)
+            if predicate is None:
+                return None
+            predicates.append(predicate)
+
+        matches = [node for node in self.nodes if node.tag != "hierarchy" and all(p(node) for p in predicates)]
+        if instance is not None:
+            return matches[instance:instance + 1]
+        return matches
+
+    def _find_xpath(self, expression: str) -> Optional[List[SnapshotNode]]:
+        if self._root is None:
+            return None
+        path = expression
+        if path.startswith("//"):
+            path = "." + path
+        elif path.startswith("/"):
+            return None
+        try:
+            elements = self._root.findall(path.replace('"', "'"))
+        except (SyntaxError, KeyError, TypeError):
+            return None
+        return [self.nodes[self._element_nodes[id(element)]] for element in elements if id(element) in self._element_nodes]
+
+
+def _parse_ui_selector_arg(raw: str):
+    raw = raw.strip()
+    if raw.startswith('"') and raw.endswith('"'):
+        return raw[1:-1].replace('\\"', '"')
+    if raw in ("true", "false"):
+        return raw == "true"
+    return int(raw) if raw.lstrip("-").isdigit() else raw
+
+
+def _ui_selector_predicate(method: str, arg):
+    text_predicates = {
+        "text": ("text", lambda value, expected: value == expected),
+        "textContains": ("text", lambda value, expected: expected in value),
+        "textStartsWith": ("text", lambda value, expected: value.startswith(expected)),
+        "description": ("content-desc", lambda value, expected: value == expected),
+        "descriptionContains": ("content-desc", lambda value, expected: expected in value),
+        "descriptionStartsWith": ("content-desc", lambda value, expected: value.startswith(expected)),
+        "resourceId": ("resource-id", lambda value, expected: value == expected),
+        "className": ("class", lambda value, expected: value == expected),
+    }
+    if method in text_predicates:
+        attribute, compare = text_predicates[method]
+        return lambda node: compare(node.get(attribute), str(arg))
+    if method == "index":
+        return lambda node: node.get("index") == str(arg)
+    if method in ("clickable", "enabled", "checked", "selected", "scrollable", "focusable"):
+        return lambda node: node.flag(method) == bool(arg)
+    return None
+
+
+def get_snapshot(driver, refresh: bool = False, max_age: Optional[float] = None) -> PageSnapshot:
+    """Return the cached snapshot for ``driver``, capturing a new one when missing or stale."""
+    snapshot = _SNAPSHOTS.get(driver)
+    if snapshot is None or refresh or (max_age is not None and snapshot.age > max_age):
+        snapshot = PageSnapshot.capture(driver)
+        _SNAPSHOTS[driver] = snapshot
+    return snapshot
+
+
+def invalidate_snapshot(driver) -> None:
+    """Drop the cached snapshot; call after anything that can change the screen."""
+    _SNAPSHOTS.pop(driver, None)
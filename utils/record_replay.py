@@ -0,0 +1,294 @@
+"""
+Record-and-replay for Appium sessions.
+
+:func:`attach_recorder` wraps the command executor of a live driver and streams every
+command, its parameters and the raw response to ``<trace>/commands.jsonl.gz`` as it
+happens. Page sources and screenshots are written once per distinct content to
+``<trace>/blobs`` (screenshots as decoded PNG bytes, sources gzip-compressed) and
+referenced by hash, so a long run never accumulates in memory.
+
+:func:`create_replay_driver` builds a real ``webdriver.Remote`` on top of a
+:class:`ReplayConnection` that answers from the trace instead of the network. Replay
+follows the recorded order but tolerates a different number of polls: a repeated
+read-only command re-serves its last answer, and a command that is not next in the
+trace may skip ahead over recorded read-only polls to its match.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from appium import webdriver
+from appium.options.common.base import AppiumOptions
+from appium.webdriver.appium_connection import AppiumConnection
+from appium.webdriver.client_config import AppiumClientConfig
+
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TRACE_ROOT = REPO_ROOT / "reports" / "traces"
+TRACE_RECORD_ENV = "FRAMEWORK_TRACE_RECORD"
+TRACE_REPLAY_ENV = "FRAMEWORK_TRACE_REPLAY"
+TRACE_FORMAT_VERSION = 1
+COMMANDS_FILE = "commands.jsonl.gz"
+BLOB_DIR = "blobs"
+
+SCREENSHOT_COMMANDS = ("screenshot", "elementScreenshot")
+SOURCE_COMMANDS = ("getPageSource",)
+# Commands that never change app state; replay may skip over or repeat these.
+READ_ONLY_COMMANDS = frozenset(
+    (
+        "findElement",
+        "findElements",
+        "findChildElement",
+        "findChildElements",
+        "getPageSource",
+        "screenshot",
+        "elementScreenshot",
+        "getElementText",
+        "getElementAttribute",
+        "getElementProperty",
+        "getElementTagName",
+        "getElementRect",
+        "isElementDisplayed",
+        "isElementEnabled",
+        "isElementSelected",
+        "getWindowRect",
+        "getTimeouts",
+        "setTimeouts",
+        "getCurrentContextHandle",
+        "getScreenOrientation",
+    )
+)
+REPLAY_LOOKAHEAD = 200
+_PATH_PARAMS = ("sessionId",)
+
+
+def trace_root_from_env(env_key: str) -> Optional[Path]:
+    """``1``/``true`` selects ``reports/traces``; any other non-empty value is a directory."""
+    value = (os.environ.get(env_key) or "").strip()
+    if not value or value.lower() in ("0", "false", "no", "off"):
+        return None
+    if value.lower() in ("1", "true", "yes", "on"):
+        return TRACE_ROOT
+    return Path(value)
+
+
+def session_trace_dir(root: Path, worker_id: str, index: int) -> Path:
+    """Recording and replay agree on layout: the N-th session of a worker maps to the same directory."""
+    return Path(root) / worker_id / f"session-{index:03d}"
+
+
+class ReplayMismatchError(RuntimeError):
+    """The replayed test issued a command the trace cannot answer."""
+
+
+def command_key(command: str, params: Optional[Dict[str, Any]]) -> str:
+    """Canonical identity of a command, independent of the session it ran in."""
+    payload = {key: value for key, value in (params or {}).items() if key not in _PATH_PARAMS}
+    return f"{command} {json.dumps(payload, sort_keys=True, default=str)}"
+
+
+class TraceWriter:
+    """Append-only, incrementally flushed trace on disk."""
+
+    def __init__(self, trace_dir: Path, metadata: Optional[Dict[str, Any]] = None):
+        self.trace_dir = Path(trace_dir)
+        self.blob_dir = self.trace_dir / BLOB_DIR
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._stream = gzip.open(self.trace_dir / COMMANDS_FILE, "wt", encoding="utf-8", compresslevel=6)
+        self._lock = threading.Lock()
+        self._known_blobs = {path.name for path in self.blob_dir.iterdir()}
+        self.records = 0
+        self._write({"type": "header", "version": TRACE_FORMAT_VERSION, "created": time.time(), **(metadata or {})})
+
+    def record(self, command: str, params: Dict[str, Any], response: Any, elapsed: float) -> None:
+        value = self._externalize(command, response)
+        with self._lock:
+            self.records += 1
+            self._write(
+                {
+                    "type": "command",
+                    "seq": self.records,
+                    "command": command,
+                    "params": params,
+                    "response": value,
+                    "elapsed_ms": round(elapsed * 1000, 2),
+                }
+            )
+
+    def _externalize(self, command: str, response: Any) -> Any:
+        """Move screenshot and page-source payloads into content-addressed blob files."""
+        if not isinstance(response, dict) or not isinstance(response.get("value"), str):
+            return response
+        if command in SCREENSHOT_COMMANDS:
+            blob = self._store_blob(base64.b64decode(response["value"]), ".png", compress=False)
+        elif command in SOURCE_COMMANDS:
+            blob = self._store_blob(response["value"].encode("utf-8"), ".xml.gz", compress=True)
+        else:
+            return response
+        return {**response, "value": None, "blob": blob}
+
+    def _store_blob(self, data: bytes, suffix: str, compress: bool) -> str:
+        name = hashlib.sha1(data).hexdigest() + suffix
+        with self._lock:
+            if name not in self._known_blobs:
+                payload = gzip.compress(data, compresslevel=6) if compress else data
+                tmp_path = self.blob_dir / f".{name}.tmp"
+                tmp_path.write_bytes(payload)
+                tmp_path.replace(self.blob_dir / name)
+                self._known_blobs.add(name)
+        return name
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._stream.write(json.dumps(record, separators=(",", ":"), default=str))
+        self._stream.write("\n")
+        # Sync-flush so a crashed run still leaves a readable trace up to its last command.
+        self._stream.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._stream.closed:
+                self._stream.close()
+
+
+class TraceReader:
+    """Loads a trace written by :class:`TraceWriter`; blobs are read lazily on demand."""
+
+    def __init__(self, trace_dir: Path):
+        self.trace_dir = Path(trace_dir)
+        self.header: Dict[str, Any] = {}
+        self.commands: List[Dict[str, Any]] = []
+        with gzip.open(self.trace_dir / COMMANDS_FILE, "rt", encoding="utf-8") as stream:
+            try:
+                for line in stream:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record.get("type") == "header":
+                        self.header = record
+                    else:
+                        self.commands.append(record)
+            except (EOFError, json.JSONDecodeError):
+                # A run that crashed mid-write leaves an unterminated stream; keep what was flushed.
+                LOGGER.warning("Trace %s is truncated after %s commands", self.trace_dir, len(self.commands))
+
+    def response(self, record: Dict[str, Any]) -> Any:
+        response = record["response"]
+        if not isinstance(response, dict) or "blob" not in response:
+            return response
+        name = response["blob"]
+        data = (self.trace_dir / BLOB_DIR / name).read_bytes()
+        if name.endswith(".png"):
+            value = base64.b64encode(data).decode("ascii")
+        else:
+            value = gzip.decompress(data).decode("utf-8")
+        restored = {key: item for key, item in response.items() if key != "blob"}
+        restored["value"] = value
+        return restored
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.commands)
+
+
+def attach_recorder(driver, trace_dir: Path, metadata: Optional[Dict[str, Any]] = None) -> TraceWriter:
+    """Record every command ``driver`` sends from now on; the trace closes when the session quits."""
+    writer = TraceWriter(
+        trace_dir,
+        {"session_id": driver.session_id, "capabilities": dict(getattr(driver, "caps", {}) or {}), **(metadata or {})},
+    )
+    executor = driver.command_executor
+    execute = executor.execute
+
+    def recording_execute(command: str, params: Dict[str, Any]):
+        # RemoteConnection.execute strips URL parameters from ``params``, so keep a copy first.
+        recorded_params = dict(params or {})
+        started = time.perf_counter()
+        response = execute(command, params)
+        writer.record(command, recorded_params, response, time.perf_counter() - started)
+        if command == "quit":
+            writer.close()
+        return response
+
+    executor.execute = recording_execute
+    LOGGER.info("Recording Appium commands to %s", trace_dir)
+    return writer
+
+
+class ReplayConnection(AppiumConnection):
+    """Command executor that serves responses from a recorded trace."""
+
+    def __init__(self, trace_dir: Path):
+        super().__init__(client_config=AppiumClientConfig(remote_server_addr="http://replay.invalid"))
+        self.trace = TraceReader(trace_dir)
+        self._keys = [command_key(record["command"], record["params"]) for record in self.trace.commands]
+        self._cursor = 0
+        self._last: Optional[Tuple[str, Any]] = None
+        self._lock = threading.Lock()
+        self.served = 0
+        self.repeated = 0
+        self.skipped = 0
+
+    def execute(self, command, params):
+        if command == "newSession":
+            return {
+                "value": {
+                    "sessionId": self.trace.header.get("session_id") or "replay",
+                    "capabilities": self.trace.header.get("capabilities") or {},
+                }
+            }
+        key = command_key(command, params)
+        with self._lock:
+            response = self._next_response(command, key)
+        self.served += 1
+        return response
+
+    def _next_response(self, command: str, key: str) -> Any:
+        if self._cursor < len(self._keys) and self._keys[self._cursor] == key:
+            return self._serve(self._cursor, key)
+
+        # The replay polls more often than the recording did: answer with the last result.
+        if self._last and self._last[0] == key and command in READ_ONLY_COMMANDS:
+            self.repeated += 1
+            return self._last[1]
+
+        # The replay polls less often: skip recorded read-only commands until this one.
+        limit = min(len(self._keys), self._cursor + REPLAY_LOOKAHEAD)
+        for position in range(self._cursor, limit):
+            if self._keys[position] == key:
+                self.skipped += position - self._cursor
+                return self._serve(position, key)
+            if self.trace.commands[position]["command"] not in READ_ONLY_COMMANDS:
+                break
+
+        if command == "quit":
+            return {"value": None}
+        expected = self.trace.commands[self._cursor]["command"] if self._cursor < len(self._keys) else "<end of trace>"
+        raise ReplayMismatchError(
+            f"Replay diverged at record {self._cursor + 1}: test sent {key!r} but the trace expects {expected!r}"
+        )
+
+    def _serve(self, position: int, key: str) -> Any:
+        response = self.trace.response(self.trace.commands[position])
+        self._cursor = position + 1
+        self._last = (key, response)
+        return response
+
+
+def create_replay_driver(trace_dir: Path) -> webdriver.Remote:
+    """A driver backed by ``trace_dir`` that never talks to a server or device."""
+    connection = ReplayConnection(trace_dir)
+    options = AppiumOptions().load_capabilities(connection.trace.header.get("capabilities") or {})
+    driver = webdriver.Remote(connection, options=options)
+    LOGGER.info("Replaying %s recorded commands from %s", len(connection.trace.commands), trace_dir)
+    return driver
@@ -0,0 +1,209 @@
+"""
+Background screenshot writer.
+
+Capturing a failure screenshot used to cost the test thread a ``save_screenshot`` round
+trip plus the base64 decode and file write. :func:`capture_screenshot` now only fetches
+the base64 payload from the driver and hands it to a small thread pool that decodes and
+writes the PNG. At most ``max_pending`` captures are in flight; beyond that the caller
+blocks, so a burst of failures cannot pile up unbounded memory.
+
+Failure screenshots go through the deduplicating :mod:`utils.artifact_store` when it is
+enabled: the pool stores the image once and leaves a JSON reference at the requested path
+(with a ``.json`` suffix) instead of a full PNG. If the store fails (a locked index, an
+undecodable image) the plain PNG is written at the requested path instead.
+
+Allure attaches to the test of the *calling* thread, so attachments are not made by the
+pool: :func:`flush_screenshots` waits for every pending write and attaches the files on the
+test thread. The ``driver`` fixture calls it in teardown, which keeps attachments on the
+test that produced them. ``FRAMEWORK_ASYNC_SCREENSHOTS=0`` restores synchronous writes.
+"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import allure
+except ImportError:  # pragma: no cover - allure is optional in some environments
+    allure = None  # type: ignore
+
+from utils.artifact_store import artifact_store_enabled, get_artifact_store
+from utils.logger import get_logger
+from utils.timings import SCREENSHOT, timed
+
+LOGGER = get_logger(__name__)
+
+ASYNC_SCREENSHOTS_ENV = "FRAMEWORK_ASYNC_SCREENSHOTS"
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 16
+_MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".webp": "image/webp"}
+
+
+def _attach_file(path: Path, name: str) -> None:
+    if not allure:
+        return
+    suffix = path.suffix.lower()
+    mime_type = _MIME_TYPES.get(suffix, "image/png")
+    allure.attach.file(str(path), name=name, attachment_type=mime_type, extension=suffix[1:])
+
+
+@dataclass
+class PendingScreenshot:
+    path: Path
+    name: str
+    attach: bool
+    future: Future
+    reference: Path
+
+
+def _reference_path(path: Path, store: bool) -> Path:
+    """Where a capture is expected to land: the store's ``.json`` reference, else the PNG."""
+    return path.with_suffix(".json") if store and artifact_store_enabled() else path
+
+
+def _write_png(encoded: str, path: Path, store: bool = False, name: str = "") -> Path:
+    """Returns the file to attach: the PNG itself, or the stored (possibly shared) object."""
+    data = base64.b64decode(encoded)
+    if store and artifact_store_enabled():
+        try:
+            return get_artifact_store().put(data, path.with_suffix(".json"), {"name": name}).path
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning("Artifact store failed for %s, writing a plain PNG instead: %s", path.name, exc)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+    return path
+
+
+class ScreenshotWriter:
+    """Thread pool that turns captured base64 screenshots into files off the test thread."""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screenshot-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending: List[PendingScreenshot] = []
+        self._by_path: Dict[Path, PendingScreenshot] = {}
+
+    def submit(
+        self, encoded: str, path: Path, name: str, attach: bool = True, store: bool = False
+    ) -> PendingScreenshot:
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(_write_png, encoded, Path(path), store, name)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        pending = PendingScreenshot(Path(path), name, attach, future, _reference_path(Path(path), store))
+        with self._lock:
+            self._pending.append(pending)
+            self._by_path[pending.path] = pending
+            self._by_path[pending.reference] = pending
+        return pending
+
+    def wait_for(self, path: Path, timeout: Optional[float] = None) -> None:
+        """Block until ``path`` is on disk if it is still being written; no-op otherwise."""
+        with self._lock:
+            pending = self._by_path.get(Path(path))
+        if pending:
+            pending.future.result(timeout)
+
+    def flush(self, attach: bool = True, timeout: Optional[float] = None) -> List[Path]:
+        """Wait for every pending write and attach the files to Allure on the calling thread."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            for item in pending:
+                self._by_path.pop(item.path, None)
+                self._by_path.pop(item.reference, None)
+        written = []
+        for item in pending:
+            try:
+                path = item.future.result(timeout)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.error("Failed to write screenshot %s: %s", item.path, exc)
+                continue
+            written.append(path)
+            if attach and item.attach:
+                _attach_file(path, item.name)
+        return written
+
+    def shutdown(self) -> None:
+        self.flush(attach=False)
+        self._executor.shutdown(wait=True)
+
+
+_WRITER: Optional[ScreenshotWriter] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def async_screenshots_enabled() -> bool:
+    return os.environ.get(ASYNC_SCREENSHOTS_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_screenshot_writer() -> ScreenshotWriter:
+    global _WRITER  # pylint: disable=global-statement
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = ScreenshotWriter()
+            atexit.register(_WRITER.shutdown)
+        return _WRITER
+
+
+def capture_screenshot(driver, path: Path, name: str, attach: bool = True, store: bool = False) -> Path:
+    """
+    Fetch a screenshot and write it to ``path`` in the background. The file exists once
+    :func:`flush_screenshots` (or :func:`wait_for_screenshot`) returns. With ``store`` the
+    image goes to the artifact store and the ``.json`` reference next to ``path`` is
+    returned instead. In async mode that path is provisional: if the store fails, the PNG
+    is written at ``path``, so use :func:`resolve_screenshot` for the file that exists.
+    """
+    path = Path(path)
+    written_path = _reference_path(path, store)
+    if not async_screenshots_enabled():
+        with timed(SCREENSHOT, "capture_screenshot", name):
+            if store:
+                written = _write_png(driver.get_screenshot_as_base64(), path, store, name)
+            else:
+                driver.save_screenshot(str(path))
+                written = path
+        if attach:
+            _attach_file(written, name)
+        return written_path if written != path else path
+    with timed(SCREENSHOT, "capture_screenshot", name):
+        encoded = driver.get_screenshot_as_base64()
+    get_screenshot_writer().submit(encoded, path, name, attach, store)
+    return written_path
+
+
+def wait_for_screenshot(path: Path) -> None:
+    if _WRITER is not None:
+        _WRITER.wait_for(path)
+
+
+def resolve_screenshot(path: Path) -> Path:
+    """
+    The file a :func:`capture_screenshot` path ended up as, waiting for it if still pending:
+    the ``.json`` reference, or the plain PNG when the artifact store failed.
+    """
+    path = Path(path)
+    wait_for_screenshot(path)
+    fallback = path.with_suffix(".png")
+    if path.suffix == ".json" and not path.exists() and fallback.exists():
+        return fallback
+    return path
+
+
+def flush_screenshots(attach: bool = True) -> List[Path]:
+    """Called at test teardown; returns the paths written since the previous flush."""
+    if _WRITER is None:
+        return []
+    return _WRITER.flush(attach=attach)
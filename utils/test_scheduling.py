@@ -0,0 +1,259 @@
+"""
+Duration-aware distribution of tests across xdist workers (devices).
+
+Every run folds the setup + call + teardown time of each test into an exponential moving
+average stored in ``reports/cache/test_durations.json``. With ``--duration-schedule`` the
+xdist controller uses that history for longest-processing-time-first scheduling: work units
+are queued longest first and each worker pulls the next one as it frees up, so the
+multi-minute tests start early instead of becoming the long tail.
+
+Tests marked ``@pytest.mark.starting_state("standard_user")`` form one work unit per state,
+so tests that start from the same state run back to back on the same worker and reuse its
+pooled session. A state group larger than a fair per-worker share is split so grouping
+never costs more than it saves.
+
+The controller only sees node ids, so workers publish the ``starting_state`` of what they
+collected to ``reports/cache/test_states/`` and the scheduler reads it once collection is done.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytest
+
+from utils.logger import get_logger
+
+try:
+    from xdist.scheduler import LoadScopeScheduling
+except ImportError:  # pragma: no cover - xdist is optional for single-process runs
+    LoadScopeScheduling = object
+
+LOGGER = get_logger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DURATIONS_PATH = REPO_ROOT / "reports" / "cache" / "test_durations.json"
+STATES_DIR = REPO_ROOT / "reports" / "cache" / "test_states"
+DURATION_SCHEDULE_ENV = "FRAMEWORK_DURATION_SCHEDULE"
+STARTING_STATE_MARKER = "starting_state"
+# Weight of the latest run in the moving average; history smooths out one-off slow runs.
+DURATION_SMOOTHING = 0.5
+DEFAULT_DURATION = 10.0
+
+WorkUnit = Tuple[str, List[str]]
+
+
+class DurationStore:
+    """Historical per-test durations, persisted as JSON between runs."""
+
+    def __init__(self, path: Path = DURATIONS_PATH):
+        self.path = Path(path)
+        self.durations: Dict[str, float] = {}
+        if self.path.exists():
+            try:
+                payload = json.loads(self.path.read_text(encoding="utf-8"))
+                self.durations = {nodeid: float(value) for nodeid, value in payload.get("durations", {}).items()}
+            except (ValueError, OSError) as exc:
+                LOGGER.warning("Ignoring unreadable test durations at %s: %s", self.path, exc)
+
+    def estimate(self, nodeid: str) -> float:
+        """Known average, else the median of known tests (a new test is probably typical)."""
+        if nodeid in self.durations:
+            return self.durations[nodeid]
+        return statistics.median(self.durations.values()) if self.durations else DEFAULT_DURATION
+
+    def update(self, measured: Dict[str, float]) -> None:
+        for nodeid, duration in measured.items():
+            previous = self.durations.get(nodeid)
+            if previous is None:
+                self.durations[nodeid] = duration
+            else:
+                self.durations[nodeid] = DURATION_SMOOTHING * duration + (1 - DURATION_SMOOTHING) * previous
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"durations": self.durations}, indent=2, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+def plan_work_units(
+    nodeids: Iterable[str],
+    estimate,
+    states: Dict[str, str],
+    workers: int,
+) -> List[WorkUnit]:
+    """
+    Group tests into work units ordered longest first.
+
+    Tests without a starting state are units of their own. Each state group is packed into
+    as few units as possible without exceeding ``max(total / workers, longest test)``.
+    """
+    nodeids = list(nodeids)
+    total = sum(estimate(nodeid) for nodeid in nodeids)
+    longest = max((estimate(nodeid) for nodeid in nodeids), default=0.0)
+    cap = max(total / max(workers, 1), longest)
+
+    groups: "OrderedDict[str, List[str]]" = OrderedDict()
+    units: List[Tuple[float, WorkUnit]] = []
+    for nodeid in nodeids:
+        state = states.get(nodeid)
+        if state:
+            groups.setdefault(state, []).append(nodeid)
+        else:
+            units.append((estimate(nodeid), (nodeid, [nodeid])))
+
+    for state, members in groups.items():
+        chunk: List[str] = []
+        chunk_time = 0.0
+        for nodeid in sorted(members, key=estimate, reverse=True):
+            duration = estimate(nodeid)
+            if chunk and chunk_time + duration > cap:
+                units.append((chunk_time, (f"{state}#{len(units)}", chunk)))
+                chunk, chunk_time = [], 0.0
+            chunk.append(nodeid)
+            chunk_time += duration
+        if chunk:
+            units.append((chunk_time, (f"{state}#{len(units)}", chunk)))
+
+    units.sort(key=lambda item: item[0], reverse=True)
+    return [unit for _, unit in units]
+
+
+def publish_states(items, worker_id: str, directory: Path = STATES_DIR) -> None:
+    """Written by each worker after collection so the controller can group by starting state."""
+    states = {}
+    for item in items:
+        marker = item.get_closest_marker(STARTING_STATE_MARKER)
+        if marker and marker.args:
+            states[item.nodeid] = str(marker.args[0])
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = directory / f".{worker_id}.tmp"
+    tmp_path.write_text(json.dumps(states), encoding="utf-8")
+    tmp_path.replace(directory / f"{worker_id}.json")
+
+
+def load_states(directory: Path = STATES_DIR) -> Dict[str, str]:
+    states: Dict[str, str] = {}
+    for path in directory.glob("*.json"):
+        try:
+            states.update(json.loads(path.read_text(encoding="utf-8")))
+        except ValueError:
+            continue
+    return states
+
+
+def clear_states(directory: Path = STATES_DIR) -> None:
+    for path in directory.glob("*.json"):
+        path.unlink()
+
+
+class DurationScheduling(LoadScopeScheduling):
+    """xdist scheduler dispatching :func:`plan_work_units` longest first to whichever worker frees up."""
+
+    def __init__(self, config, log=None, store: Optional[DurationStore] = None):
+        super().__init__(config, log)
+        self.store = store or DurationStore()
+        self._unit_of: Dict[str, str] = {}
+
+    def _split_scope(self, nodeid: str) -> str:
+        return self._unit_of.get(nodeid, nodeid)
+
+    def schedule(self) -> None:
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self._reschedule(node)
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+        self.collection = list(next(iter(self.registered_collections.values())))
+        if not self.collection:
+            return
+
+        units = plan_work_units(self.collection, self.store.estimate, load_states(), len(self.nodes))
+        for key, nodeids in units:
+            self.workqueue[key] = {nodeid: False for nodeid in nodeids}
+            for nodeid in nodeids:
+                self._unit_of[nodeid] = key
+        LOGGER.info(
+            "Duration schedule: %s tests in %s units over %s workers, estimated %.0fs of work",
+            len(self.collection),
+            len(units),
+            len(self.nodes),
+            sum(self.store.estimate(nodeid) for nodeid in self.collection),
+        )
+
+        extra_nodes = len(self.nodes) - len(self.workqueue)
+        for _ in range(max(extra_nodes, 0)):
+            unused_node, _ = self.assigned_work.popitem()
+            unused_node.shutdown()
+
+        # One unit per worker up front; the rest is pulled as workers free up, which keeps the
+        # longest-first order meaningful (an eager round-robin would fix assignments too early).
+        for node in self.nodes:
+            self._assign_work_unit(node)
+        for node in self.nodes:
+            self._reschedule(node)
+        if not self.workqueue:
+            for node in self.nodes:
+                node.shutdown()
+
+    def _reschedule(self, node) -> None:
+        if node.shutting_down:
+            return
+        if not self.workqueue:
+            node.shutdown()
+            return
+        # An xdist worker holds back its last queued test until it knows the next one, so top up
+        # when a single test is left rather than waiting for the unit to drain.
+        if self._pending_of(self.assigned_work[node]) > 1:
+            return
+        self._assign_work_unit(node)
+
+
+class DurationSchedulePlugin:
+    """Registered by conftest; records durations and, on request, installs the scheduler."""
+
+    def __init__(self, config, schedule: bool):
+        self.config = config
+        self.schedule = schedule
+        self.is_worker = hasattr(config, "workerinput")
+        self.measured: Dict[str, float] = {}
+        if not self.is_worker:
+            clear_states()
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        if self.is_worker and self.schedule:
+            publish_states(items, config.workerinput.get("workerid", "gw0"))
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_make_scheduler(self, config, log):
+        if self.schedule:
+            return DurationScheduling(config, log)
+        return None
+
+    def pytest_runtest_logreport(self, report):
+        # Under xdist this runs on the controller for every forwarded worker report.
+        if self.is_worker:
+            return
+        self.measured[report.nodeid] = self.measured.get(report.nodeid, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        if self.is_worker or not self.measured:
+            return
+        store = DurationStore()
+        store.update(self.measured)
+        store.save()
+
+
+def duration_schedule_requested(config) -> bool:
+    if config.getoption("--duration-schedule", default=False):
+        return True
+    return os.environ.get(DURATION_SCHEDULE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,269 @@
+"""
+Per-test timing instrumentation.
+
+When enabled (``FRAMEWORK_TIMINGS=1`` or ``pytest --timings``) every WebDriver command,
+explicit wait, page-object action, settle sleep, AI fallback search and screenshot is
+recorded as a span attributed to the running test. Spans nest, and each one stores its
+*self* time (duration minus child spans), so per-category totals add up to wall time
+without double counting.
+
+When disabled, :func:`timed` returns a shared no-op context manager and
+:func:`timed_method` wrappers fall straight through to the wrapped call, so the hot path
+pays a single attribute check.
+"""
+
+from __future__ import annotations
+
+import csv
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TIMINGS_DIR = REPO_ROOT / "reports" / "timings"
+TIMINGS_ENV = "FRAMEWORK_TIMINGS"
+NO_TEST = "<session>"
+
+COMMAND, WAIT, ACTION, SLEEP, FALLBACK, SCREENSHOT = "command", "wait", "action", "sleep", "fallback", "screenshot"
+CATEGORIES = (COMMAND, WAIT, ACTION, SLEEP, FALLBACK, SCREENSHOT)
+
+_NULL_SPAN = nullcontext()
+
+
+@dataclass
+class Span:
+    test: str
+    category: str
+    name: str
+    detail: str
+    start: float
+    duration: float = 0.0
+    self_time: float = 0.0
+    depth: int = 0
+
+
+class _OpenSpan:
+    __slots__ = ("recorder", "span", "child_time", "started")
+
+    def __init__(self, recorder: "TimingRecorder", category: str, name: str, detail: str):
+        self.recorder = recorder
+        self.span = Span(recorder.current_test, category, name, detail, start=0.0)
+        self.child_time = 0.0
+
+    def __enter__(self) -> Span:
+        stack = self.recorder.stack()
+        self.span.depth = len(stack)
+        stack.append(self)
+        self.started = time.perf_counter()
+        self.span.start = time.time()
+        return self.span
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        duration = time.perf_counter() - self.started
+        stack = self.recorder.stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_time += duration
+        self.span.duration = duration
+        self.span.self_time = max(duration - self.child_time, 0.0)
+        self.recorder.add(self.span)
+
+
+class TimingRecorder:
+    """Collects spans for the current process (one xdist worker)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.current_test = NO_TEST
+        self.spans: List[Span] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def stack(self) -> List[_OpenSpan]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+
+
+_RECORDER = TimingRecorder()
+
+
+def timings_enabled() -> bool:
+    return _RECORDER.enabled
+
+
+def enable_timings(enabled: bool = True) -> None:
+    _RECORDER.enabled = enabled
+
+
+def enabled_from_env() -> bool:
+    return os.environ.get(TIMINGS_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def set_current_test(nodeid: Optional[str]) -> None:
+    _RECORDER.current_test = nodeid or NO_TEST
+
+
+def get_recorder() -> TimingRecorder:
+    return _RECORDER
+
+
+def timed(category: str, name: str, detail: Any = ""):
+    """Context manager timing one step; a shared no-op when instrumentation is off."""
+    if not _RECORDER.enabled:
+        return _NULL_SPAN
+    return _OpenSpan(_RECORDER, category, name, str(detail) if detail else "")
+
+
+def timed_method(category: str) -> Callable:
+    """Decorator for page-object methods; the span is named ``Class.method`` with the first argument as detail."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not _RECORDER.enabled:
+                return func(self, *args, **kwargs)
+            detail = args[0] if args else ""
+            with _OpenSpan(_RECORDER, category, f"{type(self).__name__}.{func.__name__}", str(detail)):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_driver(driver) -> None:
+    """Time every WebDriver command ``driver`` sends (wraps its command executor)."""
+    executor = driver.command_executor
+    execute = executor.execute
+
+    def timed_execute(command: str, params: Dict[str, Any]):
+        if not _RECORDER.enabled:
+            return execute(command, params)
+        detail = (params or {}).get("value") if command.startswith("find") else ""
+        with _OpenSpan(_RECORDER, COMMAND, command, str(detail) if detail else ""):
+            return execute(command, params)
+
+    executor.execute = timed_execute
+
+
+# -- reporting -----------------------------------------------------------------------------
+
+
+def summarize_spans(spans: Iterable[Span]) -> Dict[str, Dict[str, Any]]:
+    """Per-test totals: wall time (top-level spans), self time per category, fallback cost."""
+    tests: Dict[str, Dict[str, Any]] = {}
+    for span in spans:
+        entry = tests.setdefault(
+            span.test,
+            {"total": 0.0, "categories": {category: 0.0 for category in CATEGORIES}, "fallback_calls": 0, "fallback_time": 0.0},
+        )
+        entry["categories"][span.category] = entry["categories"].get(span.category, 0.0) + span.self_time
+        if span.depth == 0:
+            entry["total"] += span.duration
+        if span.category == FALLBACK:
+            entry["fallback_calls"] += 1
+            entry["fallback_time"] += span.duration
+    return tests
+
+
+def write_timings(directory: Path = TIMINGS_DIR, worker_id: Optional[str] = None) -> Optional[Path]:
+    """Write this process's spans as ``timings-<worker>.json`` plus a flat CSV; returns the JSON path."""
+    spans = list(_RECORDER.spans)
+    if not spans:
+        return None
+    worker_id = worker_id or os.environ.get("PYTEST_XDIST_WORKER", "main")
+    directory.mkdir(parents=True, exist_ok=True)
+    json_path = directory / f"timings-{worker_id}.json"
+    payload = {
+        "worker": worker_id,
+        "generated": time.time(),
+        "tests": summarize_spans(spans),
+        "spans": [asdict(span) for span in spans],
+    }
+    json_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    with (directory / f"timings-{worker_id}.csv").open("w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["test", "category", "name", "detail", "start", "duration_ms", "self_ms", "depth"])
+        for span in spans:
+            writer.writerow(
+                [
+                    span.test,
+                    span.category,
+                    span.name,
+                    span.detail,
+                    f"{span.start:.3f}",
+                    f"{span.duration * 1000:.2f}",
+                    f"{span.self_time * 1000:.2f}",
+                    span.depth,
+                ]
+            )
+    LOGGER.info("Wrote %s timing spans to %s", len(spans), json_path)
+    return json_path
+
+
+def load_spans(directory: Path = TIMINGS_DIR) -> List[Span]:
+    """Spans from every worker file in ``directory``."""
+    spans: List[Span] = []
+    for path in sorted(directory.glob("timings-*.json")):
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        spans.extend(Span(**span) for span in payload.get("spans", []))
+    return spans
+
+
+def clear_timings(directory: Path = TIMINGS_DIR) -> None:
+    """Remove worker files from a previous run so the summary only covers this one."""
+    for path in list(directory.glob("timings-*.json")) + list(directory.glob("timings-*.csv")):
+        path.unlink()
+
+
+def format_summary(spans: List[Span], top_n: int = 10) -> List[str]:
+    """Human-readable summary: slowest steps, time by category, waits vs actions, fallback cost."""
+    if not spans:
+        return ["No timing spans recorded."]
+    tests = summarize_spans(spans)
+    totals = {category: sum(test["categories"].get(category, 0.0) for test in tests.values()) for category in CATEGORIES}
+    wall = sum(test["total"] for test in tests.values())
+    fallback_calls = sum(test["fallback_calls"] for test in tests.values())
+    fallback_time = sum(test["fallback_time"] for test in tests.values())
+
+    lines = [f"Top {top_n} slowest steps:"]
+    for span in sorted(spans, key=lambda item: item.duration, reverse=True)[:top_n]:
+        label = f"{span.name} {span.detail}".strip()
+        lines.append(f"  {span.duration:8.3f}s  {span.category:<10} {label[:70]:<70} {span.test}")
+
+    lines.append(f"Instrumented time {wall:.2f}s across {len(tests)} tests (self time by category):")
+    for category in CATEGORIES:
+        share = totals[category] / wall * 100 if wall else 0.0
+        lines.append(f"  {category:<10} {totals[category]:8.2f}s  {share:5.1f}%")
+
+    waits = totals[WAIT] + totals[SLEEP]
+    actions = totals[ACTION] + totals[COMMAND]
+    lines.append(f"Waits/sleeps vs actions/commands: {waits:.2f}s vs {actions:.2f}s")
+    lines.append(f"AI fallback: {fallback_calls} searches costing {fallback_time:.2f}s")
+
+    slowest_tests = sorted(tests.items(), key=lambda item: item[1]["total"], reverse=True)[:top_n]
+    lines.append("Slowest tests:")
+    for nodeid, entry in slowest_tests:
+        lines.append(f"  {entry['total']:8.2f}s  {nodeid}")
+    return lines
@@ -0,0 +1,108 @@
+"""
+Implicit-wait policy for the framework.
+
+Sessions run with the implicit wait switched off so that ``find_elements`` probes
+return immediately when nothing matches; every blocking lookup goes through an
+explicit ``WebDriverWait`` instead. The few call sites that genuinely want the
+driver-side implicit behaviour opt in with :func:`implicit_wait` or
+:func:`with_implicit_wait`.
+"""
+
+import functools
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from utils.logger import get_logger
+from utils.timings import WAIT, timed
+
+LOGGER = get_logger(__name__)
+
+Locator = Tuple[str, str]
+DEFAULT_POLL_FREQUENCY = 0.25
+
+# Last implicit wait pushed to each driver, so unchanged values skip the round-trip.
+_IMPLICIT_WAITS: "WeakKeyDictionary[object, float]" = WeakKeyDictionary()
+
+
+def get_implicit_wait(driver) -> Optional[float]:
+    """Return the implicit wait last applied through this module, if known."""
+    try:
+        return _IMPLICIT_WAITS.get(driver)
+    except TypeError:
+        return None
+
+
+def set_implicit_wait(driver, seconds: float) -> None:
+    """Apply an implicit wait, skipping the HTTP call when the value is already active."""
+    if get_implicit_wait(driver) == seconds:
+        return
+    driver.implicitly_wait(seconds)
+    try:
+        _IMPLICIT_WAITS[driver] = seconds
+    except TypeError:  # pragma: no cover - drivers that cannot be weak-referenced
+        pass
+    LOGGER.debug("Implicit wait set to %ss", seconds)
+
+
+@contextmanager
+def implicit_wait(driver, seconds: float) -> Iterator[None]:
+    """Temporarily apply ``seconds`` of implicit wait and restore the previous value."""
+    previous = get_implicit_wait(driver)
+    set_implicit_wait(driver, seconds)
+    try:
+        yield
+    finally:
+        set_implicit_wait(driver, previous if previous is not None else 0)
+
+
+def no_implicit_wait(driver):
+    """Scope the implicit wait to zero for non-blocking probes."""
+    return implicit_wait(driver, 0)
+
+
+def with_implicit_wait(seconds: float) -> Callable:
+    """Decorator for page-object methods (``self.driver``) that rely on implicit waiting."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with implicit_wait(self.driver, seconds):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def probe_elements(driver, locator: Locator) -> List:
+    """Return matching elements right now, never blocking on an empty result."""
+    with no_implicit_wait(driver):
+        return driver.find_elements(*locator)
+
+
+def probe_element(driver, locator: Locator):
+    """Return the first matching element right now, or ``None``."""
+    elements = probe_elements(driver, locator)
+    return elements[0] if elements else None
+
+
+def poll_elements(driver, locator: Locator, timeout: float) -> List:
+    """
+    Poll until at least one element matches or ``timeout`` elapses.
+    Returns an empty list instead of raising so callers can treat "absent" as data.
+    """
+    try:
+        with timed(WAIT, "poll_elements", locator), no_implicit_wait(driver):
+            return WebDriverWait(
+                driver,
+                timeout,
+                poll_frequency=DEFAULT_POLL_FREQUENCY,
+                ignored_exceptions=(NoSuchElementException,),
+            ).until(lambda d: d.find_elements(*locator))
+    except TimeoutException:
+        LOGGER.debug("No elements matched %s within %ss", locator, timeout)
+        return []
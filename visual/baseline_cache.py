@@ -0,0 +1,185 @@
+"""
+Decoded-baseline cache for visual comparison.
+
+Suites compare the same few screens over and over, and every comparison used to decode the
+baseline PNG again. :class:`BaselineCache` keeps decoded baselines in a size-bounded LRU,
+together with their downscaled pyramid levels and ignore masks, keyed by path, mtime and
+size so an updated baseline is picked up on the next comparison.
+
+The first process to decode a baseline also writes the raw pixels to a ``.npy`` sidecar in
+``reports/cache/baselines``. Other xdist workers memory-map that file instead of decoding the
+PNG, so they share one copy through the OS page cache. Sidecar names carry the baseline's
+mtime and size; a stale sidecar is never read and is removed when its replacement is written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+import yaml
+
+from utils.logger import get_logger
+from visual.comparison import Region, build_mask, downscale, load_ignore_regions, regions_path
+
+LOGGER = get_logger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SIDECAR_DIR = REPO_ROOT / "reports" / "cache" / "baselines"
+CONFIG_PATH = REPO_ROOT / "config" / "config.yaml"
+BASELINE_CACHE_ENV = "FRAMEWORK_BASELINE_CACHE"
+DEFAULT_MAX_MB = 256.0
+
+CacheKey = Tuple[str, int, int, int]
+
+
+@dataclass
+class CachedBaseline:
+    """A decoded baseline plus the derived arrays comparisons need, built on first use."""
+
+    path: Path
+    image: np.ndarray
+    regions: List[Region]
+    _coarse: Dict[int, np.ndarray] = field(default_factory=dict)
+    _masks: Dict[Tuple[Region, ...], Optional[np.ndarray]] = field(default_factory=dict)
+
+    def coarse(self, levels: int) -> np.ndarray:
+        if levels not in self._coarse:
+            self._coarse[levels] = downscale(self.image, levels)
+        return self._coarse[levels]
+
+    def mask(self, extra_regions: Optional[Sequence[Region]] = None) -> Optional[np.ndarray]:
+        """Mask for the sidecar regions plus ``extra_regions``; ``None`` when nothing is ignored."""
+        extra = tuple(tuple(int(value) for value in region) for region in extra_regions or ())
+        if extra not in self._masks:
+            self._masks[extra] = build_mask(self.image.shape, self.regions + list(extra))
+        return self._masks[extra]
+
+    @property
+    def nbytes(self) -> int:
+        derived = list(self._coarse.values()) + [mask for mask in self._masks.values() if mask is not None]
+        return self.image.nbytes + sum(array.nbytes for array in derived)
+
+
+class BaselineCache:
+    """Process-wide LRU of :class:`CachedBaseline`, bounded by ``max_bytes``."""
+
+    def __init__(self, max_bytes: int = int(DEFAULT_MAX_MB * 1024 * 1024), sidecar_dir: Optional[Path] = SIDECAR_DIR):
+        self.max_bytes = max_bytes
+        self.sidecar_dir = Path(sidecar_dir) if sidecar_dir else None
+        self._entries: "OrderedDict[CacheKey, CachedBaseline]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sidecar_loads = 0
+
+    def get(self, path: Path) -> CachedBaseline:
+        path = Path(path).resolve()
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        image = self._load(path, key)
+        entry = CachedBaseline(path, image, load_ignore_regions(path, image.shape[0]))
+        with self._lock:
+            for stale in [other for other in self._entries if other[0] == key[0]]:
+                del self._entries[stale]
+            self._entries[key] = entry
+        return entry
+
+    def trim(self) -> None:
+        """Evict least recently used baselines until the cache (derived arrays included) fits."""
+        with self._lock:
+            total = sum(entry.nbytes for entry in self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                total -= evicted.nbytes
+                LOGGER.debug("Evicted baseline %s from cache", evicted.path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _key(path: Path) -> CacheKey:
+        stat = path.stat()
+        sidecar = regions_path(path)
+        regions_mtime = sidecar.stat().st_mtime_ns if sidecar.exists() else 0
+        return str(path), stat.st_mtime_ns, stat.st_size, regions_mtime
+
+    def _sidecar_path(self, key: CacheKey) -> Path:
+        return self.sidecar_dir / f"{self._path_hash(key[0])}-{key[1]}-{key[2]}.npy"
+
+    @staticmethod
+    def _path_hash(path: str) -> str:
+        return hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+
+    def _load(self, path: Path, key: CacheKey) -> np.ndarray:
+        sidecar = self._sidecar_path(key) if self.sidecar_dir else None
+        if sidecar and sidecar.exists():
+            try:
+                image = np.load(sidecar, mmap_mode="r")
+                self.sidecar_loads += 1
+                return image
+            except (ValueError, OSError) as exc:
+                LOGGER.warning("Ignoring unreadable baseline sidecar %s: %s", sidecar, exc)
+
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"Failed to read image at {path}")
+        if sidecar:
+            self._write_sidecar(sidecar, image)
+        return image
+
+    def _write_sidecar(self, sidecar: Path, image: np.ndarray) -> None:
+        try:
+            sidecar.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = sidecar.with_name(f".{sidecar.stem}.{os.getpid()}.tmp")
+            with tmp_path.open("wb") as handle:
+                np.save(handle, image)
+            tmp_path.replace(sidecar)
+            for stale in sidecar.parent.glob(f"{sidecar.name.split('-')[0]}-*.npy"):
+                if stale != sidecar:
+                    stale.unlink(missing_ok=True)
+        except OSError as exc:
+            LOGGER.warning("Could not write baseline sidecar %s: %s", sidecar, exc)
+
+
+_CACHE: Optional[BaselineCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def baseline_cache_enabled() -> bool:
+    return os.environ.get(BASELINE_CACHE_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _max_bytes(config_path: Path = CONFIG_PATH) -> int:
+    max_mb = DEFAULT_MAX_MB
+    if config_path.exists():
+        with config_path.open("r", encoding="utf-8") as config_file:
+            visual = (yaml.safe_load(config_file) or {}).get("visual") or {}
+        max_mb = float(visual.get("baseline_cache_mb", max_mb))
+    return int(max_mb * 1024 * 1024)
+
+
+def get_baseline_cache() -> Optional[BaselineCache]:
+    """Process-wide cache, or ``None`` when disabled via ``FRAMEWORK_BASELINE_CACHE=0``."""
+    global _CACHE  # pylint: disable=global-statement
+    if not baseline_cache_enabled():
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = BaselineCache(max_bytes=_max_bytes())
+        return _CACHE
@@ -0,0 +1,210 @@
+"""
+Coarse-to-fine screenshot comparison.
+
+Both images are reduced by repeated 2x area downscaling and diffed at the coarse level
+first. Only tiles whose coarse diff shows a change are re-checked at full resolution; when
+the coarse diff is clean no full-resolution work is done at all. The pixel score is one
+minus the share of compared pixels whose grey-level difference exceeds 30, the definition
+the validator always used; ``scoring="ssim"`` uses the mean structural similarity instead.
+
+Ignore regions (status bar, clocks, ads) are per baseline: ``<baseline stem>.regions.json``
+next to the baseline image, e.g. ``{"status_bar": true, "ignore": [[0, 1900, 1080, 200]]}``
+with rectangles as ``[x, y, width, height]`` in baseline pixels.
+
+A change confined to one or two isolated pixels can average out below the coarse trigger;
+it is below what the score threshold can resolve anyway, and ``multiscale=False`` keeps the
+exact whole-frame path.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+Region = Tuple[int, int, int, int]
+
+PIXEL_LEVEL = 30
+# Coarse grey-level difference that marks a tile as suspect; a full-resolution change of
+# PIXEL_LEVEL spread over at least one coarse pixel's footprint stays above this.
+COARSE_TRIGGER = 2.0
+DEFAULT_LEVELS = 2
+DEFAULT_TILE = 64
+# Above this share of suspect tiles one whole-frame pass is cheaper than per-tile work.
+WHOLE_FRAME_SHARE = 0.5
+STATUS_BAR_RATIO = 0.035
+SCORINGS = ("pixel", "ssim")
+
+
+@dataclass
+class ComparisonOutcome:
+    score: float
+    diff_mask: np.ndarray
+    scoring: str
+    tiles_total: int
+    tiles_escalated: int
+
+
+def regions_path(baseline_path: Path) -> Path:
+    return baseline_path.with_name(f"{baseline_path.stem}.regions.json")
+
+
+def load_ignore_regions(baseline_path: Path, height: int) -> List[Region]:
+    """Regions from the baseline's sidecar file; an absent file means compare everything."""
+    path = regions_path(Path(baseline_path))
+    if not path.exists():
+        return []
+    spec = json.loads(path.read_text(encoding="utf-8"))
+    regions = [tuple(int(value) for value in region) for region in spec.get("ignore", [])]
+    if spec.get("status_bar"):
+        regions.append((0, 0, 1_000_000, int(round(height * STATUS_BAR_RATIO))))
+    return regions
+
+
+def build_mask(shape: Tuple[int, ...], regions: Sequence[Region]) -> Optional[np.ndarray]:
+    """uint8 mask, 255 where pixels are compared; ``None`` when nothing is ignored."""
+    if not regions:
+        return None
+    mask = np.full(shape[:2], 255, dtype=np.uint8)
+    for x, y, width, height in regions:
+        mask[max(y, 0):max(y + height, 0), max(x, 0):max(x + width, 0)] = 0
+    return mask
+
+
+def downscale(image: np.ndarray, levels: int) -> np.ndarray:
+    for _ in range(levels):
+        image = cv2.resize(
+            image, (max(image.shape[1] // 2, 1), max(image.shape[0] // 2, 1)), interpolation=cv2.INTER_AREA
+        )
+    return image
+
+
+def _grey_diff(baseline: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    diff = cv2.absdiff(baseline, actual)
+    return cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY) if diff.ndim == 3 else diff
+
+
+def ssim_map(baseline: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """Per-pixel SSIM of the grey images (11x11 Gaussian window, sigma 1.5)."""
+    if baseline.ndim == 3:
+        baseline = cv2.cvtColor(baseline, cv2.COLOR_BGR2GRAY)
+        actual = cv2.cvtColor(actual, cv2.COLOR_BGR2GRAY)
+    x = baseline.astype(np.float32)
+    y = actual.astype(np.float32)
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+
+    def blur(image):
+        return cv2.GaussianBlur(image, (11, 11), 1.5)
+
+    mu_x, mu_y = blur(x), blur(y)
+    sigma_x = blur(x * x) - mu_x * mu_x
+    sigma_y = blur(y * y) - mu_y * mu_y
+    sigma_xy = blur(x * y) - mu_x * mu_y
+    numerator = (2 * mu_x * mu_y + c1) * (2 * sigma_xy + c2)
+    denominator = (mu_x * mu_x + mu_y * mu_y + c1) * (sigma_x + sigma_y + c2)
+    return numerator / denominator
+
+
+class MultiScaleComparator:
+    """Pyramid comparison that escalates to full resolution only on suspect tiles."""
+
+    def __init__(self, levels: int = DEFAULT_LEVELS, tile: int = DEFAULT_TILE, scoring: str = "pixel"):
+        if scoring not in SCORINGS:
+            raise ValueError(f"Unknown scoring '{scoring}'. Expected one of {SCORINGS}.")
+        self.levels = levels
+        self.tile = tile
+        self.scoring = scoring
+
+    def compare(
+        self,
+        baseline: np.ndarray,
+        actual: np.ndarray,
+        mask: Optional[np.ndarray] = None,
+        baseline_coarse: Optional[np.ndarray] = None,
+        multiscale: bool = True,
+    ) -> ComparisonOutcome:
+        """
+        ``actual`` may differ in size from ``baseline``; it is only resized to full baseline
+        resolution when a tile needs escalation. ``baseline_coarse`` lets callers reuse a
+        cached pyramid level. ``multiscale=False`` checks the whole frame at full resolution.
+        """
+        height, width = baseline.shape[:2]
+        tiles_total = -(-height // self.tile) * -(-width // self.tile)
+        if not multiscale:
+            return self._score_boxes(baseline, actual, mask, [(0, 0, width, height)], tiles_total, tiles_total)
+
+        factor = 2 ** self.levels
+        coarse_base = baseline_coarse if baseline_coarse is not None else downscale(baseline, self.levels)
+        coarse_actual = downscale(actual, self.levels)
+        if coarse_actual.shape != coarse_base.shape:
+            coarse_actual = cv2.resize(
+                coarse_actual, (coarse_base.shape[1], coarse_base.shape[0]), interpolation=cv2.INTER_AREA
+            )
+
+        coarse_diff = _grey_diff(coarse_base, coarse_actual)
+        if mask is not None:
+            coarse_mask = cv2.resize(mask, (coarse_diff.shape[1], coarse_diff.shape[0]), interpolation=cv2.INTER_AREA)
+            coarse_diff[coarse_mask < 255] = 0
+
+        coarse_tile = max(self.tile // factor, 1)
+        suspects = self._suspect_tiles(coarse_diff, coarse_tile)
+        if not suspects:
+            return ComparisonOutcome(1.0, np.zeros((height, width), dtype=np.uint8), self.scoring, tiles_total, 0)
+
+        if len(suspects) > tiles_total * WHOLE_FRAME_SHARE:
+            boxes = [(0, 0, width, height)]
+        else:
+            boxes = [
+                (col * self.tile, row * self.tile, min(self.tile, width - col * self.tile), min(self.tile, height - row * self.tile))
+                for row, col in suspects
+            ]
+        return self._score_boxes(baseline, actual, mask, boxes, tiles_total, len(suspects))
+
+    def _score_boxes(self, baseline, actual, mask, boxes, tiles_total: int, escalated: int) -> ComparisonOutcome:
+        """Full-resolution diff (and SSIM) restricted to ``boxes``; everything else counts as unchanged."""
+        height, width = baseline.shape[:2]
+        if actual.shape != baseline.shape:
+            actual = cv2.resize(actual, (width, height))
+        diff_mask = np.zeros((height, width), dtype=np.uint8)
+        compared = int(np.count_nonzero(mask)) if mask is not None else height * width
+        loss = 0.0
+        for x, y, box_width, box_height in boxes:
+            window = (slice(y, y + box_height), slice(x, x + box_width))
+            _, changed = cv2.threshold(_grey_diff(baseline[window], actual[window]), PIXEL_LEVEL, 255, cv2.THRESH_BINARY)
+            tile_mask = mask[window] if mask is not None else None
+            if tile_mask is not None:
+                changed[tile_mask == 0] = 0
+            diff_mask[window] = changed
+            if self.scoring == "pixel":
+                loss += np.count_nonzero(changed)
+            else:
+                loss += self._ssim_loss(baseline, actual, x, y, box_width, box_height, tile_mask)
+
+        score = 1.0 - loss / compared if compared else 1.0
+        return ComparisonOutcome(float(max(0.0, min(score, 1.0))), diff_mask, self.scoring, tiles_total, escalated)
+
+    def _suspect_tiles(self, coarse_diff: np.ndarray, coarse_tile: int) -> List[Tuple[int, int]]:
+        rows = -(-coarse_diff.shape[0] // coarse_tile)
+        cols = -(-coarse_diff.shape[1] // coarse_tile)
+        padded = np.zeros((rows * coarse_tile, cols * coarse_tile), dtype=coarse_diff.dtype)
+        padded[: coarse_diff.shape[0], : coarse_diff.shape[1]] = coarse_diff
+        tile_max = padded.reshape(rows, coarse_tile, cols, coarse_tile).max(axis=(1, 3))
+        return [(int(row), int(col)) for row, col in zip(*np.nonzero(tile_max > COARSE_TRIGGER))]
+
+    @staticmethod
+    def _ssim_loss(baseline, actual, x, y, box_width, box_height, tile_mask) -> float:
+        """Sum of (1 - SSIM) over the box; computed with a margin so the window sees real neighbours."""
+        margin = 5
+        top, left = max(y - margin, 0), max(x - margin, 0)
+        bottom = min(y + box_height + margin, baseline.shape[0])
+        right = min(x + box_width + margin, baseline.shape[1])
+        local = ssim_map(baseline[top:bottom, left:right], actual[top:bottom, left:right])
+        local = local[y - top : y - top + box_height, x - left : x - left + box_width]
+        loss = 1.0 - np.clip(local, -1.0, 1.0)
+        if tile_mask is not None:
+            loss = loss[tile_mask > 0]
+        return float(np.sum(loss))
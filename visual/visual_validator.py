@@ -1,18 +1,31 @@
+import base64
+import binascii
+import json
+import os
 import shutil
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import cv2
 import numpy as np
 
 from utils.logger import get_logger
+from utils.screenshot_writer import capture_screenshot, wait_for_screenshot
+from utils.timings import SCREENSHOT, timed
+from visual.baseline_cache import BaselineCache, CachedBaseline, get_baseline_cache
+from visual.comparison import MultiScaleComparator, Region, load_ignore_regions
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 BASELINE_DIR = REPO_ROOT / "visual" / "baseline"
 ACTUAL_DIR = REPO_ROOT / "reports" / "visual" / "actual"
 DIFF_DIR = REPO_ROOT / "reports" / "visual" / "diff"
+REPORT_PATH = REPO_ROOT / "reports" / "visual" / "report.json"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+ScreenshotData = Union[bytes, str, np.ndarray]
 
 
 @dataclass
@@ -20,28 +33,78 @@ class VisualComparisonResult:
     matched: bool
     score: float
     baseline_path: Path
-    actual_path: Path
+    actual_path: Optional[Path]
     diff_path: Optional[Path]
     baseline_created: bool = False
+    scoring: str = "pixel"
+    tiles_escalated: int = 0
+    error: Optional[str] = None
 
-    def to_dict(self) -> Dict[str, str | float | bool | None]:
+    def to_dict(self) -> Dict[str, str | float | bool | int | None]:
         return {
             "matched": self.matched,
             "score": round(self.score, 4),
             "baseline_path": str(self.baseline_path),
-            "actual_path": str(self.actual_path),
+            "actual_path": str(self.actual_path) if self.actual_path else None,
             "diff_path": str(self.diff_path) if self.diff_path else None,
             "baseline_created": self.baseline_created,
+            "scoring": self.scoring,
+            "tiles_escalated": self.tiles_escalated,
+            "error": self.error,
         }
 
 
+def decode_screenshot(image: ScreenshotData) -> Tuple[Optional[bytes], np.ndarray]:
+    """
+    Decode PNG bytes, base64 text or bytes (``get_screenshot_as_png`` / ``_as_base64``) into
+    a BGR array. Returns the encoded PNG as well, so it can be written without re-encoding.
+    """
+    if isinstance(image, np.ndarray):
+        return None, image
+    data = image.encode("ascii") if isinstance(image, str) else bytes(image)
+    if not data.startswith(PNG_SIGNATURE):
+        try:
+            data = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError) as exc:
+            raise ValueError("Screenshot is neither PNG bytes nor base64") from exc
+    decoded = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if decoded is None:
+        raise ValueError("Failed to decode screenshot")
+    return data, decoded
+
+
+def _compare_in_worker(directories: Tuple[Path, Path, Path], actual: Path, baseline_name: str, options: dict):
+    """Process-pool entry point; each worker process keeps its own baseline cache."""
+    return VisualValidator(*directories).compare_with_baseline(actual, baseline_name, **options)
+
+
+def write_report(results: Sequence[VisualComparisonResult], path: Path = REPORT_PATH) -> Path:
+    """One JSON document summarising a batch of comparisons."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "total": len(results),
+        "matched": sum(1 for result in results if result.matched),
+        "failed": sum(1 for result in results if not result.matched and not result.error),
+        "errors": sum(1 for result in results if result.error),
+        "results": [result.to_dict() for result in sorted(results, key=lambda result: str(result.baseline_path))],
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
+
+
 class VisualValidator:
     """
     Visual regression helper leveraging OpenCV.
     Features:
       * Baseline screenshot management
       * Similarity scoring with configurable thresholds
+      * Coarse-to-fine comparison with per-baseline ignore regions (see visual.comparison)
+      * Decoded baselines cached in-process and shared across workers (see visual.baseline_cache)
       * Automatic diff highlighting for regressions
+      * Batch comparison on a process pool with an aggregate JSON report
+      * In-memory checks straight from the driver, writing files only on failure
     """
 
     def __init__(
@@ -49,6 +112,7 @@ class VisualValidator:
         baseline_dir: Path = BASELINE_DIR,
         actual_dir: Path = ACTUAL_DIR,
         diff_dir: Path = DIFF_DIR,
+        baseline_cache: Optional[BaselineCache] = None,
     ):
         self.baseline_dir = Path(baseline_dir)
         self.actual_dir = Path(actual_dir)
@@ -56,13 +120,14 @@ class VisualValidator:
         for folder in (self.baseline_dir, self.actual_dir, self.diff_dir):
             folder.mkdir(parents=True, exist_ok=True)
 
+        self.baseline_cache = baseline_cache or get_baseline_cache()
         self.logger = get_logger(self.__class__.__name__)
 
     def capture_screenshot(self, driver, name: str) -> Path:
-        """Capture a screenshot via Appium driver and store under actual directory."""
+        """Capture a screenshot via Appium driver and store under actual directory (written in the background)."""
         timestamp = int(time.time() * 1000)
         path = self.actual_dir / f"{name}_{timestamp}.png"
-        driver.save_screenshot(str(path))
+        capture_screenshot(driver, path, name, attach=False)
         self.logger.info("Captured screenshot at %s", path)
         return path
 
@@ -72,13 +137,19 @@ class VisualValidator:
         baseline_name: str,
         threshold: float = 0.98,
         update_baseline: bool = False,
+        ignore_regions: Optional[Sequence[Region]] = None,
+        scoring: str = "pixel",
+        multiscale: bool = True,
     ) -> VisualComparisonResult:
         """
         Compare provided screenshot with stored baseline.
         Optionally create/update baseline if it does not exist.
+        ``ignore_regions`` add to the baseline's ``.regions.json``; ``scoring="ssim"`` scores by
+        structural similarity; ``multiscale=False`` diffs the whole frame at full resolution.
         """
         baseline_path = self.baseline_dir / baseline_name
         actual_path = Path(current_image_path)
+        wait_for_screenshot(actual_path)
 
         if not baseline_path.exists():
             if update_baseline:
@@ -97,16 +168,89 @@ class VisualValidator:
                 "Run with update_baseline=True to create it."
             )
 
-        baseline_img = self._load_image(baseline_path)
-        actual_img = self._load_image(actual_path)
-        actual_img = self._ensure_same_size(baseline_img, actual_img)
+        return self._compare(
+            self._load_image(actual_path), actual_path, baseline_name, threshold, ignore_regions, scoring, multiscale
+        )
 
-        score, diff_mask = self._calculate_similarity(baseline_img, actual_img)
+    def compare_image(
+        self,
+        image: ScreenshotData,
+        baseline_name: str,
+        threshold: float = 0.98,
+        update_baseline: bool = False,
+        ignore_regions: Optional[Sequence[Region]] = None,
+        scoring: str = "pixel",
+        multiscale: bool = True,
+        save_artifacts: bool = False,
+    ) -> VisualComparisonResult:
+        """
+        Compare an in-memory screenshot (PNG bytes, base64 or a decoded array) with the baseline.
+        The actual image is written under the actual directory only when the comparison fails
+        or ``save_artifacts`` is set; passing checks touch the disk for nothing but the baseline.
+        """
+        png_bytes, actual_img = decode_screenshot(image)
+        baseline_path = self.baseline_dir / baseline_name
+        if not baseline_path.exists():
+            if update_baseline:
+                self._write_image(baseline_path, png_bytes, actual_img)
+                self.logger.info("Baseline created at %s", baseline_path)
+                return VisualComparisonResult(
+                    matched=True,
+                    score=1.0,
+                    baseline_path=baseline_path,
+                    actual_path=None,
+                    diff_path=None,
+                    baseline_created=True,
+                )
+            raise FileNotFoundError(
+                f"Baseline image '{baseline_name}' missing at {baseline_path}. "
+                "Run with update_baseline=True to create it."
+            )
+
+        result = self._compare(actual_img, None, baseline_name, threshold, ignore_regions, scoring, multiscale)
+        if save_artifacts or not result.matched:
+            timestamp = int(time.time() * 1000)
+            result.actual_path = self._write_image(
+                self.actual_dir / f"{Path(baseline_name).stem}_{timestamp}.png", png_bytes, actual_img
+            )
+        return result
+
+    def check_screen(self, driver, baseline_name: str, **options) -> VisualComparisonResult:
+        """Screenshot the device and compare it in memory; ``options`` as for :meth:`compare_image`."""
+        with timed(SCREENSHOT, "check_screen", baseline_name):
+            png_bytes = driver.get_screenshot_as_png()
+        return self.compare_image(png_bytes, baseline_name, **options)
+
+    def _compare(
+        self,
+        actual_img: np.ndarray,
+        actual_path: Optional[Path],
+        baseline_name: str,
+        threshold: float,
+        ignore_regions: Optional[Sequence[Region]],
+        scoring: str,
+        multiscale: bool,
+    ) -> VisualComparisonResult:
+        baseline_path = self.baseline_dir / baseline_name
+        baseline = self._load_baseline(baseline_path)
+        baseline_img = baseline.image
+        comparator = MultiScaleComparator(scoring=scoring)
+        outcome = comparator.compare(
+            baseline_img,
+            actual_img,
+            baseline.mask(ignore_regions),
+            baseline_coarse=baseline.coarse(comparator.levels) if multiscale else None,
+            multiscale=multiscale,
+        )
+        if self.baseline_cache:
+            self.baseline_cache.trim()
+        score = outcome.score
         matched = score >= threshold
         diff_path = None
 
         if not matched:
-            diff_image = self._highlight_differences(actual_img, diff_mask)
+            actual_img = self._ensure_same_size(baseline_img, actual_img)
+            diff_image = self._highlight_differences(actual_img, outcome.diff_mask)
             diff_path = self._save_diff_image(diff_image, baseline_name)
             self.logger.warning(
                 "Visual regression detected for %s (score %.4f < %.2f). Diff stored at %s",
@@ -122,8 +266,98 @@ class VisualValidator:
             baseline_path=baseline_path,
             actual_path=actual_path,
             diff_path=diff_path,
+            scoring=scoring,
+            tiles_escalated=outcome.tiles_escalated,
+        )
+
+    def compare_many(
+        self,
+        pairs: Iterable[Tuple[Path, str]],
+        threshold: float = 0.98,
+        scoring: str = "pixel",
+        multiscale: bool = True,
+        update_baseline: bool = False,
+        workers: Optional[int] = None,
+        report_path: Optional[Path] = REPORT_PATH,
+    ) -> Iterator[VisualComparisonResult]:
+        """
+        Compare ``(actual_path, baseline_name)`` pairs on a process pool, yielding results as
+        they finish. Diff overlays are only produced for mismatches. A missing or unreadable
+        image yields an unmatched result with ``error`` set rather than aborting the batch.
+        Once every result has been yielded the aggregate report is written to ``report_path``;
+        abandoning the iteration early cancels the comparisons that have not started.
+        """
+        pairs = [(Path(actual), baseline_name) for actual, baseline_name in pairs]
+        for actual, _ in pairs:
+            # Pending background writes must land before worker processes are forked.
+            wait_for_screenshot(actual)
+        options = {
+            "threshold": threshold,
+            "scoring": scoring,
+            "multiscale": multiscale,
+            "update_baseline": update_baseline,
+        }
+        directories = (self.baseline_dir, self.actual_dir, self.diff_dir)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(pairs)))
+
+        results: List[VisualComparisonResult] = []
+        if workers == 1:
+            for actual, baseline_name in pairs:
+                try:
+                    result = self.compare_with_baseline(actual, baseline_name, **options)
+                except (OSError, ValueError) as exc:
+                    result = self._error_result(actual, baseline_name, scoring, exc)
+                results.append(result)
+                yield result
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            try:
+                futures = {
+                    executor.submit(_compare_in_worker, directories, actual, baseline_name, options): (actual, baseline_name)
+                    for actual, baseline_name in pairs
+                }
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except (OSError, ValueError) as exc:
+                        result = self._error_result(*futures[future], scoring, exc)
+                    results.append(result)
+                    yield result
+            finally:
+                # A caller that stops iterating early closes the generator here; drop the queued work.
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        if report_path:
+            report = write_report(results, report_path)
+            failed = sum(1 for result in results if not result.matched)
+            self.logger.info("Visual batch: %s of %s matched, report at %s", len(results) - failed, len(results), report)
+
+    def _error_result(self, actual: Path, baseline_name: str, scoring: str, exc: Exception) -> VisualComparisonResult:
+        self.logger.error("Visual comparison of %s against %s failed: %s", actual, baseline_name, exc)
+        return VisualComparisonResult(
+            matched=False,
+            score=0.0,
+            baseline_path=self.baseline_dir / baseline_name,
+            actual_path=actual,
+            diff_path=None,
+            scoring=scoring,
+            error=str(exc),
         )
 
+    @staticmethod
+    def _write_image(path: Path, png_bytes: Optional[bytes], image: np.ndarray) -> Path:
+        if png_bytes is not None:
+            path.write_bytes(png_bytes)
+        elif not cv2.imwrite(str(path), image):
+            raise ValueError(f"Failed to write image to {path}")
+        return path
+
+    def _load_baseline(self, path: Path) -> CachedBaseline:
+        if self.baseline_cache:
+            return self.baseline_cache.get(path)
+        image = self._load_image(path)
+        return CachedBaseline(path, image, load_ignore_regions(path, image.shape[0]))
+
     def _load_image(self, path: Path) -> np.ndarray:
         if not path.exists():
             raise FileNotFoundError(f"Image not found: {path}")
@@ -139,15 +373,12 @@ class VisualValidator:
         self.logger.debug("Resized actual image from %s to %s", actual.shape, baseline.shape)
         return resized
 
-    def _calculate_similarity(self, baseline: np.ndarray, actual: np.ndarray) -> tuple[float, np.ndarray]:
-        diff = cv2.absdiff(baseline, actual)
-        gray = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
-        _, thresh = cv2.threshold(gray, 30, 255, cv2.THRESH_BINARY)
-
-        # Similarity score is inverse of normalized diff magnitude
-        score = 1.0 - (float(np.sum(thresh)) / (thresh.size * 255))
-        score = max(0.0, min(score, 1.0))
-        return score, thresh
+    def _calculate_similarity(
+        self, baseline: np.ndarray, actual: np.ndarray, mask: Optional[np.ndarray] = None
+    ) -> tuple[float, np.ndarray]:
+        """Whole-frame score: share of (unmasked) pixels whose grey-level difference is at most 30."""
+        outcome = MultiScaleComparator().compare(baseline, actual, mask, multiscale=False)
+        return outcome.score, outcome.diff_mask
 
     def _highlight_differences(self, actual: np.ndarray, diff_mask: np.ndarray) -> np.ndarray:
         diff_mask = cv2.dilate(diff_mask, None, iterations=2)